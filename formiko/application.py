@@ -17,7 +17,9 @@ from gi.repository.Gtk import Application as GtkApplication  # noqa: F401
 
 from formiko.dialogs import TraceBackDialog, about_dialog
 from formiko.editor import EditorType
+from formiko.preview_context import PreviewContext
 from formiko.shortcuts import ShortcutsWindow
+from formiko.user import UserPreferences
 from formiko.window import AppWindow
 
 # pylint: disable = unused-argument
@@ -61,6 +63,12 @@ class Application(Adw.Application):
         """'do_startup' application handler."""
         Adw.Application.do_startup(self)
 
+        preferences = UserPreferences()
+        self.preview_context = PreviewContext(
+            preferences.preview_processes,
+            preferences.preview_memory_limit,
+        )
+
         action = SimpleAction.new("new-window", None)
         action.connect("activate", self.on_new_window)
         self.add_action(action)
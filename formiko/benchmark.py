@@ -0,0 +1,335 @@
+"""Headless benchmark of the render pipeline.
+
+Renders generated reStructuredText, MarkDown (by m2r and by the native
+parser) and JSON documents of different sizes with all writers, and
+measures latency, peak memory and output size. Results could be stored as
+a baseline, and later runs are compared with it::
+
+    python -m formiko.benchmark --sizes 1k,100k --save bench.json
+    python -m formiko.benchmark --sizes 1k,100k --baseline bench.json
+"""
+
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from json import dump, dumps, load
+from random import Random
+from statistics import median
+from time import perf_counter
+
+from formiko.rendering import (
+    LINE_MAP_PARSERS,
+    PARSERS,
+    WRITERS,
+    clear_caches,
+    publish_html,
+)
+from formiko.utils import Undefined
+
+try:
+    from formiko.json_preview import JSONPreview
+except (ImportError, ValueError):  # JSON preview needs GTK and WebKit
+
+    class JSONPreview(Undefined):  # type: ignore[no-redef]
+        """Undefined JSONPreview class."""
+
+
+SIZES = "1k,10k,100k,1m,10m"
+TOLERANCE = 0.25  # allowed slowdown against the baseline
+
+KIB = 1024
+MIB = 1024 * 1024
+
+WORDS = (
+    "formiko", "ant", "editor", "preview", "docutils", "section",
+    "paragraph", "render", "writer", "parser", "markup", "text", "document",
+    "block", "inline", "literal", "emphasis", "strong", "reference",
+    "target", "footnote", "table", "list", "item", "code", "source", "html",
+    "output", "lorem", "ipsum", "dolor", "sit", "amet", "consectetur",
+)
+
+
+def parse_size(size):
+    """Return size in bytes from string like 10k or 1m."""
+    units = {"k": KIB, "m": MIB}
+    size = size.strip().lower()
+    if size[-1:] in units:
+        return int(float(size[:-1]) * units[size[-1]])
+    return int(size)
+
+
+def format_size(size):
+    """Return size in the same format as parse_size accepts."""
+    if size % MIB == 0:
+        return f"{size // MIB}m"
+    if size % KIB == 0:
+        return f"{size // KIB}k"
+    return str(size)
+
+
+def sentence(rnd, words=12):
+    """Return random sentence."""
+    text = " ".join(rnd.choice(WORDS) for _ in range(words))
+    return text.capitalize() + "."
+
+
+def generate_rst(size, seed=0):
+    """Return reStructuredText document of at least *size* bytes."""
+    rnd = Random(seed)  # noqa: S311
+    parts = ["=========\nBenchmark\n=========\n\n:Author: Formiko\n\n"]
+    length = len(parts[0])
+    number = 0
+    while length < size:
+        number += 1
+        title = f"Section {number}"
+        part = (
+            f"{title}\n{'=' * len(title)}\n\n"
+            f"{sentence(rnd)} Some *emphasis*, **strong** and ``literal``"
+            f" text with `link {number} <https://formiko.zeropage.cz>`_"
+            f" and footnote [#]_. {sentence(rnd)}\n\n"
+            f"Subsection {number}\n{'-' * (len(title) + 3)}\n\n"
+            f"* {sentence(rnd, 5)}\n* {sentence(rnd, 6)}\n"
+            f"  * {sentence(rnd, 4)}\n\n"
+            f"::\n\n    def render(src):\n        return src  # {number}\n\n"
+            "=========  =========\nParser     Writer\n=========  =========\n"
+            "rst        html4\nm2r        html5\n=========  =========\n\n"
+            f".. [#] {sentence(rnd, 6)}\n\n"
+        )
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)
+
+
+def generate_markdown(size, seed=0):
+    """Return MarkDown document of at least *size* bytes."""
+    rnd = Random(seed)  # noqa: S311
+    parts = ["# Benchmark\n\n"]
+    length = len(parts[0])
+    number = 0
+    while length < size:
+        number += 1
+        part = (
+            f"## Section {number}\n\n"
+            f"{sentence(rnd)} Some *emphasis*, **strong** and `code`"
+            f" with [link {number}](https://formiko.zeropage.cz)."
+            f" {sentence(rnd)}\n\n"
+            f"### Subsection {number}\n\n"
+            f"* {sentence(rnd, 5)}\n* {sentence(rnd, 6)}\n\n"
+            f"1. {sentence(rnd, 4)}\n2. {sentence(rnd, 4)}\n\n"
+            f"```python\ndef render(src):\n    return src  # {number}\n```\n\n"
+            "| Parser | Writer |\n|--------|--------|\n"
+            "| rst    | html4  |\n| m2r    | html5  |\n\n"
+            f"> {sentence(rnd, 8)}\n\n"
+        )
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)
+
+
+def generate_json(size, seed=0):
+    """Return JSON document of at least *size* bytes."""
+    rnd = Random(seed)  # noqa: S311
+    items = []
+    length = 2
+    while length < size:
+        item = {
+            "id": len(items),
+            "name": sentence(rnd, 3),
+            "active": rnd.choice((True, False)),
+            "score": round(rnd.random() * 100, 3),
+            "tags": [rnd.choice(WORDS) for _ in range(4)],
+            "owner": {"name": rnd.choice(WORDS), "level": rnd.randint(1, 9)},
+        }
+        items.append(item)
+        length += len(dumps(item)) + 2
+    return dumps(items, indent=2)
+
+
+PEP_HEADER = """\
+PEP: 9999
+Title: Benchmark
+Author: Formiko
+Status: Draft
+Type: Informational
+Created: 01-Jan-2026
+
+"""
+
+# kind: (parser key, generator)
+CORPUS = {
+    "rst": ("rst", generate_rst),
+    "md": ("m2r", generate_markdown),
+    "mdn": ("md", generate_markdown),  # native MarkDown parser
+    "json": ("json", generate_json),
+}
+
+
+def renderer(kind, writer, src):
+    """Return function rendering *src* like Renderer.render_output."""
+    parser = CORPUS[kind][0]
+    if kind == "json":
+        return lambda: (True, JSONPreview().to_html(src), "text/html")
+    if writer == "pep":  # pep reader needs the header
+        src = PEP_HEADER + src
+    return lambda: publish_html(
+        src,
+        parser,
+        writer,
+        embed_stylesheet=False,
+        line_offset=0 if parser in LINE_MAP_PARSERS else None,
+    )
+
+
+def measure(kind, writer, size, repeat=3):
+    """Render document of *kind* and *size* and return result dictionary.
+
+    The first, cold render prepares the publisher too. Repeated renders
+    reuse it, but caches of parsed sections, converted blocks and pages
+    are cleared before each of them, so the whole document is rendered.
+    """
+    src = CORPUS[kind][1](size)
+    render = renderer(kind, writer, src)
+    clear_caches(publishers=True)
+    start = perf_counter()
+    render()
+    cold = perf_counter() - start
+
+    latencies = []
+    for _ in range(repeat):
+        clear_caches()
+        start = perf_counter()
+        state, html, _ = render()
+        latencies.append(perf_counter() - start)
+
+    clear_caches()
+    tracemalloc.start()
+    try:
+        render()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "kind": kind,
+        "writer": writer,
+        "size": size,
+        "source": len(src.encode("utf-8")),
+        "state": state,
+        "cold": cold,
+        "latency": min(latencies),
+        "median": median(latencies),
+        "peak": peak,
+        "output": len(html.encode("utf-8")),
+    }
+
+
+def available(kind, writer):
+    """Return True if *kind* document could be rendered by *writer*."""
+    if kind == "json":
+        return not issubclass(JSONPreview, Undefined)
+    parser = PARSERS[CORPUS[kind][0]]["class"]
+    return not issubclass(parser, Undefined) and not issubclass(
+        WRITERS[writer]["class"],
+        Undefined,
+    )
+
+
+def run(kinds, writers, sizes, repeat=3, report=None):
+    """Run benchmark and return list of results.
+
+    JSON documents are rendered only once for each size, writers are not
+    used for them. *report* is called with each result.
+    """
+    results = []
+    for kind in kinds:
+        for writer in writers if kind != "json" else ("-",):
+            if not available(kind, writer):
+                continue
+            for size in sizes:
+                result = measure(kind, writer, size, repeat)
+                results.append(result)
+                if report:
+                    report(result)
+    return results
+
+
+def result_key(result):
+    """Return key of result to pair it with the baseline."""
+    return f"{result['kind']}/{result['writer']}/{result['size']}"
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Return list of regression messages against *baseline* results."""
+    expected = {result_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        old = expected.get(result_key(result))
+        if old is None:
+            continue
+        for field in ("cold", "latency", "peak", "output"):
+            if field not in old:  # baseline of older version
+                continue
+            if result[field] > old[field] * (1 + tolerance):
+                regressions.append(
+                    f"{result_key(result)}: {field} {result[field]:g}"
+                    f" > {old[field]:g}",
+                )
+        if old["state"] and not result["state"]:
+            regressions.append(f"{result_key(result)}: render failed")
+    return regressions
+
+
+def print_result(result):
+    """Print one result line."""
+    print(  # noqa: T201
+        f"{result['kind']:5} {result['writer']:6}"
+        f" {format_size(result['size']):>6}"
+        f" {result['cold'] * 1000:10.1f} ms"
+        f" {result['latency'] * 1000:10.1f} ms"
+        f" {result['median'] * 1000:10.1f} ms"
+        f" {result['peak'] / 1024 / 1024:8.1f} MiB"
+        f" {result['output'] / 1024:10.1f} KiB"
+        f"{'' if result['state'] else ' ERROR'}",
+        flush=True,
+    )
+
+
+def main(argv=None):
+    """Run benchmark from command line."""
+    parser = ArgumentParser(description="Formiko render benchmark")
+    parser.add_argument("--kinds", default=",".join(CORPUS))
+    parser.add_argument("--writers", default=",".join(WRITERS))
+    parser.add_argument("--sizes", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", help="compare with baseline file")
+    parser.add_argument("--save", help="save results as baseline file")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args(argv)
+
+    print(  # noqa: T201
+        f"{'kind':5} {'writer':6} {'size':>6} {'cold':>13} {'min':>13}"
+        f" {'median':>13} {'peak':>12} {'output':>14}",
+    )
+    results = run(
+        args.kinds.split(","),
+        args.writers.split(","),
+        [parse_size(size) for size in args.sizes.split(",")],
+        args.repeat,
+        print_result,
+    )
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as output:
+            dump(results, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline:
+            regressions = compare(results, load(baseline), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")  # noqa: T201
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
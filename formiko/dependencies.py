@@ -0,0 +1,86 @@
+"""Graph of files and directories read by rendered documents.
+
+Documents read other files by ``include`` and ``mdinclude`` directives and
+list directories by ``file-tree`` directive, so they must be rendered again
+when those change. Files really read by a render are recorded by docutils,
+and paths from the directives are added to them, so missing files are
+watched too. Only the directives are scanned for documents which were not
+rendered yet.
+"""
+
+import re
+from os import sep, stat
+from os.path import abspath, dirname, join, normpath
+
+# directives reading other files or directories, with their argument
+RE_DEPENDENCY = re.compile(
+    r"^\s*\.\.\s+(?:include|mdinclude|file-tree)::\s*(\S.*?)\s*$",
+    re.M,
+)
+
+
+def scan_dependencies(path, text):
+    """Return paths, which document *path* with *text* reads."""
+    base = dirname(abspath(path))
+    return {
+        normpath(join(base, match.group(1)))
+        for match in RE_DEPENDENCY.finditer(text)
+        if not match.group(1).startswith("<")  # standard include files
+    }
+
+
+def stamp(paths):
+    """Return {path: [mtime_ns, size]} of *paths*, None for missing ones.
+
+    Stamp of a directory changes when its entries are added or removed.
+    """
+    stamps = {}
+    for path in paths:
+        try:
+            info = stat(path)
+        except OSError:
+            stamps[path] = None
+        else:
+            stamps[path] = [info.st_mtime_ns, info.st_size]
+    return stamps
+
+
+class DependencyGraph:
+    """Files and directories read by each document, by absolute paths."""
+
+    def __init__(self):
+        self.dependencies = {}
+
+    def update(self, document, paths):
+        """Set *paths* read by *document*."""
+        if paths:
+            self.dependencies[abspath(document)] = frozenset(paths)
+        else:
+            self.dependencies.pop(abspath(document), None)
+
+    def remove(self, document):
+        """Forget removed *document*."""
+        self.dependencies.pop(abspath(document), None)
+
+    def dependents(self, paths):
+        """Return documents, which read some of *paths*, even indirectly.
+
+        Document depends on a path, when it reads the path, or the directory
+        containing the path.
+        """
+        changed = {abspath(path) for path in paths}
+        found = set()
+        while changed:
+            new = {
+                document
+                for document, dependencies in self.dependencies.items()
+                if document not in found
+                and any(
+                    path == dependency or path.startswith(dependency + sep)
+                    for path in changed
+                    for dependency in dependencies
+                )
+            }
+            found |= new
+            changed = new
+        return found
@@ -9,6 +9,7 @@ from docutils.parsers.rst import Directive
 from docutils.parsers.rst import Parser as RstParser
 from docutils.parsers.rst import directives as rst_directives
 
+from formiko.md_blocks import BlockCache
 from formiko.utils import Undefined
 
 try:
@@ -20,7 +21,8 @@ except ImportError:
 
 
 try:
-    from m2r2 import MdInclude  # type: ignore[import]
+    from m2r2 import PROLOG as M2R_PROLOG  # type: ignore[import]
+    from m2r2 import MdInclude
     from m2r2 import convert as m2r_convert
 
     class _M2RConfig:
@@ -48,14 +50,22 @@ try:
 
     rst_directives.register_directive("mdinclude", StandaloneMdInclude)
 
+    # converted blocks of MarkDown documents in this process
+    M2R_BLOCKS = BlockCache(m2r_convert, M2R_PROLOG)
+
     class Mark2Resturctured(RstParser):
         """Converting from MarkDown to reStructuredText before parse."""
 
         def parse(self, inputstring, document):
-            """Create RST from MD first and call than parse."""
-            return super().parse(m2r_convert(inputstring), document)
+            """Create RST from MD first and call than parse.
+
+            Only changed blocks of MarkDown are converted, see
+            ``formiko.md_blocks``.
+            """
+            return super().parse(M2R_BLOCKS.convert(inputstring), document)
 
 except ImportError:
+    M2R_BLOCKS = None
 
     class Mark2Resturctured(Undefined):  # type: ignore[no-redef]
         """Not imported Mark2Resturctured."""
@@ -94,6 +104,8 @@ class FileTreeDirective(Directive):
         path = os.path.normpath(
             os.path.join(source_dir, self.arguments[0]),
         )
+        # the tree is rendered again, when the directory is created
+        self.state.document.settings.record_dependencies.add(path)
 
         if not os.path.isdir(path):
             return [
@@ -206,6 +218,7 @@ class FileTreeDirective(Directive):
         if current_depth >= depth:
             return None
 
+        self.state.document.settings.record_dependencies.add(dirpath)
         try:
             entries = sorted(
                 os.scandir(dirpath),
@@ -0,0 +1,90 @@
+"""Persistent cache of rendered pages for instant reopen of documents."""
+
+import gzip
+from contextlib import suppress
+from hashlib import blake2b
+from os import makedirs, replace, scandir, unlink, utime
+from os.path import abspath, join
+from tempfile import NamedTemporaryFile
+from traceback import print_exc
+
+from docutils import __version__ as docutils_version
+
+DISK_CACHE_BYTES = 128 * 1024 * 1024  # size of compressed pages on disk
+SUFFIX = ".html.gz"
+
+
+class DiskCache:
+    """Content addressed cache of compressed HTML pages in *directory*.
+
+    Least recently used pages are removed, when the total size of the
+    cache is bigger than *max_bytes*.
+    """
+
+    def __init__(self, directory, max_bytes=DISK_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(src, parser, writer, style="", tab_width=8, *, file_name=None):
+        """Return cache key of *src* rendered by *parser* and *writer*.
+
+        Relative includes and images depend on the source *file_name*, so
+        the same text in another file has another key.
+        """
+        digest = blake2b(src.encode("utf-8"), digest_size=20)
+        path = abspath(file_name) if file_name else None
+        digest.update(
+            repr((parser, writer, style, tab_width, docutils_version, path))
+            .encode("utf-8"),
+        )
+        return digest.hexdigest()
+
+    def path(self, key):
+        """Return file path of cached page."""
+        return join(self.directory, key + SUFFIX)
+
+    def get(self, key):
+        """Return cached html or None."""
+        path = self.path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as cached:
+                html = cached.read()
+            utime(path)  # mtime is the last access time for eviction
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError):
+            print_exc()
+            return None
+        return html
+
+    def put(self, key, html):
+        """Store *html* to cache and evict old pages."""
+        try:
+            makedirs(self.directory, exist_ok=True)
+            with NamedTemporaryFile(
+                dir=self.directory,
+                suffix=".tmp",
+                delete=False,
+            ) as tmp:
+                tmp.write(gzip.compress(html.encode("utf-8"), 6))
+            replace(tmp.name, self.path(key))
+            self.evict()
+        except OSError:
+            print_exc()
+
+    def evict(self):
+        """Remove least recently used pages over the size limit."""
+        pages = []
+        with scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(SUFFIX):
+                    stat = entry.stat()
+                    pages.append((stat.st_mtime, stat.st_size, entry.path))
+        size = sum(page[1] for page in pages)
+        for _, page_size, path in sorted(pages):
+            if size <= self.max_bytes:
+                break
+            with suppress(FileNotFoundError):
+                unlink(path)
+            size -= page_size
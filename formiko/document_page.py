@@ -4,6 +4,7 @@ import re
 import threading
 from os import stat
 from os.path import basename, dirname, splitext
+from time import monotonic
 from traceback import print_exc
 
 from gi import get_required_version
@@ -13,6 +14,7 @@ from formiko.editor import EditorType
 from formiko.editor_actions import EditorActionGroup
 from formiko.formatting_actions import FormattingActionGroup
 from formiko.renderer import EXTS, Renderer
+from formiko.scheduler import RenderScheduler
 from formiko.sourceview import SourceView
 from formiko.user import UserPreferences, View
 from formiko.widgets import ImutableDict
@@ -23,6 +25,8 @@ if get_required_version("Vte"):
 RE_WORD = re.compile(r"([\w]+)", re.U)
 RE_CHAR = re.compile(r'[\w \t\.,\?\(\)"\']', re.U)
 
+SCROLL_SYNC_PAUSE = 0.3  # editor scroll is not synced after preview scroll
+
 
 class DocumentPage(Gtk.Box):
     """Per-tab widget: editor + renderer + per-file state."""
@@ -34,6 +38,10 @@ class DocumentPage(Gtk.Box):
         "words-count-changed": (
             GObject.SignalFlags.RUN_FIRST, None, (int, int),
         ),
+        # Emitted after the render is shown, with its time in seconds.
+        "render-timed": (GObject.SignalFlags.RUN_FIRST, None, (float,)),
+        # Emitted with (index, count) of the current match in preview.
+        "search-matches": (GObject.SignalFlags.RUN_FIRST, None, (int, int)),
     })
 
     def __init__(self, window, editor_type: EditorType, file_name=""):
@@ -51,6 +59,10 @@ class DocumentPage(Gtk.Box):
         self.running = True
         self._words_count = 0
         self._chars_count = 0
+        self._scheduler = RenderScheduler()
+        self._preview_scrolled = 0  # monotonic time of the last user scroll
+        self.hibernated = False  # editor text and preview are dropped
+        self._refreshing = True  # _check_in_thread loop is running
 
         self._create_renderer()
 
@@ -79,6 +91,17 @@ class DocumentPage(Gtk.Box):
         if win_prefs.custom_style and win_prefs.style:
             self.renderer.set_style(win_prefs.style)
         self.renderer.set_tab_width(self.preferences.editor.tab_width)
+        self.renderer.incremental = win_prefs.incremental_preview
+        self.renderer.lazy_layout = win_prefs.lazy_layout
+        self.renderer.connect(
+            "render-timed",
+            lambda _renderer, total: self.emit("render-timed", total),
+        )
+        self.renderer.connect("line-scrolled", self._on_preview_scrolled)
+        self.renderer.connect(
+            "search-matches",
+            lambda _renderer, *args: self.emit("search-matches", *args),
+        )
 
     def _create_editor_layout(self, file_name):
         ext = splitext(file_name)[1] if file_name else ""
@@ -156,6 +179,7 @@ class DocumentPage(Gtk.Box):
         self.renderer.src = text
         self.renderer.file_name = self.editor.file_path
         self.renderer.pos = self.editor.position
+        self.renderer.show_cached()
         self._words_count = sum(1 for _ in RE_WORD.finditer(text))
         self._chars_count = sum(1 for _ in RE_CHAR.finditer(text))
 
@@ -184,9 +208,24 @@ class DocumentPage(Gtk.Box):
         self.emit("doc-state-changed")
 
     def _on_scroll_changed(self, _widget, position):
-        if self._window.preferences.auto_scroll:
+        if not self._window.preferences.auto_scroll:
+            return
+        if monotonic() - self._preview_scrolled < SCROLL_SYNC_PAUSE:
+            return  # editor follows the preview
+        if self.editor_type == EditorType.SOURCE:
+            line = self.editor.line_at(position)
+            self.renderer.scroll_to_line(line, position)
+        else:
             self.renderer.scroll_to_position(position)
 
+    def _on_preview_scrolled(self, _renderer, line, position):
+        if (
+            self._window.preferences.auto_scroll
+            and self.editor_type == EditorType.SOURCE
+        ):
+            self._preview_scrolled = monotonic()
+            self.editor.scroll_to_line(line, position)
+
     @property
     def words_count(self):
         """Word count, updated each render cycle."""
@@ -227,6 +266,9 @@ class DocumentPage(Gtk.Box):
         """Periodic refresh dispatcher."""
         if not self.running:
             return False
+        if self.hibernated:
+            self._refreshing = False  # restarted by restore
+            return False
         if self.editor_type == EditorType.VIM:
             threading.Thread(
                 target=self._refresh_from_vim,
@@ -239,19 +281,41 @@ class DocumentPage(Gtk.Box):
             GLib.idle_add(self._refresh_from_file, force)
         return False
 
+    def _due_render(self, now, force=False):
+        """Return (due, draft) of render at *now*.
+
+        Decisions are based on the time of the last full render. Draft
+        shown while typing is rendered fully here, when the source is idle.
+        """
+        render_time = self.renderer.timings.last
+        if force or self._scheduler.due(now, render_time):
+            draft = not force and self._scheduler.draft(render_time)
+            self._scheduler.rendered(draft)
+            return True, draft
+        if self._scheduler.full_due(now):
+            self._scheduler.rendered()
+            self.renderer.render_idle()
+        return False, False
+
     def _refresh_from_source(self, force=False):
         """Refresh the renderer from the SourceView buffer."""
         try:
+            now = monotonic()
             last_changes = self.editor.changes
-            if force or last_changes > self._last_changes:
+            if last_changes > self._last_changes:
                 self._last_changes = last_changes
+                self._scheduler.changed(now)
+            due, draft = self._due_render(now, force)
+            if due:
                 text = self.editor.text
+                visible = self.editor.get_visible()
                 self._words_count = sum(1 for _ in RE_WORD.finditer(text))
                 self._chars_count = sum(1 for _ in RE_CHAR.finditer(text))
                 self.renderer.render(
                     text,
                     self.editor.file_path,
-                    self.editor.position,
+                    self.editor.position if visible else None,
+                    draft,
                 )
                 self.emit(
                     "words-count-changed",
@@ -276,9 +340,13 @@ class DocumentPage(Gtk.Box):
                 GLib.idle_add(self.emit, "doc-state-changed")
             if not self.running:
                 return
+            now = monotonic()
             last_changes = self.editor.get_vim_changes()
-            if force or last_changes > self._last_changes or another_file:
+            if last_changes > self._last_changes:
                 self._last_changes = last_changes
+                self._scheduler.changed(now)
+            due, draft = self._due_render(now, force or another_file)
+            if due:
                 if not self.running:
                     return
                 lines = self.editor.get_vim_lines()
@@ -288,7 +356,7 @@ class DocumentPage(Gtk.Box):
                 if not self.running:
                     return
                 pos = self.editor.get_vim_scroll_pos(lines)
-                self.renderer.render(buff, file_path, pos)
+                self.renderer.render(buff, file_path, pos, draft)
             GLib.timeout_add(100, self._check_in_thread)
         except BaseException:  # pylint: disable=broad-exception-caught
             print_exc()
@@ -301,15 +369,51 @@ class DocumentPage(Gtk.Box):
                 self._last_changes = last_changes
                 with open(self._preview_file, encoding="utf-8") as src:
                     buff = src.read()
-                    self.renderer.render(
-                        buff,
-                        self._preview_file,
-                        self.renderer.position,
-                    )
+                    self.renderer.render(buff, self._preview_file, None)
         except BaseException:  # pylint: disable=broad-exception-caught
             print_exc()
         GLib.timeout_add(500, self._check_in_thread)
 
+    @property
+    def can_hibernate(self):
+        """True when the tab could drop its editor text and preview.
+
+        Vim keeps its own buffer, and modified text is never dropped.
+        """
+        if not self.running or self.hibernated:
+            return False
+        if self.editor_type == EditorType.VIM:
+            return False
+        if self.editor_type == EditorType.SOURCE:
+            return self.editor.can_hibernate
+        return True
+
+    def hibernate(self):
+        """Stop refresh loops, drop the preview and compress editor text.
+
+        Return True, when the tab hibernates.
+        """
+        if not self.can_hibernate:
+            return False
+        self.hibernated = True
+        if self.editor_type == EditorType.SOURCE:
+            self.editor.hibernate()
+        self.renderer.hibernate()
+        return True
+
+    def restore(self):
+        """Restore the hibernated tab and render it again."""
+        if not self.hibernated:
+            return
+        self.hibernated = False
+        if self.editor_type == EditorType.SOURCE:
+            self.editor.restore()
+        if not self._refreshing:
+            self._refreshing = True
+            self._check_in_thread(True)
+
     def stop(self):
         """Stop the refresh loop."""
         self.running = False
+        self.renderer.persist_output()
+        self.renderer.close()
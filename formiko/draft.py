@@ -0,0 +1,70 @@
+"""Draft render profile for preview while typing.
+
+Draft render parses the document same as the full render, but applies only
+transforms needed for the document structure. References, footnotes, table
+of contents and section numbers are not resolved, and system messages are
+not reported at all. Draft page is shown only until the full render of the
+same source is done, when the user stops typing.
+"""
+
+from docutils import nodes
+from docutils.transforms import Transform, parts, references, universal
+
+DRAFT_REPORT_LEVEL = 5  # higher than any system message
+AUTO_LABEL = "#"  # auto numbered footnotes are not numbered
+
+# transforms, which are not applied to draft document
+DRAFT_SKIPPED = frozenset(
+    (
+        references.AnonymousHyperlinks,
+        references.IndirectHyperlinks,
+        references.Footnotes,
+        references.ExternalTargets,
+        references.InternalTargets,
+        references.DanglingReferences,
+        references.TargetNotes,
+        parts.Contents,
+        parts.SectNum,
+        universal.Validate,
+        universal.SmartQuotes,
+        universal.Messages,
+        universal.FilterMessages,
+    ),
+)
+
+
+class DraftCleanup(Transform):
+    """Make draft document writable without skipped transforms.
+
+    Not resolved references link to ids made from their names, and auto
+    numbered footnotes get ``#`` label. Pending elements of skipped
+    transforms and system messages are removed.
+    """
+
+    default_priority = 880  # after all kept transforms
+
+    def apply(self):
+        """Clean up the draft document."""
+        for node in list(self.document.findall(nodes.pending)):
+            node.parent.remove(node)
+        for node in list(self.document.findall(nodes.system_message)):
+            node.parent.remove(node)
+        for node in self.document.findall(nodes.Referential):
+            if "refuri" not in node and "refid" not in node:
+                node["refid"] = nodes.make_id(node.get("refname", ""))
+        for node in self.document.findall(nodes.footnote_reference):
+            if not node.children:
+                node.append(nodes.Text(AUTO_LABEL))
+        for node in self.document.findall(nodes.footnote):
+            if not node.children or not isinstance(node[0], nodes.label):
+                node.insert(0, nodes.label("", AUTO_LABEL))
+
+
+def draft_transforms(transformer):
+    """Remove skipped transforms from populated *transformer*."""
+    transformer.transforms = [
+        transform
+        for transform in transformer.transforms
+        if transform[1] not in DRAFT_SKIPPED
+    ]
+    transformer.add_transform(DraftCleanup)
@@ -0,0 +1,521 @@
+"""Export of rendered documents to files.
+
+This module doesn't need GTK, so documentation trees could be exported
+headless, in parallel on a process pool::
+
+    formiko-export docs/ html/ --writer html5
+"""
+
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import (
+    BrokenExecutor,
+    ProcessPoolExecutor,
+    as_completed,
+)
+from contextlib import suppress
+from hashlib import blake2b
+from json import dumps, load
+from os import (
+    close,
+    fchmod,
+    fdopen,
+    makedirs,
+    remove,
+    replace,
+    stat,
+    umask,
+    walk,
+)
+from os.path import (
+    abspath,
+    basename,
+    dirname,
+    exists,
+    isfile,
+    join,
+    relpath,
+    splitext,
+)
+from tempfile import mkstemp
+from time import perf_counter
+
+from formiko.dependencies import DependencyGraph, scan_dependencies, stamp
+from formiko.directives import Mark2Resturctured
+from formiko.markdown import MarkdownParser
+from formiko.rendering import (
+    RENDER_WORKERS,
+    WRITERS,
+    render_document,
+    render_pool,
+    reset_render_pool,
+)
+from formiko.utils import Undefined
+from formiko.watch import Watcher
+
+EXPORT_CHUNK = 1024 * 1024  # characters written between progress reports
+MANIFEST = ".formiko-export.json"  # sources of exported files
+SLOWEST = 5  # files listed in the timing summary
+SKIPPED = "skipped"  # state of unchanged source
+
+# parsers of exported documents by file extension
+EXTS = {".rst": "rst"}
+if not issubclass(Mark2Resturctured, Undefined):
+    EXTS[".md"] = "m2r"
+elif not issubclass(MarkdownParser, Undefined):
+    EXTS[".md"] = "md"
+
+
+def _file_mode(file_name):
+    """Return permissions of existing *file_name*, or of a new file."""
+    try:
+        return stat(file_name).st_mode & 0o7777
+    except OSError:
+        mask = umask(0)
+        umask(mask)
+        return 0o666 & ~mask
+
+
+def write_atomic(file_name, text, progress=None, chunk_size=EXPORT_CHUNK):
+    """Write *text* to *file_name* through temporary file.
+
+    Text is written in chunks to temporary file in the same directory, which
+    replaces *file_name* when it is complete, so readers never see partial
+    output. *progress* is called with written fraction between chunks, and
+    with 1.0 when the file is replaced.
+    """
+    file_name = abspath(file_name)
+    handle, tmp_name = mkstemp(
+        prefix=f".{basename(file_name)}.",
+        suffix=".tmp",
+        dir=dirname(file_name),
+    )
+    try:
+        fchmod(handle, _file_mode(file_name))
+        with fdopen(handle, "w", encoding="utf-8") as output:
+            handle = None
+            size = len(text)
+            for start in range(0, size, chunk_size):
+                if progress is not None and start:
+                    progress(start / size)
+                output.write(text[start:start + chunk_size])
+        replace(tmp_name, file_name)
+    except BaseException:
+        if handle is not None:
+            close(handle)
+        remove(tmp_name)
+        raise
+    if progress is not None:
+        progress(1.0)
+
+
+def source_files(source, exts=None):
+    """Return sorted paths of documents in *source* directory, relative."""
+    exts = EXTS if exts is None else exts
+    if isfile(source):
+        return [basename(source)] if splitext(source)[1] in exts else []
+    paths = []
+    for root, dirs, files in walk(source):
+        dirs[:] = sorted(name for name in dirs if not name.startswith("."))
+        paths.extend(
+            relpath(join(root, name), source)
+            for name in files
+            if splitext(name)[1] in exts and not name.startswith(".")
+        )
+    return sorted(paths)
+
+
+def output_path(path):
+    """Return relative path of exported *path*."""
+    return splitext(path)[0] + ".html"
+
+
+def digest(data):
+    """Return hash of source *data*."""
+    return blake2b(data, digest_size=16).hexdigest()
+
+
+def file_digest(path):
+    """Return hash of *path* content."""
+    with open(path, "rb") as src:
+        return digest(src.read())
+
+
+class Manifest:
+    """Sources of exported files, stored in the output directory.
+
+    Each entry is [mtime_ns, size, digest, dependencies] of the source,
+    where dependencies is ``formiko.dependencies.stamp`` of files read by
+    the render. Source with the same modification time and size is
+    unchanged, otherwise its digest is compared; it must be exported again
+    when some of its dependencies changed. Entries are valid only for the
+    same export options.
+    """
+
+    def __init__(self, output, options):
+        self.path = join(output, MANIFEST)
+        try:
+            with open(self.path, encoding="utf-8") as manifest:
+                data = load(manifest)
+        except (OSError, ValueError):
+            data = {}
+        self.options = options
+        self.files = data.get("files", {})
+        if data.get("options") != options:
+            self.files = {}
+
+    def unchanged(self, path, info, get_digest):
+        """Return True if source *path* was exported in the same state.
+
+        *info* is stat result of the source, *get_digest* is called only
+        when its modification time or size differs.
+        """
+        dependencies = self.dependencies(path)
+        if dependencies is None:
+            return False
+        entry = self.files[path]
+        if stamp(dependencies) != entry[3]:
+            return False
+        if entry[:2] == [info.st_mtime_ns, info.st_size]:
+            return True
+        if entry[2] != get_digest():
+            return False
+        entry[:2] = [info.st_mtime_ns, info.st_size]  # touched only
+        return True
+
+    def record(self, path, info, data_digest, dependencies):
+        """Store exported source *path* with *info* stat result."""
+        self.files[path] = [
+            info.st_mtime_ns,
+            info.st_size,
+            data_digest,
+            dependencies,
+        ]
+
+    def dependencies(self, path):
+        """Return files read by the last export of *path*, or None."""
+        dependencies = self.files.get(path, [])[3:]  # older entries miss it
+        return set(dependencies[0]) if dependencies else None
+
+    def save(self):
+        """Write the manifest to the output directory."""
+        write_atomic(
+            self.path,
+            dumps({"options": self.options, "files": self.files}, indent=1),
+        )
+
+
+def export_file(  # noqa: PLR0917
+    source,
+    output,
+    parser,
+    writer,
+    style="",
+    tab_width=8,
+    incremental=False,
+):
+    """Export *source* file to *output* file.
+
+    Returns (state, seconds, digest, dependencies), where dependencies is
+    stamp of files read by the render. This function runs in process pool
+    of ``export_tree`` or ``watch_tree``.
+    """
+    start = perf_counter()
+    with open(source, "rb") as src:
+        data = src.read()
+    dependencies = set()
+    state, html, _ = render_document(
+        data.decode("utf-8"),
+        parser,
+        writer,
+        style,
+        tab_width,
+        file_name=source,
+        incremental=incremental,
+        dependencies=dependencies,
+    )
+    makedirs(dirname(output), exist_ok=True)
+    write_atomic(output, html.strip())
+    return state, perf_counter() - start, digest(data), stamp(dependencies)
+
+
+class Result:
+    """Result of exporting one source file."""
+
+    def __init__(self, path, state, seconds=0.0, error=None):
+        self.path = path
+        self.state = state  # True, False or SKIPPED
+        self.seconds = seconds
+        self.error = error
+
+
+def export_tree(  # noqa: PLR0917
+    source,
+    output,
+    writer="html4",
+    style="",
+    tab_width=8,
+    jobs=None,
+    force=False,
+):
+    """Export documents from *source* directory to *output* directory.
+
+    Documents are rendered on a process pool with *jobs* workers. Sources
+    unchanged since the last export, including files they read, are
+    skipped, unless *force* is set. Returns list of Result sorted by path.
+    """
+    root = dirname(source) if isfile(source) else source
+    manifest = Manifest(output, [writer, style, tab_width])
+    results = []
+    futures = {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for path in source_files(source):
+            src = join(root, path)
+            out = join(output, output_path(path))
+            try:
+                info = stat(src)
+                if (
+                    not force
+                    and exists(out)
+                    and manifest.unchanged(
+                        path,
+                        info,
+                        lambda src=src: file_digest(src),
+                    )
+                ):
+                    results.append(Result(path, SKIPPED))
+                    continue
+            except OSError as err:
+                results.append(Result(path, False, error=str(err)))
+                continue
+            future = pool.submit(
+                export_file,
+                src,
+                out,
+                EXTS[splitext(path)[1]],
+                writer,
+                style,
+                tab_width,
+            )
+            futures[future] = (path, info)
+
+        for future in as_completed(futures):
+            path, info = futures[future]
+            manifest.files.pop(path, None)
+            try:
+                state, seconds, data_digest, dependencies = future.result()
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                results.append(Result(path, False, error=str(err)))
+                continue
+            results.append(Result(path, state, seconds))
+            if state:
+                manifest.record(path, info, data_digest, dependencies)
+
+    makedirs(output, exist_ok=True)
+    manifest.save()
+    results.sort(key=lambda result: result.path)
+    return results
+
+
+class Rebuild:
+    """Export documents affected by changed files in the render pool.
+
+    Documents are exported incrementally by warm render pool workers.
+    Documents, which read changed files, are exported too; see
+    ``formiko.dependencies.DependencyGraph``. The graph starts with files
+    recorded in the manifest of ``export_tree``, and it is updated by
+    files read by each export, which are stored to the manifest.
+    """
+
+    def __init__(self, source, output, writer="html4", style="", tab_width=8):
+        self.root = abspath(source)
+        self.output = output
+        self.options = (writer, style, tab_width)
+        self.manifest = Manifest(output, list(self.options))
+        self.graph = DependencyGraph()
+        for path in source_files(self.root):
+            dependencies = self.manifest.dependencies(path)
+            if dependencies is None:
+                self._scan(join(self.root, path))
+            else:
+                self.graph.update(join(self.root, path), dependencies)
+
+    def _scan(self, document):
+        """Update dependencies of *document* from its source."""
+        try:
+            with open(document, encoding="utf-8") as src:
+                text = src.read()
+        except (OSError, ValueError):
+            self.graph.remove(document)
+            return
+        self.graph.update(document, scan_dependencies(document, text))
+
+    def warm_up(self):
+        """Start render pool workers with the publisher of options."""
+        for _ in range(RENDER_WORKERS):
+            render_pool().submit(render_document, "", "rst", *self.options)
+
+    def documents(self, paths):
+        """Return documents to export after *paths* were changed."""
+        changed = {
+            path for path in paths
+            if splitext(path)[1] in EXTS
+            and not relpath(path, self.root).startswith(("..", "."))
+        }
+        for document in changed:
+            self._scan(document)
+        return changed | self.graph.dependents(paths)
+
+    def outside(self):
+        """Return files and directories outside the tree read by documents."""
+        return {
+            path
+            for dependencies in self.graph.dependencies.values()
+            for path in dependencies
+            if relpath(path, self.root).startswith("..")
+        }
+
+    def __call__(self, paths):
+        """Export documents affected by changed *paths* and print times."""
+        start = perf_counter()
+        futures = {}
+        lines = []
+        for document in sorted(self.documents(paths)):
+            path = relpath(document, self.root)
+            out = join(self.output, output_path(path))
+            self.manifest.files.pop(path, None)
+            try:
+                info = stat(document)
+            except OSError:
+                self.graph.remove(document)
+                if exists(out):
+                    remove(out)
+                lines.append(f"  {'removed':>12}  {path}")
+                continue
+            args = (document, out, EXTS[splitext(path)[1]], *self.options)
+            try:
+                future = render_pool().submit(
+                    export_file,
+                    *args,
+                    incremental=True,
+                )
+            except (BrokenExecutor, RuntimeError):
+                reset_render_pool()
+                future = render_pool().submit(
+                    export_file,
+                    *args,
+                    incremental=True,
+                )
+            futures[future] = (document, path, info)
+
+        for future, (document, path, info) in futures.items():
+            try:
+                state, seconds, data_digest, dependencies = future.result()
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                lines.append(f"  {'FAILED':>12}  {path}: {err}")
+                continue
+            self.graph.update(document, dependencies)
+            if state:
+                self.manifest.record(path, info, data_digest, dependencies)
+            mark = "" if state else " (render error)"
+            lines.append(f"  {seconds * 1000:9.1f} ms  {path}{mark}")
+        if lines:
+            makedirs(self.output, exist_ok=True)
+            self.manifest.save()
+            lines.append(
+                f"{len(lines)} files in"
+                f" {(perf_counter() - start) * 1000:.1f} ms",
+            )
+            print("\n".join(lines), flush=True)  # noqa: T201
+
+
+def watch_tree(source, output, writer="html4", style="", tab_width=8):
+    """Export changed documents from *source* until interrupted."""
+    rebuild = Rebuild(source, output, writer, style, tab_width)
+    rebuild.warm_up()
+    print(f"watching {rebuild.root}", flush=True)  # noqa: T201
+    with suppress(KeyboardInterrupt):
+        Watcher(
+            source,
+            rebuild,
+            skip=[output],
+            outside=rebuild.outside,
+        ).run()
+
+
+def print_summary(results, seconds, slowest=SLOWEST):
+    """Print timing summary of export *results* taking *seconds*."""
+    exported = [result for result in results if result.state is not SKIPPED]
+    failed = [result for result in results if not result.state]
+    lines = [
+        f"FAILED {result.path}: {result.error or 'render error'}"
+        for result in failed
+    ]
+    if exported:
+        lines.append("slowest:")
+        lines.extend(
+            f"  {result.seconds * 1000:9.1f} ms  {result.path}"
+            for result in sorted(exported, key=lambda r: -r.seconds)[:slowest]
+        )
+    render_time = sum(result.seconds for result in exported)
+    lines.append(
+        f"{len(results)} files: {len(exported) - len(failed)} exported,"
+        f" {len(results) - len(exported)} skipped, {len(failed)} failed"
+        f" in {seconds:.2f} s (render time {render_time:.2f} s)",
+    )
+    print("\n".join(lines))  # noqa: T201
+
+
+def main(argv=None):
+    """Export documents from command line without GTK."""
+    parser = ArgumentParser(
+        prog="formiko-export",
+        description="Export reStructuredText and MarkDown documents to HTML",
+    )
+    parser.add_argument("source", help="source directory or file")
+    parser.add_argument("output", help="output directory")
+    parser.add_argument("--writer", default="html4", choices=list(WRITERS))
+    parser.add_argument("--style", default="", help="custom stylesheet")
+    parser.add_argument("--tab-width", type=int, default=8)
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of render processes, CPU count by default",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="export unchanged sources too",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="then export changed documents until interrupted",
+    )
+    args = parser.parse_args(argv)
+
+    start = perf_counter()
+    results = export_tree(
+        args.source,
+        args.output,
+        args.writer,
+        args.style,
+        args.tab_width,
+        args.jobs,
+        args.force,
+    )
+    print_summary(results, perf_counter() - start)
+    if args.watch:
+        watch_tree(
+            args.source,
+            args.output,
+            args.writer,
+            args.style,
+            args.tab_width,
+        )
+    return 1 if any(not result.state for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
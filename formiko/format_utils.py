@@ -415,6 +415,15 @@ def compute_toggle_ordered(
     return new_text, insert_blank
 
 
+#: Parsers formatted with the markup of other parser.
+MARKUP_ALIASES = {"md": "m2r"}  # both parse MarkDown
+
+
+def markup_parser(parser: str) -> str:
+    """Return the parser, whose markup is used for *parser*."""
+    return MARKUP_ALIASES.get(parser, parser)
+
+
 # ===================================================================
 # Link formatting
 # ===================================================================
@@ -425,6 +434,7 @@ def compute_link(text: str, url: str, parser: str) -> str:
     For HTML: uses *text* as inner content when provided, falls back to *url*.
     For RST/Markdown: returns bare *url* when *text* is empty.
     """
+    parser = markup_parser(parser)
     if parser == "html":
         inner = text.strip() or url
         return f'<a href="{url}">{inner}</a>'
@@ -446,6 +456,7 @@ def parse_link(selected_text: str, parser: str) -> "tuple[str, str]":
     looks like a bare URL it is placed in the *URL* field instead.
     """
     stripped = selected_text.strip()
+    parser = markup_parser(parser)
     if parser == "m2r":
         m = _re.match(r"^\[([^\]]*)\]\(([^)]+)\)$", stripped)
         if m:
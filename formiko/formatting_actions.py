@@ -9,6 +9,7 @@ from formiko.format_utils import (
     RST_HEADER_CHARS,
     build_known_formats,
     compute_link,
+    markup_parser,
 )
 from formiko.widgets import IconButton
 
@@ -117,7 +118,7 @@ class FormattingActionGroup(Gio.SimpleActionGroup):
         self._renderer = renderer
         self._editor_pref = preferences.editor
 
-        is_markup = parser in FORMATTING_PARSERS
+        is_markup = markup_parser(parser) in FORMATTING_PARSERS
         self._actions: dict[str, Gio.SimpleAction] = {}
 
         for name, _icon, _tooltip, markup_dict in self._INLINE_DEFS:
@@ -171,7 +172,7 @@ class FormattingActionGroup(Gio.SimpleActionGroup):
 
     def set_parser(self, parser: str) -> None:
         """Enable or disable all formatting actions for *parser*."""
-        is_markup = parser in FORMATTING_PARSERS
+        is_markup = markup_parser(parser) in FORMATTING_PARSERS
         for action in self._actions.values():
             action.set_enabled(is_markup)
 
@@ -268,7 +269,7 @@ class FormattingActionGroup(Gio.SimpleActionGroup):
     def _make_inline_handler(self, markup_dict):
         """Return an activate callback for an inline format action."""
         def handler(_action, *_params):
-            parser = self._renderer.get_parser()
+            parser = markup_parser(self._renderer.get_parser())
             before, after = markup_dict[parser]
             known = self._KNOWN_FORMATS.get(parser, [])
             self._editor.toggle_format(before, after, known)
@@ -277,7 +278,7 @@ class FormattingActionGroup(Gio.SimpleActionGroup):
     def _make_block_handler(self, markup_dict):
         """Return an activate callback for a block format action."""
         def handler(_action, *_params):
-            parser = self._renderer.get_parser()
+            parser = markup_parser(self._renderer.get_parser())
             fmt = markup_dict[parser]
             if callable(fmt):
                 before, after = fmt(self._editor_pref)
@@ -314,7 +315,7 @@ class FormattingActionGroup(Gio.SimpleActionGroup):
 
     def _on_header_level(self, level: int) -> None:
         """Activate callback for the ``header-N`` actions."""
-        parser = self._renderer.get_parser()
+        parser = markup_parser(self._renderer.get_parser())
 
         if parser == "rst":
             self._editor.toggle_rst_header(RST_HEADER_CHARS[level - 1])
@@ -350,7 +351,7 @@ class FormattingActionGroup(Gio.SimpleActionGroup):
 
     def _on_bullet(self, _action, *_params) -> None:
         """Activate callback for the ``bullet`` action."""
-        parser = self._renderer.get_parser()
+        parser = markup_parser(self._renderer.get_parser())
 
         if parser == "rst":
             self._editor.toggle_bullet(
@@ -369,7 +370,7 @@ class FormattingActionGroup(Gio.SimpleActionGroup):
 
     def _on_ordered(self, _action, *_params) -> None:
         """Activate callback for the ``ordered`` action."""
-        parser = self._renderer.get_parser()
+        parser = markup_parser(self._renderer.get_parser())
 
         if parser == "rst":
             self._editor.toggle_ordered(
@@ -389,7 +390,7 @@ class FormattingActionGroup(Gio.SimpleActionGroup):
 
     def _on_insert_link(self, _action, *_params) -> None:
         """Activate callback for the ``insert-link`` action."""
-        parser = self._renderer.get_parser()
+        parser = markup_parser(self._renderer.get_parser())
         selected = self._editor.get_selected_text()
         # Capture offsets now — selection will be lost when dialog grabs focus
         start_off, end_off = self._editor.get_selection_offsets()
@@ -0,0 +1,53 @@
+"""Hibernation of idle background tabs.
+
+Background tab, which was not active for some time, drops its preview and
+stops its refresh loops. Only the compressed source of its editor and the
+last rendered page are kept, and the tab is restored when it is activated.
+"""
+
+from zlib import compress, decompress
+
+HIBERNATE_AFTER = 600  # seconds of idle background tab, 0 disables it
+HIBERNATE_CHECK = 30  # seconds between checks of idle tabs
+
+
+class CompressedText:
+    """Text compressed by zlib with cursor offset of the editor."""
+
+    def __init__(self, text, offset=0):
+        self.data = compress(text.encode("utf-8"))
+        self.offset = offset
+
+    @property
+    def text(self):
+        """Return decompressed text."""
+        return decompress(self.data).decode("utf-8")
+
+
+class IdleTabs:
+    """Times since background tabs are idle.
+
+    Tabs are any hashable objects, times are in seconds from a monotonic
+    clock. Tabs idle for *after* seconds are due to hibernate.
+    """
+
+    def __init__(self, after=HIBERNATE_AFTER):
+        self.after = after
+        self.since = {}
+
+    def idle(self, tab, now):
+        """Note that *tab* moved to background at *now*."""
+        self.since.setdefault(tab, now)
+
+    def forget(self, tab):
+        """Forget *tab*, which is active, hibernated or closed."""
+        self.since.pop(tab, None)
+
+    def due(self, now):
+        """Return tabs, which should hibernate at *now*."""
+        if self.after <= 0:
+            return []
+        return [
+            tab for tab, since in self.since.items()
+            if now - since >= self.after
+        ]
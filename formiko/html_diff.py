@@ -0,0 +1,238 @@
+"""Block level diff of rendered HTML body for partial preview updates.
+
+Body HTML is split to a tree of elements by a simple tokenizer, which is
+enough for the well formed output of docutils writers. Diff of two trees
+is a list of patch operations for the ``JS_PATCH`` script in renderer:
+
+* ``[0, path, tag, html]`` replaces element at *path* with *html*,
+* ``[1, path, start, count, length, html]`` replaces *count* children of
+  element at *path* from index *start* with *html*; element must have
+  *length* children.
+
+Path is a list of indexes to ``element.children`` from ``document.body``.
+Children with ``id`` attribute, like docutils sections, are paired by
+their ids, so a section inserted or removed before others does not change
+them. Other children are paired by their positions.
+"""
+
+import re
+
+RE_TOKEN = re.compile(
+    r"<!--.*?-->"
+    r"|<(/?)([a-zA-Z][\w:-]*)((?:\"[^\"]*\"|'[^']*'|[^'\">])*)>",
+    re.S,
+)
+RE_ID = re.compile(r"""\sid\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+
+VOID = frozenset((
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+))
+
+RAW = frozenset(("script", "style", "textarea", "title"))
+
+# elements which children could be patched separately
+CONTAINERS = frozenset((
+    "body", "div", "section", "main", "article", "aside", "nav", "header",
+    "footer", "blockquote", "ul", "ol", "dl",
+))
+
+MAX_PATCH_RATIO = 0.5  # bigger patch is slower than the whole body
+
+
+class Element:
+    """Element of HTML body with offsets to source string."""
+
+    __slots__ = ("children", "close", "end", "id", "open", "start", "tag")
+
+    def __init__(self, tag, start, open_end, element_id=None):
+        self.tag = tag
+        self.id = element_id
+        self.start = start  # start of start tag
+        self.open = open_end  # end of start tag
+        self.close = open_end  # start of end tag
+        self.end = open_end  # end of end tag
+        self.children = []
+
+
+class Body:
+    """Parsed body HTML."""
+
+    def __init__(self, html, root):
+        self.html = html
+        self.root = root
+
+    def outer(self, element):
+        """Return outer HTML of *element*."""
+        return self.html[element.start:element.end]
+
+    def text(self, element):
+        """Return start tag and non white text outside of child elements.
+
+        Text pieces are separated by NUL, so their positions between
+        children are kept; then children can be patched only one by one.
+        """
+        parts = []
+        last = element.open
+        for child in element.children:
+            parts.append(self.html[last:child.start].strip())
+            last = child.end
+        parts.append(self.html[last:element.close].strip())
+        tag = self.html[element.start:element.open]
+        if any(parts):
+            return tag + "\0".join(parts)
+        return tag
+
+
+def parse_body(html):
+    """Return Body tree of *html* or None if it is not well formed."""
+    root = Element("body", 0, 0)
+    stack = [root]
+    pos = 0
+    while True:
+        match = RE_TOKEN.search(html, pos)
+        if match is None:
+            break
+        pos = match.end()
+        closing, tag = match.group(1), match.group(2)
+        if tag is None:  # comment
+            continue
+        tag = tag.lower()
+        if closing:
+            if stack[-1].tag != tag or len(stack) == 1:
+                return None
+            element = stack.pop()
+            element.close = match.start()
+            element.end = pos
+            continue
+        match_id = RE_ID.search(match.group(3))
+        element = Element(
+            tag,
+            match.start(),
+            pos,
+            match_id and (match_id.group(1) or match_id.group(2)),
+        )
+        stack[-1].children.append(element)
+        if tag in RAW:
+            close = html.lower().find(f"</{tag}", pos)
+            end = html.find(">", close)
+            if close < 0 or end < 0:
+                return None
+            element.close, element.end = close, end + 1
+            pos = element.end
+        elif tag not in VOID and not match.group(3).endswith("/"):
+            stack.append(element)
+    if len(stack) != 1:
+        return None
+    root.close = root.end = len(html)
+    return Body(html, root)
+
+
+def _anchors(old_children, new_children):
+    """Return (old_index, new_index) pairs of children with the same id.
+
+    Pairs are in the order of both lists.
+    """
+    old_ids = {}
+    for index, child in enumerate(old_children):
+        if child.id:
+            old_ids.setdefault(child.id, index)
+    pairs = []
+    last = -1
+    for new_index, child in enumerate(new_children):
+        old_index = old_ids.get(child.id) if child.id else None
+        if old_index is not None and old_index > last:
+            pairs.append((old_index, new_index))
+            last = old_index
+    return pairs
+
+
+def _diff_pair(old, new, old_child, new_child, path):
+    """Return operations changing *old_child* at *path* to *new_child*."""
+    if old.outer(old_child) == new.outer(new_child):
+        return []
+    if (
+        old_child.tag == new_child.tag
+        and old_child.tag in CONTAINERS
+        and old.text(old_child) == new.text(new_child)
+    ):
+        return _diff(old, new, old_child, new_child, path)
+    return [[0, path, old_child.tag, new.outer(new_child)]]
+
+
+def _diff(old, new, old_element, new_element, path):
+    """Return operations changing *old_element* children to *new_element*.
+
+    Replacements of children ranges are returned from the last one, so
+    indexes of the others are still valid, when they are applied.
+    """
+    old_children = old_element.children
+    new_children = new_element.children
+    size = min(len(old_children), len(new_children))
+
+    i = 0
+    while i < size and (
+        old.outer(old_children[i]) == new.outer(new_children[i])
+    ):
+        i += 1
+    j = 0
+    while j < size - i and (
+        old.outer(old_children[-1 - j]) == new.outer(new_children[-1 - j])
+    ):
+        j += 1
+
+    old_middle = old_children[i:len(old_children) - j]
+    new_middle = new_children[i:len(new_children) - j]
+    ops = []
+    ranges = []
+    old_start = new_start = 0
+    for old_end, new_end in [
+        *_anchors(old_middle, new_middle),
+        (len(old_middle), len(new_middle)),
+    ]:
+        old_part = old_middle[old_start:old_end]
+        new_part = new_middle[new_start:new_end]
+        if len(old_part) == len(new_part):
+            for index, (old_child, new_child) in enumerate(
+                zip(old_part, new_part, strict=True),
+                i + old_start,
+            ):
+                ops.extend(
+                    _diff_pair(old, new, old_child, new_child, [*path, index]),
+                )
+        else:
+            html = (
+                new.html[new_part[0].start:new_part[-1].end]
+                if new_part
+                else ""
+            )
+            start = i + old_start
+            ranges.append(
+                [1, path, start, len(old_part), len(old_children), html],
+            )
+        if old_end < len(old_middle):  # anchor pair
+            ops.extend(
+                _diff_pair(
+                    old,
+                    new,
+                    old_middle[old_end],
+                    new_middle[new_end],
+                    [*path, i + old_end],
+                ),
+            )
+        old_start, new_start = old_end + 1, new_end + 1
+    return ops + ranges[::-1]
+
+
+def diff_bodies(old, new):
+    """Return list of patch operations from *old* to *new* Body.
+
+    Returns None, when replacing the whole body is better.
+    """
+    if old.text(old.root) != new.text(new.root):
+        return None
+    ops = _diff(old, new, old.root, new.root, [])
+    size = sum(len(op[-1]) for op in ops)
+    if size > len(new.html) * MAX_PATCH_RATIO:
+        return None
+    return ops
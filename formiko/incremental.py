@@ -0,0 +1,305 @@
+"""Section level incremental parsing of reStructuredText documents.
+
+Source is split on top-level section titles. Each section is parsed alone
+to its own document fragment, which is cached by content hash. Registering
+names, ids, targets, footnotes and so on is recorded during the fragment
+parse and replayed on the final document, so transforms and writers get the
+same document tree as from the full parse.
+"""
+
+import re
+from collections import OrderedDict
+from copy import deepcopy
+from hashlib import blake2b
+from traceback import print_exc
+
+from docutils import nodes
+from docutils.parsers.rst import Parser as RstParser
+from docutils.readers.standalone import Reader as StandaloneReader
+from docutils.utils import column_width
+
+CACHE_SIZE = 512  # cached sections
+MIN_UNDERLINE = 4  # shorter underline than title is ignored by docutils
+
+# same as docutils nonalphanum7bit adornment characters
+RE_ADORNMENT = re.compile(r"^([!-/:-@\[-`{-~])\1* *$")
+
+# directives, which change the state of the whole document
+RE_GLOBAL = re.compile(
+    r"^\s*\.\.\s+(default-role|role|title|header|footer)::",
+    re.M,
+)
+
+# directives, which read other files, so their sections are never cached
+RE_VOLATILE = re.compile(
+    r"^\s*\.\.\s+(include|mdinclude|file-tree|raw|csv-table)::",
+    re.M,
+)
+
+# document methods called by the parser, which register nodes
+DEFERRED = (
+    "note_implicit_target",
+    "note_explicit_target",
+    "note_refname",
+    "note_refid",
+    "note_indirect_target",
+    "note_anonymous_target",
+    "note_autofootnote",
+    "note_autofootnote_ref",
+    "note_symbol_footnote",
+    "note_symbol_footnote_ref",
+    "note_footnote",
+    "note_footnote_ref",
+    "note_citation",
+    "note_citation_ref",
+    "note_substitution_def",
+    "note_substitution_ref",
+    "note_pending",
+)
+
+
+def find_titles(lines):
+    """Return list of (line_index, style) for section titles in *lines*.
+
+    Style is (character, overline) tuple like docutils uses. Only titles
+    starting in the first column after blank line are found, which is
+    enough for the top-level section boundaries.
+    """
+    titles = []
+    i = 0
+    count = len(lines)
+    while i < count - 1:
+        if i and lines[i - 1].strip():
+            i += 1
+            continue
+        line = lines[i]
+        match = RE_ADORNMENT.match(line)
+        if match and i < count - 2 and lines[i + 1].strip():
+            under = RE_ADORNMENT.match(lines[i + 2])
+            if under and lines[i + 2].rstrip() == line.rstrip():
+                titles.append((i, (match.group(1), True)))
+                i += 3
+                continue
+        if line.strip() and not line[0].isspace() and not match:
+            under = RE_ADORNMENT.match(lines[i + 1])
+            length = len(lines[i + 1].rstrip())
+            if under and length >= min(MIN_UNDERLINE, column_width(line)):
+                titles.append((i, (under.group(1), False)))
+                i += 2
+                continue
+        i += 1
+    return titles
+
+
+def split_sections(text):
+    """Split *text* to list of (first_line, text) top-level sections.
+
+    When the first title style is used only once, like for the document
+    title, text is split on the next title style, and the first section is
+    returned as the parent of all others in the second item of the result.
+    Returns None when section levels of any part would differ from levels
+    in the whole document.
+    """
+    lines = text.splitlines()
+    titles = find_titles(lines)
+    styles = []  # title styles order in the whole document
+    for _, style in titles:
+        if style not in styles:
+            styles.append(style)
+    if not styles:
+        return [(0, text)], False
+
+    nested = len(styles) > 1 and [x[1] for x in titles].count(styles[0]) == 1
+    top = styles[1] if nested else styles[0]
+    starts = [0] + [i for i, style in titles if style == top and i]
+    ends = [*starts[1:], len(lines)]
+    sections = []
+    for start, end in zip(starts, ends, strict=True):
+        order = []
+        for i, style in titles:
+            if start <= i < end and style not in order:
+                order.append(style)
+        expected = styles[1:] if nested and start else styles
+        if order != expected[: len(order)]:
+            return None
+        sections.append((start, "\n".join(lines[start:end]) + "\n"))
+    return sections, nested
+
+
+class Fragment:
+    """Parsed section with recorded document registrations."""
+
+    def __init__(self, document, calls):
+        self.document = document
+        self.children = list(document.children)
+        self.calls = calls
+
+
+def parse_fragment(parser, text, document):
+    """Parse *text* into empty *document* and return Fragment.
+
+    Registration methods are only recorded, ``set_id`` is recorded and
+    called too, because the parser uses its return value.
+    """
+    calls = []
+
+    def deferred(name):
+        def record(*args, **kwargs):
+            calls.append((name, args, kwargs))
+
+        return record
+
+    set_id = document.set_id
+
+    def record_set_id(*args, **kwargs):
+        calls.append(("set_id", args, kwargs))
+        return set_id(*args, **kwargs)
+
+    for name in DEFERRED:
+        setattr(document, name, deferred(name))
+    document.set_id = record_set_id
+    parser.parse(text, document)
+    for name in DEFERRED:
+        delattr(document, name)
+    del document.set_id
+    return Fragment(document, calls)
+
+
+def splice_fragment(document, fragment, line_offset, parent=None):
+    """Append copy of *fragment* to *document* and replay registrations.
+
+    Fragment nodes are appended to *parent* node if it is set. Only lines
+    of nodes from the *document* source are moved by *line_offset*, lines
+    of nodes from included files are right.
+    """
+    children, calls = deepcopy(
+        (fragment.children, fragment.calls),
+        {id(fragment.document): document},
+    )
+    (document if parent is None else parent).extend(children)
+
+    # ids from the fragment parse are created again in this document
+    assigned = [args[0] for name, args, _ in calls if name == "set_id"]
+    old_ids = [node["ids"] for node in assigned]
+    for node in assigned:
+        node["ids"] = []
+    for name, args, kwargs in calls:
+        getattr(document, name)(*args, **kwargs)
+
+    ids = {}
+    for node, node_ids in zip(assigned, old_ids, strict=True):
+        ids.update(dict.fromkeys(node_ids, node["ids"][0]))
+
+    source = document["source"]
+    for child in children:
+        for node in child.findall(nodes.Element):
+            if line_offset and node.get("source", node.source) in (
+                None,
+                source,
+            ):
+                _move_lines(node, line_offset)
+            if node.get("refid") in ids:
+                node["refid"] = ids[node["refid"]]
+            if node.get("backrefs"):
+                node["backrefs"] = [ids.get(x, x) for x in node["backrefs"]]
+
+
+def _move_lines(node, line_offset):
+    """Add *line_offset* to source line and line attribute of *node*."""
+    if node.line is not None:
+        node.line += line_offset
+    if isinstance(node.get("line"), int):
+        node["line"] += line_offset
+
+
+class SectionCache:
+    """Bounded LRU cache of parsed top-level sections."""
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.fragments = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, text, document):
+        """Return cache key for section *text* parsed to *document*."""
+        settings = document.settings
+        digest = blake2b(text.encode("utf-8"), digest_size=16)
+        digest.update(repr((settings.tab_width, document["source"])).encode())
+        return digest.hexdigest()
+
+    def fragment(self, parser, text, new_document):
+        """Return parsed Fragment of section *text*, cached when possible."""
+        document = new_document()
+        if RE_VOLATILE.search(text):
+            return parse_fragment(parser, text, document)
+
+        key = self.key(text, document)
+        fragment = self.fragments.get(key)
+        if fragment is not None:
+            self.hits += 1
+            self.fragments.move_to_end(key)
+            return fragment
+
+        self.misses += 1
+        fragment = parse_fragment(parser, text, document)
+        self.fragments[key] = fragment
+        while len(self.fragments) > self.size:
+            self.fragments.popitem(last=False)
+        return fragment
+
+    def clear(self):
+        """Remove all cached sections."""
+        self.fragments.clear()
+
+    def splice(self, parser, sections, nested, new_document):
+        """Return new document spliced from parsed *sections*."""
+        document = new_document()
+        parent = None
+        for offset, section in sections:
+            fragment = self.fragment(parser, section, new_document)
+            splice_fragment(document, fragment, offset, parent)
+            if nested and parent is None:
+                parent = document[-1]
+                if not isinstance(parent, nodes.section):
+                    msg = "First section is not the parent section"
+                    raise TypeError(msg)
+        return document
+
+    def parse(self, parser, text, new_document):
+        """Return new document parsed from *text* section by section.
+
+        Falls back to parsing the whole text, when the document can't be
+        split safely.
+        """
+        split = None if RE_GLOBAL.search(text) else split_sections(text)
+        if split is not None:
+            try:
+                return self.splice(parser, *split, new_document)
+            except Exception:  # pylint: disable=broad-exception-caught
+                print_exc()  # full parse below is always right
+
+        document = new_document()
+        parser.parse(text, document)
+        return document
+
+
+class IncrementalReader(StandaloneReader):
+    """Standalone reader, which parses only changed sections."""
+
+    def __init__(self, parser, cache):
+        super().__init__(parser=parser)
+        self.cache = cache
+
+    def parse(self):
+        """Parse ``self.input`` into a document tree."""
+        if type(self.parser) is RstParser:
+            self.document = self.cache.parse(
+                self.parser,
+                self.input,
+                self.new_document,
+            )
+        else:
+            self.document = self.new_document()
+            self.parser.parse(self.input, self.document)
+        self.document.current_source = self.document.current_line = None
@@ -0,0 +1,69 @@
+"""Lazy layout of off-screen preview sections.
+
+Top-level sections of the preview get ``content-visibility: auto`` style,
+so WebKit lays out and paints only sections near the visible part of the
+page. Sections which were not shown yet keep the estimated height of their
+content by ``contain-intrinsic-size``, and their real height after they
+were shown once, so the scroll height of the page stays stable.
+"""
+
+from math import ceil
+
+from docutils import nodes
+
+LINE_HEIGHT = 20  # px of one text line in writer stylesheets
+LINE_CHARS = 90  # characters of one wrapped text line
+BLOCK_MARGIN = 16  # px around each text block
+
+# writers, which make slides from top-level sections
+SLIDE_WRITERS = ("s5",)
+
+
+def estimate_height(section):
+    """Return estimated height of *section* on the page in pixels."""
+    lines = 0
+    blocks = 0
+    for node in section.findall(nodes.TextElement):
+        if isinstance(node, nodes.Inline):
+            continue  # part of its block
+        blocks += 1
+        text = node.astext()
+        if isinstance(node, nodes.FixedTextElement):
+            lines += text.count("\n") + 1
+        else:
+            lines += ceil(len(text) / LINE_CHARS) or 1
+    return lines * LINE_HEIGHT + blocks * BLOCK_MARGIN
+
+
+def section_style(section):
+    """Return style attribute deferring layout of *section*."""
+    return (
+        "content-visibility:auto;"
+        f"contain-intrinsic-size:auto {estimate_height(section)}px"
+    )
+
+
+def lazy_layout_translator(translator):
+    """Return subclass of HTML *translator* deferring layout of sections.
+
+    Top-level sections get the style only when ``lazy_layout`` setting is
+    true.
+    """
+    if getattr(translator, "lazy_layout", False):
+        return translator
+
+    class LazyLayoutTranslator(translator):
+        lazy_layout = True
+
+        def starttag(self, node, tagname, *args, **attributes):
+            if (
+                getattr(self.settings, "lazy_layout", False)
+                and isinstance(node, nodes.section)
+                and isinstance(node.parent, nodes.document)
+            ):
+                attributes["style"] = section_style(node)
+            return super().starttag(node, tagname, *args, **attributes)
+
+    LazyLayoutTranslator.__name__ = translator.__name__
+    LazyLayoutTranslator.__qualname__ = translator.__qualname__
+    return LazyLayoutTranslator
@@ -0,0 +1,74 @@
+"""Map between source lines and the rendered preview.
+
+HTML translators of docutils writers are extended to emit ``data-line``
+attributes with source line numbers of block elements, so editor and
+preview positions could be paired exactly. ``LineIndex`` converts offsets
+and scroll ratios of the source to lines by binary search.
+"""
+
+from bisect import bisect_right
+from itertools import accumulate
+
+from docutils import nodes
+
+# nodes with useful line numbers, which start a block on the page
+LINE_NODES = (nodes.Body, nodes.title)
+
+
+class LineIndex:
+    """Offsets of line starts in source. Lines are numbered from 1."""
+
+    def __init__(self, src):
+        ends = list(accumulate(len(line) for line in src.splitlines(True)))
+        self.starts = [0, *ends[:-1]]
+
+    @property
+    def count(self):
+        """Return number of lines."""
+        return len(self.starts)
+
+    def line(self, offset):
+        """Return line of character *offset*."""
+        return max(bisect_right(self.starts, offset), 1)
+
+    def offset(self, line):
+        """Return offset of the first character of *line*."""
+        return self.starts[min(max(line, 1), self.count) - 1]
+
+    def line_at(self, ratio):
+        """Return line at *ratio* of the source from 0 to 1."""
+        ratio = min(max(ratio, 0), 1)
+        return 1 + round(ratio * (self.count - 1))
+
+    def ratio(self, line):
+        """Return ratio of *line* in the source, inverse to ``line_at``."""
+        if self.count < 2:  # noqa: PLR2004
+            return 0.0
+        return (min(max(line, 1), self.count) - 1) / (self.count - 1)
+
+
+def line_map_translator(translator):
+    """Return subclass of HTML *translator* emitting ``data-line``.
+
+    Lines are emitted only when ``source_line_offset`` setting is not None,
+    it is added to each line number.
+    """
+    if getattr(translator, "line_map", False):
+        return translator
+
+    class LineMapTranslator(translator):
+        line_map = True
+
+        def starttag(self, node, tagname, *args, **attributes):
+            offset = getattr(self.settings, "source_line_offset", None)
+            if (
+                offset is not None
+                and isinstance(node, LINE_NODES)
+                and node.line
+            ):
+                attributes["data-line"] = node.line + offset
+            return super().starttag(node, tagname, *args, **attributes)
+
+    LineMapTranslator.__name__ = translator.__name__
+    LineMapTranslator.__qualname__ = translator.__qualname__
+    return LineMapTranslator
@@ -0,0 +1,300 @@
+"""Native MarkDown parser, which builds docutils document in one pass.
+
+MarkDown is read by mistune lexers, and the renderer creates docutils nodes
+directly, so there is no conversion to reStructuredText and no second parse
+like by m2r. Documents are written by docutils writers, so they share
+stylesheets, render cache and worker processes with reStructuredText.
+Top-level blocks have source lines for ``formiko.line_map``.
+"""
+
+from html import unescape
+
+from docutils import nodes
+from docutils.parsers import Parser
+from docutils.utils.code_analyzer import Lexer, LexerError
+
+from formiko.utils import Undefined
+
+
+def nest_sections(document, blocks):
+    """Append *blocks* to *document*, nested to sections by their titles.
+
+    MarkDown headings are flat, so each title opens a section, which ends
+    by the next title of the same or higher level. Titles inside other
+    blocks are changed to rubrics.
+    """
+    stack = [(0, document)]
+    for block in blocks:
+        level = getattr(block, "level", None)
+        if level is None or not isinstance(block, nodes.title):
+            stack[-1][1].append(block)
+            continue
+        while stack[-1][0] >= level:
+            stack.pop()
+        section = nodes.section()
+        section.line = block.line
+        section += block
+        section["names"].append(nodes.fully_normalize_name(block.astext()))
+        document.note_implicit_target(section, section)
+        stack[-1][1].append(section)
+        stack.append((level, section))
+
+    for title in list(document.findall(nodes.title)):
+        if not isinstance(title.parent, nodes.section):
+            rubric = nodes.rubric("", "", *title.children)
+            rubric.line = title.line
+            title.replace_self(rubric)
+
+
+def code_block(code, language=None):
+    """Return literal_block of *code*, highlighted like rst code directive."""
+    classes = ["code"]
+    if language:
+        language = language.split()[0]
+        classes.append(language)
+    block = nodes.literal_block(code, classes=classes)
+    try:
+        tokens = list(Lexer(code, language or "", "long"))
+    except LexerError:
+        tokens = [([], code)]
+    for token_classes, value in tokens:
+        if token_classes:
+            block += nodes.inline(value, value, classes=token_classes)
+        else:
+            block += nodes.Text(value)
+    return block
+
+
+try:
+    from mistune import BlockGrammar, BlockLexer, Markdown, Renderer
+
+    class LineBlockLexer(BlockLexer):
+        """Block lexer, which stores source line to top-level tokens."""
+
+        nested = False
+
+        def parse(self, text, rules=None):
+            """Return tokens of *text*, top-level ones with ``line``."""
+            if self.nested:
+                return super().parse(text, rules)
+            self.nested = True
+            try:
+                self._parse_lines(text.rstrip("\n"), rules)
+            finally:
+                self.nested = False
+            return self.tokens
+
+        def _parse_lines(self, text, rules):
+            """Parse top-level blocks of *text*, same as BlockLexer.parse."""
+            line = 1
+            while text:
+                for key in rules or self.default_rules:
+                    match = getattr(self.rules, key).match(text)
+                    if match:
+                        break
+                else:
+                    msg = f"Infinite loop at: {text}"
+                    raise RuntimeError(msg)
+                start = len(self.tokens)
+                getattr(self, "parse_" + key)(match)
+                if len(self.tokens) > start:
+                    self.tokens[start]["line"] = line
+                line += match.group(0).count("\n")
+                text = text[len(match.group(0)):]
+
+    class DoctreeRenderer(Renderer):
+        """Mistune renderer returning lists of docutils nodes."""
+
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.footnote_numbers = {}
+
+        def placeholder(self):
+            """Return empty output."""
+            return []
+
+        def block_code(self, code, lang=None):
+            """Return code block."""
+            return [code_block(code, lang)]
+
+        def block_quote(self, text):
+            """Return block quote."""
+            return [nodes.block_quote("", *text)]
+
+        def block_html(self, html):
+            """Return raw html block."""
+            return [nodes.raw("", html, format="html")]
+
+        def header(self, text, level, raw=None):
+            """Return title with its level, see ``nest_sections``."""
+            title = nodes.title("", "", *text)
+            title.level = level
+            return [title]
+
+        def hrule(self):
+            """Return transition."""
+            return [nodes.transition()]
+
+        def list(self, body, ordered=True):
+            """Return bullet or enumerated list."""
+            if ordered:
+                return [
+                    nodes.enumerated_list(
+                        "",
+                        *body,
+                        enumtype="arabic",
+                        prefix="",
+                        suffix=".",
+                    ),
+                ]
+            return [nodes.bullet_list("", *body, bullet="*")]
+
+        def list_item(self, text):
+            """Return list item."""
+            return [nodes.list_item("", *text)]
+
+        def paragraph(self, text):
+            """Return paragraph."""
+            return [nodes.paragraph("", "", *text)]
+
+        def table(self, header, body):
+            """Return table with *header* and *body* rows."""
+            columns = max(len(row) for row in header + body)
+            tgroup = nodes.tgroup(cols=columns)
+            for _ in range(columns):
+                tgroup += nodes.colspec(colwidth=1)
+            tgroup += nodes.thead("", *header)
+            tgroup += nodes.tbody("", *body)
+            return [nodes.table("", tgroup)]
+
+        def table_row(self, content):
+            """Return table row."""
+            return [nodes.row("", *content)]
+
+        def table_cell(self, content, **flags):
+            """Return table cell, aligned by *flags*."""
+            entry = nodes.entry("", nodes.paragraph("", "", *content))
+            if flags.get("align"):
+                entry["classes"].append(f"align-{flags['align']}")
+            return [entry]
+
+        def double_emphasis(self, text):
+            """Return strong text."""
+            return [nodes.strong("", "", *text)]
+
+        def emphasis(self, text):
+            """Return emphasised text."""
+            return [nodes.emphasis("", "", *text)]
+
+        def codespan(self, text):
+            """Return inline code."""
+            return [nodes.literal(text, text)]
+
+        def linebreak(self):
+            """Return line break."""
+            return [nodes.raw("", "<br />\n", format="html")]
+
+        def strikethrough(self, text):
+            """Return deleted text, same as ``:del:`` role."""
+            return [nodes.inline("", "", *text, classes=["del"])]
+
+        def text(self, text):
+            """Return text with resolved html entities."""
+            return [nodes.Text(unescape(text))]
+
+        def escape(self, text):
+            """Return escaped character."""
+            return [nodes.Text(text)]
+
+        def autolink(self, link, is_email=False):
+            """Return link with its address as text."""
+            uri = f"mailto:{link}" if is_email else link
+            return [nodes.reference(link, link, refuri=uri)]
+
+        def link(self, link, title, text):
+            """Return link with *text*."""
+            return [nodes.reference("", "", *text, refuri=link)]
+
+        def image(self, src, title, text):
+            """Return image with alternative *text*."""
+            return [nodes.image(uri=src, alt=text or "")]
+
+        def inline_html(self, html):
+            """Return raw inline html."""
+            return [nodes.raw("", html, format="html")]
+
+        def newline(self):
+            """Return nothing, blocks are separated by docutils writer."""
+            return []
+
+        def footnote_ref(self, key, index):
+            """Return reference to footnote *key* with its *index*."""
+            self.footnote_numbers[key] = index
+            return [
+                nodes.footnote_reference(
+                    str(index),
+                    str(index),
+                    ids=[nodes.make_id(f"footnote-reference-{key}")],
+                    refid=nodes.make_id(f"footnote-{key}"),
+                ),
+            ]
+
+        def footnote_item(self, key, text):
+            """Return footnote *key* with its body *text*."""
+            number = str(self.footnote_numbers.get(key, key))
+            return [
+                nodes.footnote(
+                    "",
+                    nodes.label("", number),
+                    *text,
+                    ids=[nodes.make_id(f"footnote-{key}")],
+                    backrefs=[nodes.make_id(f"footnote-reference-{key}")],
+                ),
+            ]
+
+        def footnotes(self, text):
+            """Return footnotes."""
+            return text
+
+    class DoctreeMarkdown(Markdown):
+        """Mistune Markdown producing docutils nodes with source lines."""
+
+        def __init__(self):
+            super().__init__(
+                DoctreeRenderer(),
+                block=LineBlockLexer(BlockGrammar()),
+            )
+
+        def tok(self):
+            """Return nodes of the current token, with its source line."""
+            line = self.token.get("line")
+            output = super().tok()
+            if line is not None:
+                for node in output:
+                    if isinstance(node, nodes.Element):
+                        node.line = line
+            return output
+
+        def tok_text(self):
+            """Return paragraph of text lines, also in tight list items."""
+            return [nodes.paragraph("", "", *super().tok_text())]
+
+        def output_text(self):
+            """Return paragraph of text lines."""
+            return self.tok_text()
+
+    class MarkdownParser(Parser):
+        """Docutils parser of MarkDown, without reStructuredText."""
+
+        supported = ("markdown", "md")
+
+        def parse(self, inputstring, document):
+            """Parse *inputstring* to *document*."""
+            self.setup_parse(inputstring, document)
+            nest_sections(document, DoctreeMarkdown()(inputstring))
+            self.finish_parse()
+
+except ImportError:
+
+    class MarkdownParser(Undefined):  # type: ignore[no-redef]
+        """Not imported MarkdownParser."""
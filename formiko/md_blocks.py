@@ -0,0 +1,149 @@
+"""Block level conversion of MarkDown documents to reStructuredText.
+
+MarkDown source is split to top-level blocks, and each block is converted
+alone and cached by its content hash, so editing one paragraph converts
+only that paragraph. Sources with reference link or footnote definitions,
+which are shared by all blocks, are converted as a whole.
+"""
+
+import re
+from collections import OrderedDict
+from hashlib import blake2b
+
+BLOCK_CACHE_SIZE = 2048  # converted blocks
+
+RE_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+RE_LIST_ITEM = re.compile(r"^ {0,3}(?:[*+-]|\d+[.)])(?:\s|$)")
+RE_QUOTE = re.compile(r"^ {0,3}>")
+RE_HTML = re.compile(r"^ {0,3}<([a-zA-Z][\w-]*)")
+RE_COMMENT = re.compile(r"^ {0,3}<!--")
+
+# definitions used by other blocks: [name]: url, [^note]: text
+RE_GLOBAL = re.compile(r"^ {0,3}\[[^\]\n]+\]:", re.M)
+
+
+def _kind(line):
+    """Return kind of block started by *line*, which continues it."""
+    if RE_LIST_ITEM.match(line):
+        return RE_LIST_ITEM
+    if RE_QUOTE.match(line):
+        return RE_QUOTE
+    return None
+
+
+def _block_end(line):
+    """Return test of the last line of block opened by *line*, or None.
+
+    Fenced code, html blocks and comments could contain blank lines.
+    """
+    match = RE_FENCE.match(line)
+    if match:
+        fence = match.group(1)
+        return lambda line: _closes_fence(line, fence)
+    match = RE_COMMENT.match(line)
+    if match and "-->" not in line[match.end():]:
+        return lambda line: "-->" in line
+    match = RE_HTML.match(line)
+    if match and f"</{match.group(1)}" not in line:
+        closing = f"</{match.group(1)}"
+        return lambda line: closing in line
+    return None
+
+
+def _closes_fence(line, fence):
+    """Return True if *line* closes code block started by *fence*."""
+    match = RE_FENCE.match(line)
+    return (
+        match is not None
+        and match.group(1)[0] == fence[0]
+        and len(match.group(1)) >= len(fence)
+        and not line[match.end():].strip()
+    )
+
+
+def split_blocks(text):
+    """Return top-level blocks of MarkDown *text*, which join to *text*.
+
+    Blocks are separated by blank lines. Fenced code, html blocks, html
+    comments, indented lines and items of the same list or quote stay in
+    one block. Blank lines belong to the block before them.
+    """
+    blocks = []
+    lines = []
+    kind = None  # list or quote pattern of the current block
+    end = None  # test of the last line of fenced code or html block
+    blank = False
+    for line in text.splitlines(True):
+        if end is not None:
+            if end(line):
+                end = None
+        elif not line.strip():
+            blank = True
+        else:
+            if (
+                blank
+                and not line[0].isspace()
+                and not (kind is not None and kind.match(line))
+                and lines
+            ):
+                blocks.append("".join(lines))
+                lines = []
+            if not lines:
+                kind = _kind(line)
+            blank = False
+            end = _block_end(line)
+        lines.append(line)
+    if lines:
+        blocks.append("".join(lines))
+    return blocks
+
+
+class BlockCache:
+    """Bounded LRU cache of MarkDown blocks converted by *convert*.
+
+    *convert* returns reStructuredText of MarkDown text, which starts with
+    *prolog* when the text needs it. The prolog is added once to the whole
+    converted document.
+    """
+
+    def __init__(self, convert, prolog="", size=BLOCK_CACHE_SIZE):
+        self.convert_text = convert
+        self.prolog = prolog
+        self.size = size
+        self.blocks = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def block(self, text):
+        """Return converted *text* of one block, cached when possible."""
+        key = blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+        output = self.blocks.get(key)
+        if output is not None:
+            self.hits += 1
+            self.blocks.move_to_end(key)
+            return output
+
+        self.misses += 1
+        output = self.convert_text(text)
+        self.blocks[key] = output
+        while len(self.blocks) > self.size:
+            self.blocks.popitem(last=False)
+        return output
+
+    def clear(self):
+        """Remove all converted blocks."""
+        self.blocks.clear()
+
+    def convert(self, text):
+        """Return reStructuredText of MarkDown *text*."""
+        if RE_GLOBAL.search(text):
+            return self.convert_text(text)
+        parts = []
+        prolog = ""
+        for block in split_blocks(text):
+            output = self.block(block)
+            if self.prolog and output.startswith(self.prolog):
+                prolog = self.prolog
+                output = output[len(self.prolog):]
+            parts.append(output)
+        return prolog + "\n\n".join(parts)
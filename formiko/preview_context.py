@@ -0,0 +1,69 @@
+"""WebKit context shared by previews in all tabs and windows."""
+
+from gi.repository.WebKit import (
+    CacheModel,
+    MemoryPressureSettings,
+    NetworkSession,
+    Settings,
+    UserContentManager,
+    WebContext,
+    WebView,
+)
+
+PREVIEW_PROCESSES = 2  # web processes shared by all previews
+PREVIEW_MEMORY_LIMIT = 0  # MiB of one web process, 0 is WebKit default
+
+
+class PreviewContext:
+    """Web context, network session and web processes of previews.
+
+    Previews are local pages, so the network session is ephemeral and the
+    cache model is for document viewer. Web views are spread to at most
+    *processes* web processes; a new view shares the process with a view
+    of the smallest group. Each view has its own settings and user content
+    manager. *memory_limit* in MiB sets WebKit memory pressure handling.
+    """
+
+    def __init__(
+        self,
+        processes=PREVIEW_PROCESSES,
+        memory_limit=PREVIEW_MEMORY_LIMIT,
+    ):
+        self.processes = max(processes, 1)
+        kwargs = {}
+        if memory_limit > 0:
+            pressure = MemoryPressureSettings.new()
+            pressure.set_memory_limit(memory_limit)
+            NetworkSession.set_memory_pressure_settings(pressure)
+            kwargs["memory_pressure_settings"] = pressure
+        self.web_context = WebContext(**kwargs)
+        self.web_context.set_cache_model(CacheModel.DOCUMENT_VIEWER)
+        self.network_session = NetworkSession.new_ephemeral()
+        self.groups = []  # lists of views sharing one web process
+
+    def new_webview(self):
+        """Return new WebView in one of shared web processes."""
+        kwargs = {
+            "web_context": self.web_context,
+            "network_session": self.network_session,
+            "settings": Settings(),
+            "user_content_manager": UserContentManager(),
+        }
+        if len(self.groups) < self.processes:
+            group = []
+            self.groups.append(group)
+        else:
+            group = min(self.groups, key=len)
+            kwargs["related_view"] = group[0]
+        webview = WebView(**kwargs)
+        group.append(webview)
+        return webview
+
+    def release(self, webview):
+        """Forget *webview*, which will not be used anymore."""
+        for group in self.groups:
+            if webview in group:
+                group.remove(webview)
+                if not group:
+                    self.groups.remove(group)
+                return
@@ -0,0 +1,150 @@
+"""Progressive rendering of huge reStructuredText documents.
+
+Source is split on top-level sections to chunks. The chunk around the
+editor position is rendered first to a page frame, so it can be shown
+quickly. Other chunks are rendered later, nearest first, and inserted to
+the shown page as bodies wrapped to ``div.formiko-chunk`` elements. Chunks
+are rendered without the document title transformation, so each keeps its
+section titles; the final full render replaces the whole body.
+"""
+
+import re
+from bisect import bisect_right
+from traceback import format_exc
+
+from formiko.incremental import RE_GLOBAL, split_sections
+from formiko.line_map import LineIndex
+from formiko.rendering import prepared_publisher, publish_html
+from formiko.timings import StageTimer
+
+PROGRESSIVE_SIZE = 512 * 1024  # smaller sources are rendered at once
+CHUNK_SIZE = 128 * 1024  # source size of chunks rendered later
+WINDOW_SECTIONS = 1  # sections before and after the current one
+WRITERS = ("html4", "html5")  # writers with known page container
+
+RE_CONTAINER = re.compile(r'<div class="document"[^>]*>|<main[^>]*>')
+
+CHUNK = (
+    '<div class="formiko-chunk" data-chunk="%d" style="display:contents">\n'
+    "%s</div>\n"
+)
+
+
+class Plan:
+    """Chunks of source, the window around position and the rest.
+
+    Each chunk is (index, line_offset, text), index is the order in the
+    document, line_offset is the number of source lines before the chunk.
+    The *rest* is in render order, nearest to the window first.
+    """
+
+    def __init__(self, window, rest):
+        self.window = window
+        self.rest = rest
+
+
+def _group(sections, size):
+    """Group consecutive (line, text) *sections* to chunks up to *size*."""
+    groups = []
+    length = 0
+    for section in sections:
+        if not groups or length + len(section[1]) > size:
+            groups.append([])
+            length = 0
+        groups[-1].append(section)
+        length += len(section[1])
+    return groups
+
+
+def _chunk(index, sections):
+    """Return chunk of consecutive (line, text) *sections*."""
+    return index, sections[0][0], "".join(text for _, text in sections)
+
+
+def plan_chunks(
+    src,
+    pos,
+    chunk_size=CHUNK_SIZE,
+    window_sections=WINDOW_SECTIONS,
+):
+    """Return Plan of chunks to render *src* from editor *pos*.
+
+    Editor *pos* is ratio of the source, or offset in the source from vim.
+    Returns None, when the source can't be split to more chunks.
+    """
+    if RE_GLOBAL.search(src):
+        return None
+    split = split_sections(src)
+    if split is None or len(split[0]) < 2:  # noqa: PLR2004
+        return None
+    sections = split[0]
+    lines = LineIndex(src)
+    line = lines.line(int(pos)) if pos > 1 else lines.line_at(pos)
+    starts = [start for start, _ in sections]
+    current = bisect_right(starts, line - 1) - 1
+
+    first = max(current - window_sections, 0)
+    last = min(current + window_sections + 1, len(sections))
+    before = _group(sections[:first], chunk_size)
+    after = _group(sections[last:], chunk_size)
+
+    rest = []
+    # nearest chunks are rendered first, alternately after and before
+    for i in range(max(len(before), len(after))):
+        if i < len(after):
+            rest.append(_chunk(len(before) + 1 + i, after[i]))
+        if i < len(before):
+            index = len(before) - 1 - i
+            rest.append(_chunk(index, before[index]))
+    window = _chunk(len(before), sections[first:last])
+    return Plan(window, rest)
+
+
+def publish_chunk(  # noqa: PLR0917
+    index,
+    src,
+    parser,
+    writer,
+    style="",
+    tab_width=8,
+    file_name=None,
+    incremental=False,
+    line_offset=None,
+):
+    """Publish chunk *src* and return (state, html) of wrapped body.
+
+    When publishing fails, html is the traceback; the whole document should
+    be rendered to get the error page. See ``PreparedPublisher.publish``
+    for *line_offset*.
+    """
+    try:
+        body = prepared_publisher(parser, writer, style, tab_width).fragment(
+            src,
+            file_name,
+            incremental,
+            line_offset,
+        )
+    except BaseException:
+        return False, format_exc()
+    return True, CHUNK % (index, body)
+
+
+def publish_window(index, src, *args, **kwargs):
+    """Publish page frame with the first chunk and its stage timings.
+
+    Arguments are the same as for ``publish_chunk``, keyword arguments are
+    only for the chunk. Returns the same value as
+    ``formiko.rendering.publish_timed``.
+    """
+    timer = StageTimer()
+    state, frame, mime = publish_html("", *args, embed_stylesheet=False)
+    match = RE_CONTAINER.search(frame)
+    timer.mark("frame")
+    if not state or match is None:
+        return (state, frame, mime), timer.stages
+    state, chunk = publish_chunk(index, src, *args, **kwargs)
+    timer.mark("chunk")
+    if not state:
+        return (state, chunk, "text/plain"), timer.stages
+    html = frame[:match.end()] + chunk + frame[match.end():]
+    return (state, html, mime), timer.stages
@@ -1,25 +1,20 @@
 """Webkit based renderer."""
 
-from io import StringIO
+from concurrent.futures import BrokenExecutor, ThreadPoolExecutor
 from json import dumps
+from math import isfinite
 from os.path import exists, splitext
-from traceback import format_exc
-
-from docutils import DataError
-from docutils.core import publish_string
-from docutils.parsers.rst import Parser as RstParser
-from docutils.writers.html4css1 import Writer as Writer4css1
-from docutils.writers.html5_polyglot import Writer as Html5Writer
-from docutils.writers.pep_html import Writer as WriterPep
-from docutils.writers.s5_html import Writer as WriterS5
-from gi.repository import Adw, Gdk, Gio, Gtk, Pango
+from traceback import print_exc
+
+from gi.repository import Adw, Gdk, Gio, GObject, Gtk, Pango
 from gi.repository.GLib import (
     MAXUINT,
+    PRIORITY_LOW,
     Bytes,
     Error,
     LogLevelFlags,
-    MainContext,
     get_home_dir,
+    get_user_cache_dir,
     idle_add,
     log_default_handler,
 )
@@ -34,14 +29,50 @@ from gi.repository.WebKit import (
     NavigationPolicyDecision,
     NavigationType,
     PrintOperation,
+    UserContentInjectedFrames,
+    UserScript,
+    UserScriptInjectionTime,
+    UserStyleLevel,
+    UserStyleSheet,
     WebView,
 )
 
+from formiko.dependencies import stamp
 from formiko.dialogs import FileNotFoundDialog, run_alert_dialog
-from formiko.directives import HtmlPreview, Mark2Resturctured, TinyWriter
+from formiko.directives import HtmlPreview, Mark2Resturctured
+from formiko.disk_cache import DiskCache
+from formiko.export import write_atomic
+from formiko.html_diff import diff_bodies, parse_body
 from formiko.json_preview import JSONPreview
+from formiko.lazy_layout import SLIDE_WRITERS
+from formiko.line_map import LineIndex
+from formiko.markdown import MarkdownParser
+from formiko.progressive import (
+    PROGRESSIVE_SIZE,
+    plan_chunks,
+    publish_chunk,
+    publish_window,
+)
+from formiko.progressive import WRITERS as PROGRESSIVE_WRITERS
+from formiko.rendering import (
+    DATA_ERROR,
+    LINE_MAP_PARSERS,
+    NOT_FOUND,
+    RENDER_CACHE,
+    WRITERS,
+    publish_html,
+    publish_recorded,
+    render_document,
+    render_pool,
+    reset_render_pool,
+    stylesheet_files,
+)
+from formiko.rendering import PARSERS as BASE_PARSERS
+from formiko.search import NEXT, PREVIOUS, SEARCH, PreviewSearch
 from formiko.sourceview import LANG_BY_EXT
+from formiko.timings import RenderTimings, StageTimer
 from formiko.utils import Undefined
+from formiko.widgets import ImutableDict
 
 # CSS spec: 1pt = 1/72 inch, 1 CSS pixel = 1/96 inch → 1pt = 96/72 CSS px.
 # WebKit font sizes are in CSS pixels; HiDPI scaling is handled internally
@@ -49,6 +80,11 @@ from formiko.utils import Undefined
 _PT_TO_CSS_PX = 96 / 72
 
 
+# rendered pages of opened documents, written in the background
+DISK_CACHE = DiskCache(get_user_cache_dir() + "/formiko/render")
+_EXECUTOR = ThreadPoolExecutor(max_workers=1)
+
+
 class Env:
     """Empty class for env overriding."""
 
@@ -56,24 +92,7 @@ class Env:
 
 
 PARSERS = {
-    "rst": {
-        "key": "rst",
-        "title": "Docutils reStructuredText parser",
-        "class": RstParser,
-        "package": "docutils",
-        "url": "http://docutils.sourceforge.net",
-    },
-    "m2r": {
-        "key": "m2r",
-        "title": "MarkDown to reStructuredText",
-        "class": Mark2Resturctured,
-        "url": "https://github.com/crossnox/m2r2",
-    },
-    "html": {
-        "key": "html",
-        "title": "HTML preview",
-        "class": HtmlPreview,
-    },
+    **BASE_PARSERS,
     "json": {
         "key": "json",
         "title": "JSON preview",
@@ -90,89 +109,8 @@ EXTS = {
 
 if not issubclass(Mark2Resturctured, Undefined):
     EXTS[".md"] = "m2r"
-
-WRITERS = {
-    "html4": {
-        "key": "html4",
-        "title": "Docutils HTML4 writer",
-        "class": Writer4css1,
-        "package": "docutils",
-        "url": "https://www.docutils.org",
-    },
-    "s5": {
-        "key": "s5",
-        "title": "Docutils S5/HTML slide show writer",
-        "class": WriterS5,
-        "package": "docutils",
-        "url": "https://www.docutils.org",
-    },
-    "pep": {
-        "key": "pep",
-        "title": "Docutils PEP HTML writer",
-        "class": WriterPep,
-        "package": "docutils",
-        "url": "https://www.docutils.org",
-    },
-    "tiny": {
-        "key": "tiny",
-        "title": "Tiny HTML writer",
-        "class": TinyWriter,
-        "package": "docutils-tinyhtmlwriter",
-        "url": "https://github.com/ondratu/docutils-tinyhtmlwriter",
-    },
-    "html5": {
-        "key": "html5",
-        "title": "HTML 5 writer",
-        "class": Html5Writer,
-        "package": "docutils",
-        "url": "https://www.docutils.org",
-    },
-}
-
-NOT_FOUND = """
-<html>
-  <head></head>
-  <body>
-    <h1>Commponent {title} Not Found!</h1>
-    <p>Component <b>{title}</b> which you want to use is not found.
-       See <a href="{url}">{url}</a> for mor details and install it
-       to system.
-    </p>
-  </body>
-</html>
-"""
-
-DATA_ERROR = """
-<html>
-  <head></head>
-  <body>
-    <h1>%s Error!</h1>
-    <p style="color:red; text-width:weight;">%s</p>
-  </body>
-</html>
-"""
-
-NOT_IMPLEMENTED_ERROR = """
-<html>
-  <head></head>
-  <body>
-    <h1>Library Error</h1>
-    <p>Sorry about that. This seems to be not supported functionality in
-       dependent library Reader or Writer</p>
-    <pre style="color:red; text-width:weight;">%s</pre>
-  </body>
-</html>
-"""
-
-EXCEPTION_ERROR = """
-<html>
-  <head></head>
-  <body>
-    <h1>Exception Error!</h1>
-    <pre style="color:red; text-width:weight;">%s</pre>
-  </body>
-</html>
-"""
+elif not issubclass(MarkdownParser, Undefined):
+    EXTS[".md"] = "md"
 
 SCROLL = """
 <script>
@@ -182,14 +120,182 @@ SCROLL = """
 </script>
 """
 
-JS_SCROLL = """
+JS_POSITION = """
+window.scrollY/Math.max(
+    document.documentElement.scrollHeight-window.innerHeight, 1)
+"""
+
+# map of data-line attributes from formiko.line_map to the page positions,
+# and the scroll position with the source line and the source line at the
+# top of the view, which the page pushes to the renderer at most once per
+# frame
+JS_LINE_MAP = """
+window.formiko = (function () {
+    let lines = null;  // [line, element] pairs with increasing lines
+    let syncing = false;  // scrolled by the renderer, not by the user
+    let pending = false;
+
+    new MutationObserver(() => {
+        lines = null;
+    }).observe(document.documentElement, {childList: true, subtree: true});
+
+    function map() {
+        if (lines === null) {
+            lines = [];
+            for (const el of document.querySelectorAll("[data-line]")) {
+                const line = Number(el.dataset.line);
+                if (!lines.length || line > lines[lines.length - 1][0]) {
+                    lines.push([line, el]);
+                }
+            }
+        }
+        return lines;
+    }
+
+    function top(el) {
+        return el.getBoundingClientRect().top + window.scrollY;
+    }
+
+    function search(list, value, key) {  // last index with key <= value
+        let lo = 0, hi = list.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (key(list[mid]) <= value) {
+                lo = mid + 1;
+            } else {
+                hi = mid;
+            }
+        }
+        return Math.max(lo - 1, 0);
+    }
+
+    function scrollToLine(line, ratio) {
+        const list = map();
+        if (!list.length) {
+            return false;
+        }
+        const i = search(list, line, (item) => item[0]);
+        let y = top(list[i][1]);
+        if (i + 1 < list.length && line > list[i][0]) {
+            const next = list[i + 1];
+            y += (top(next[1]) - y) * Math.min(
+                (line - list[i][0]) / (next[0] - list[i][0]), 1);
+        }
+        y = Math.max(Math.round(y - window.innerHeight * ratio), 0);
+        if (y !== Math.round(window.scrollY)) {
+            syncing = true;
+            window.scrollTo(0, y);
+        }
+        return true;
+    }
+
+    function lineAt(ratio) {
+        const list = map();
+        if (!list.length) {
+            return 0;
+        }
+        const y = window.scrollY + window.innerHeight * ratio;
+        const i = search(list, y, (item) => top(item[1]));
+        const [line, el] = list[i];
+        if (i + 1 < list.length) {
+            const y0 = top(el), y1 = top(list[i + 1][1]);
+            if (y1 > y0 && y > y0) {
+                const part = Math.min((y - y0) / (y1 - y0), 1);
+                return line + Math.floor((list[i + 1][0] - line) * part);
+            }
+        }
+        return line;
+    }
+
+    window.addEventListener("scroll", () => {
+        if (pending) {
+            return;
+        }
+        pending = true;
+        window.requestAnimationFrame(() => {
+            pending = false;
+            const position = window.scrollY / Math.max(
+                document.documentElement.scrollHeight - window.innerHeight, 1);
+            const line = syncing ? 0 : lineAt(position);
+            syncing = false;
+            window.webkit.messageHandlers.position.postMessage(
+                [position, line, lineAt(0)]);
+        });
+    }, {passive: true});
+
+    return {scrollToLine: scrollToLine, lineAt: lineAt};
+})();
+"""
+
+# scroll to source line placed at ratio of the window, or to the ratio of
+# the page without line map
+JS_SCROLL_LINE = """
+if (!(window.formiko && window.formiko.scrollToLine(%d, %f))) {
     window.scrollTo(
         0,
         (document.documentElement.scrollHeight-window.innerHeight)*%f);
+}
 """
 
-JS_POSITION = """
-window.scrollY/(document.documentElement.scrollHeight-window.innerHeight)
+# operations from formiko.html_diff are checked first, then applied
+JS_PATCH = """
+(function (ops) {
+    function find(path) {
+        let el = document.body;
+        for (const i of path) {
+            el = el && el.children[i];
+        }
+        return el;
+    }
+    const targets = ops.map((op) => find(op[1]));
+    for (let k = 0; k < ops.length; k++) {
+        const op = ops[k], el = targets[k];
+        if (!el || (op[0] === 0
+                ? el.tagName.toLowerCase() !== op[2]
+                : el.children.length !== op[4])) {
+            return false;
+        }
+    }
+    for (let k = 0; k < ops.length; k++) {
+        const op = ops[k], el = targets[k];
+        if (op[0] === 0) {
+            el.outerHTML = op[3];
+            continue;
+        }
+        const old = Array.from(el.children).slice(op[2], op[2] + op[3]);
+        const next = el.children[op[2] + op[3]];
+        old.forEach((child) => child.remove());
+        if (next) {
+            next.insertAdjacentHTML("beforebegin", op[5]);
+        } else {
+            el.insertAdjacentHTML("beforeend", op[5]);
+        }
+    }
+    return true;
+})(%s);
+"""
+
+# chunk from formiko.progressive is inserted by its index, content which
+# is shown keeps its place
+JS_INSERT_CHUNK = """
+(function (index, html) {
+    const chunks = Array.from(document.querySelectorAll("div.formiko-chunk"));
+    if (!chunks.length) {
+        return false;
+    }
+    const next = chunks.find((el) => Number(el.dataset.chunk) > index);
+    const anchor = next && next.firstElementChild;
+    const top = anchor ? anchor.getBoundingClientRect().top : 1;
+    if (next) {
+        next.insertAdjacentHTML("beforebegin", html);
+    } else {
+        chunks[chunks.length - 1].insertAdjacentHTML("afterend", html);
+    }
+    if (top <= 0) {
+        window.scrollBy(0, anchor.getBoundingClientRect().top - top);
+    }
+    return true;
+})(%d, %s);
 """
 
 MARKUP = """<span background="#ddd"> %s </span>"""
@@ -198,6 +304,17 @@ MARKUP = """<span background="#ddd"> %s </span>"""
 class Renderer(Overlay):
     """Renderer widget, mainly based on Webkit."""
 
+    __gsignals__ = ImutableDict({
+        # Emitted when the render is shown, with its time in seconds.
+        "render-timed": (GObject.SignalFlags.RUN_FIRST, None, (float,)),
+        # Emitted with (index, count) of the current search match, see
+        # formiko.search.PreviewSearch.
+        "search-matches": (GObject.SignalFlags.RUN_FIRST, None, (int, int)),
+        # Emitted when the user scrolls the page, with the source line and
+        # scroll position of the page.
+        "line-scrolled": (GObject.SignalFlags.RUN_FIRST, None, (int, float)),
+    })
+
     def __init__(self, win, parser="rst", writer="html4", style=""):
         super().__init__()
 
@@ -209,21 +326,81 @@ class Renderer(Overlay):
         self.mono_family = "monospace"
         self.mono_size_px = 13  # WebKit default for monospace
 
-        self.webview = WebView()
+        # previews share WebKit context and processes of the application
+        self._context = getattr(
+            Gio.Application.get_default(),
+            "preview_context",
+            None,
+        )
+        # WebView with its theme and font handling is created when the
+        # preview is mapped for the first time, see _create_webview
+        self.webview = None
+        self._desktop_settings = None
+        self._theme_handlers = []  # (object, handler id) of theme signals
+        self.search = PreviewSearch(
+            self._send_search,
+            lambda index, count: self.emit("search-matches", index, count),
+        )
+        self.connect("map", self.on_map)
+
+        self.label = Label()
+        self.label.set_halign(Align.START)
+        self.label.set_valign(Align.END)
+        self.add_overlay(self.label)
+        self.link_uri = None
+
+        # Window reference must be available before parser initialization
+        self.__win = win
+        self.parser_instance = None
+
+        self.set_writer(writer)
+        self.set_parser(parser)
+
+        self.style = style
+        self.tab_width = 8
+        self.incremental = True  # parse only changed rst sections
+        self.lazy_layout = True  # lay out only visible sections
+        self._position = 0.0  # last known scroll position of the page
+        self._top_line = 0  # source line at the top of the page, 0 = unknown
+        self.file_name = None
+        self._loaded_context = None  # (file_name, mime_type) of last finished
+        self._pending_context = None  # context of the load in progress
+        self._body = None  # html_diff.Body of the shown page
+        self.pos = 0  # editor position, None = keep the page top line
+        self.src = None  # None = no content yet; prevents spurious renders
+        self._generation = 0  # incremented by each do_render call
+        self._job = None  # pending render job future
+        self.persist = False  # store the next rendered page to DISK_CACHE
+        self._stylesheets = None  # (writer, style) of webview stylesheets
+        self._monitors = []  # file monitors of webview stylesheets
+        self.timings = RenderTimings()
+        self._timer = None  # StageTimer of the render in progress
+        self._load_timer = None  # StageTimer of the load_bytes in progress
+        self._progressive = None  # progressive.Plan of the shown page
+        self._lines = None  # (src, LineIndex) of the last scrolled source
+        self._suspended = False  # source was changed while hidden
+        self._print_pending = False  # print the page when it is loaded
+        self._kept = None  # (key, output) of the page before hibernation
+        # (file_name, paths) of files read by the last render in the pool
+        self._dependencies = None
+        self._dependency_monitors = {}  # Gio.FileMonitor by dependency path
+
+    def _create_webview(self):
+        """Create the WebView, and follow the theme and system fonts."""
+        self.webview = (
+            self._context.new_webview() if self._context else WebView()
+        )
         self.webview.connect("mouse-target-changed", self.on_mouse)
         self.webview.connect("context-menu", self.on_context_menu)
         self.webview.connect("load-changed", self.on_load_changed)
         self.webview.connect("decide-policy", self.on_decide_policy)
 
-        Adw.StyleManager.get_default().connect(
-            "notify::dark",
-            self.on_theme_changed,
-        )
-        Gtk.Settings.get_default().connect(
-            "notify::gtk-theme-name",
-            self.on_theme_changed,
-        )
-        self.connect("realize", lambda _w: self.on_theme_changed())
+        for obj, signal in (
+            (Adw.StyleManager.get_default(), "notify::dark"),
+            (Gtk.Settings.get_default(), "notify::gtk-theme-name"),
+        ):
+            handler = obj.connect(signal, self.on_theme_changed)
+            self._theme_handlers.append((obj, handler))
 
         try:
             self._desktop_settings = Gio.Settings(
@@ -242,36 +419,49 @@ class Renderer(Overlay):
 
         self.set_child(self.webview)
 
+        manager = self.webview.get_user_content_manager()
+        manager.add_script(
+            UserScript(
+                JS_LINE_MAP,
+                UserContentInjectedFrames.TOP_FRAME,
+                UserScriptInjectionTime.END,
+                None,
+                None,
+            ),
+        )
+        manager.connect(
+            "script-message-received::position",
+            self.on_position_message,
+        )
+        manager.register_script_message_handler("position", None)
+
         web_settings = self.webview.get_settings()
         web_settings.set_enable_javascript_markup(False)  # XSS Fix
         self._apply_system_font()
 
         controller = self.webview.get_find_controller()
-        self.search_done = None
         controller.connect("found-text", self.on_found_text)
         controller.connect("failed-to-find-text", self.on_faild_to_find_text)
+        controller.connect("counted-matches", self.on_counted_matches)
 
-        self.label = Label()
-        self.label.set_halign(Align.START)
-        self.label.set_valign(Align.END)
-        self.add_overlay(self.label)
-        self.link_uri = None
+        if isinstance(self.parser_instance, JSONPreview):
+            self.parser_instance.webview = self.webview
+        self.on_theme_changed()  # renders the suspended source
 
-        # Window reference must be available before parser initialization
-        self.__win = win
-        self.parser_instance = None
+    def on_map(self, _widget):
+        """Create the WebView, or render source changed while hidden."""
+        if self.webview is None:
+            self._create_webview()
+        elif self._suspended:
+            idle_add(self.do_render)
 
-        self.set_writer(writer)
-        self.set_parser(parser)
+    @property
+    def hidden(self):
+        """Return True, when renders are suspended for the hidden preview.
 
-        self.style = style
-        self.tab_width = 8
-        self.__position = -1
-        self.file_name = None
-        self._loaded_context = None  # (file_name, mime_type) of last finished
-        self._pending_context = None  # context of the load in progress
-        self.pos = 0
-        self.src = None  # None = no content yet; prevents spurious renders
+        A page requested to print is rendered even when hidden.
+        """
+        return not self.get_mapped() and not self._print_pending
 
     @staticmethod
     def _rgba_to_hex(rgba):
@@ -343,6 +533,8 @@ class Renderer(Overlay):
 
     def _on_system_font_changed(self, _settings, _key):
         """React to system font change and re-render the preview."""
+        if self.webview is None:
+            return
         self._apply_system_font()
         idle_add(self._apply_theme_and_render)
 
@@ -367,8 +559,11 @@ class Renderer(Overlay):
         """Read current theme colours and re-render the preview.
 
         Called via idle_add so the GTK/libadwaita CSS cascade has finished
-        recalculating before lookup_color() is invoked.
+        recalculating before lookup_color() is invoked. Nothing is done
+        without the WebView, it reads colours when it is created.
         """
+        if self.webview is None:
+            return
         self._read_theme_colors()
         background = Gdk.RGBA()
         background.parse(self.bgcolor)
@@ -377,8 +572,25 @@ class Renderer(Overlay):
 
     @property
     def position(self):
-        """Return cursor position."""
-        self.__position = -1
+        """Return the last known scroll position of the page from 0 to 1.
+
+        Page pushes its position on each scroll, so it is never waited for.
+        Use ``query_position`` to get the current value asynchronously.
+        """
+        return self._position
+
+    def _set_position(self, value):
+        """Store position from JavaScript *value*."""
+        position = value.to_double() if value.is_number() else 0.0
+        if not isfinite(position):
+            position = 0.0
+        self._position = min(max(position, 0.0), 1.0)
+
+    def query_position(self, callback):
+        """Read scroll position from the page and call *callback* with it."""
+        if self.webview is None:
+            callback(self._position)
+            return
         self.webview.evaluate_javascript(
             JS_POSITION,
             -1,
@@ -386,18 +598,30 @@ class Renderer(Overlay):
             None,
             None,
             self.on_position_callback,
+            callback,
         )
-        while self.__position < 0:
-            Gtk.main_iteration()
-        return self.__position
 
-    def on_position_callback(self, webview, result):
-        """Set cursor position value."""
+    def on_position_callback(self, webview, result, callback):
+        """Store position read from the page and pass it to *callback*."""
         try:
-            js_res = webview.evaluate_javascript_finish(result)
-            self.__position = js_res.get_js_value().to_double()
+            self._set_position(webview.evaluate_javascript_finish(result))
         except Error:
-            self.__position = 0
+            print_exc()
+        callback(self._position)
+
+    def on_position_message(self, _manager, value):
+        """Store position pushed by the page on scroll.
+
+        Page pushes [position, line, top], line is not zero, when the page
+        is scrolled by the user. Top is the source line at the top of the
+        view.
+        """
+        self._set_position(value.object_get_property_at_index(0))
+        top = value.object_get_property_at_index(2)
+        self._top_line = top.to_int32() if top.is_number() else 0
+        line = value.object_get_property_at_index(1)
+        if line.is_number() and line.to_int32() > 0:
+            self.emit("line-scrolled", line.to_int32(), self._position)
 
     def on_mouse(self, webview, hit_test_result, modifiers):
         """Show url links on mouse over."""
@@ -490,8 +714,6 @@ class Renderer(Overlay):
         """Set renderer writer."""
         assert writer in WRITERS
         self.__writer = WRITERS[writer]
-        klass = self.__writer["class"]
-        self.writer_instance = klass() if klass is not None else None
         idle_add(self.do_render)
 
     def get_writer(self):
@@ -505,7 +727,7 @@ class Renderer(Overlay):
         klass = self.__parser["class"]
         self.parser_instance = klass() if klass is not None else None
         if isinstance(self.parser_instance, JSONPreview):
-            self.parser_instance.webview = self.webview
+            self.parser_instance.webview = self.webview  # None until mapped
             self.parser_instance._win = self.__win  # noqa: SLF001
         idle_add(self.do_render)
 
@@ -540,59 +762,186 @@ class Renderer(Overlay):
         self.tab_width = width
         idle_add(self.do_render)
 
-    def render_output(self):  # noqa: C901, PLR0911
-        """Render source and return output."""
-        if getattr(self, "src", None) is None:
-            return False, "", "text/plain"
+    def export(self, file_name, callback):
+        """Write the rendered document to *file_name* in the background.
+
+        Documents are published in render pool, unless the export of the
+        same source is in RENDER_CACHE. *callback* is called in the main
+        loop with (fraction, error) of writing, where error is None or the
+        error message.
+        """
+        if not self._is_published():
+            self._write_export(self.render_output()[1], file_name, callback)
+            return
+        args = self._render_args()
+        key = self._cache_key("export")
+        output = RENDER_CACHE.get(key)
+        if output is not None:
+            self._write_export(output[1], file_name, callback)
+            return
         try:
-            if self.__parser["class"] is None:
-                html = NOT_FOUND.format(**self.__parser)
-            elif self.__writer["class"] is None:
-                html = NOT_FOUND.format(**self.__writer)
-            elif issubclass(self.__parser["class"], JSONPreview):
-                try:
-                    parser = self.parser_instance
-                    html = parser.to_html(self.src, self.tab_width)
-                except (ValueError, TypeError) as e:
-                    return False, DATA_ERROR % ("JSON", str(e)), "text/html"
-                return True, html, "text/html"
-            elif not issubclass(self.__parser["class"], HtmlPreview):
-                settings = {
-                    "warning_stream": StringIO(),
-                    "embed_stylesheet": True,
-                    "tab_width": self.tab_width,
-                    "file_name": self.file_name,
-                }
-                if self.style:
-                    settings["stylesheet"] = self.style
-                    settings["stylesheet_path"] = []
-                kwargs = {
-                    "source": self.src,
-                    "source_path": self.file_name,
-                    "parser": self.parser_instance,
-                    "writer": self.writer_instance,
-                    "writer_name": "html",
-                    "settings_overrides": settings,
-                }
-                if self.__writer["key"] == "pep":
-                    kwargs["reader_name"] = "pep"
-                    kwargs.pop("parser")  # pep is allways rst
-                html = publish_string(**kwargs).decode("utf-8")
-                return True, html, "text/html"
+            job = render_pool().submit(publish_html, *args)
+        except (BrokenExecutor, RuntimeError):
+            reset_render_pool()
+            job = _EXECUTOR.submit(publish_html, *args)
+        job.add_done_callback(
+            lambda job: idle_add(
+                self._on_export_rendered,
+                job,
+                key,
+                file_name,
+                callback,
+            ),
+        )
+
+    def _on_export_rendered(self, job, key, file_name, callback):
+        """Cache rendered export and write it to *file_name*."""
+        try:
+            output = job.result()
+        except BaseException as err:  # pylint: disable=broad-exception-caught
+            print_exc()
+            callback(1.0, str(err) or type(err).__name__)
+            return
+        RENDER_CACHE.put(key, output)
+        self._write_export(output[1], file_name, callback)
 
-        except DataError as e:
-            return False, DATA_ERROR % ("Data", e), "text/html"
+    @staticmethod
+    def _write_export(html, file_name, callback):
+        """Write *html* to *file_name* in the thread executor."""
+        job = _EXECUTOR.submit(
+            write_atomic,
+            file_name,
+            html.strip(),
+            lambda fraction: idle_add(callback, fraction, None),
+        )
+
+        def done(job):
+            error = job.exception()
+            if error is not None:
+                idle_add(callback, 1.0, str(error))
+
+        job.add_done_callback(done)
+
+    def _render_args(self):
+        """Return arguments of publish_html for the current state."""
+        return (
+            self.src,
+            self.__parser["key"],
+            self.__writer["key"],
+            self.style,
+            self.tab_width,
+            self.file_name,
+            self.incremental,
+        )
 
-        except NotImplementedError:
-            exc_str = format_exc()
-            return False, NOT_IMPLEMENTED_ERROR % exc_str, "text/html"
+    def _cache_key(self, *extra):
+        """Return RENDER_CACHE key of the current source and options.
+
+        Sources reading other files are cached with the state of files,
+        which were read by the last render of the same file.
+        """
+        dependencies = None
+        if self._dependencies is not None:
+            file_name, paths = self._dependencies
+            if file_name == self.file_name:
+                dependencies = stamp(paths)
+        return RENDER_CACHE.key(
+            *self._render_args()[:-1],
+            self._lazy_layout(),
+            *extra,
+            dependencies=dependencies,
+        )
+
+    def _watch_dependencies(self):
+        """Monitor files read by the last render, render on their change."""
+        paths = set()
+        if self._dependencies is not None:
+            paths = self._dependencies[1]
+        for path in self._dependency_monitors.keys() - paths:
+            self._dependency_monitors.pop(path).cancel()
+        for path in paths - self._dependency_monitors.keys():
+            monitor = Gio.File.new_for_path(path).monitor(
+                Gio.FileMonitorFlags.WATCH_MOVES,
+                None,
+            )
+            monitor.connect("changed", self.on_dependency_changed)
+            self._dependency_monitors[path] = monitor
+
+    def on_dependency_changed(self, _monitor, _file, _other, event):
+        """Render the source again, when a file read by it is changed."""
+        if event not in (
+            Gio.FileMonitorEvent.CHANGED,
+            Gio.FileMonitorEvent.ATTRIBUTE_CHANGED,
+        ):
+            idle_add(self.do_render)
+
+    def _line_offset(self):
+        """Return line_offset of publish_html for preview.
+
+        Lines are mapped only for reStructuredText and native MarkDown,
+        lines of m2r MarkDown are lost by the conversion.
+        """
+        return 0 if self.__parser["key"] in LINE_MAP_PARSERS else None
+
+    def _lazy_layout(self):
+        """Return lazy_layout of publish_html for preview.
+
+        Top-level sections of S5 writer are slides, they are not deferred.
+        """
+        return self.lazy_layout and self.__writer["key"] not in SLIDE_WRITERS
+
+    @property
+    def lines(self):
+        """Return LineIndex of the current source."""
+        if self._lines is None or self._lines[0] is not self.src:
+            self._lines = (self.src, LineIndex(self.src or ""))
+        return self._lines[1]
+
+    def _is_published(self):
+        """Return True if the source is published by docutils.
+
+        Not imported parser or writer is not published, the error page is
+        rendered in this process by ``render_output``.
+        """
+        parser = self.__parser["class"]
+        writer = self.__writer["class"]
+        return (
+            parser is not None
+            and writer is not None
+            and not issubclass(parser, (JSONPreview, HtmlPreview, Undefined))
+            and not issubclass(writer, Undefined)
+        )
 
-        except BaseException:
-            exc_str = format_exc()
-            return False, EXCEPTION_ERROR % exc_str, "text/html"
+    def render_output(
+        self,
+        embed_stylesheet=True,
+        line_map=False,
+    ):
+        """Render source and return output.
 
-        # output to file or html preview
-        return False, self.src, "text/html"
+        Preview is rendered without *embed_stylesheet*, the stylesheet is
+        set to the webview by ``update_stylesheets``, and with *line_map*
+        for scroll synchronization and lazy layout of sections.
+        """
+        if getattr(self, "src", None) is None:
+            return False, "", "text/plain"
+        if self.__parser["class"] is None:
+            return False, NOT_FOUND.format(**self.__parser), "text/html"
+        if self.__writer["class"] is None:
+            return False, NOT_FOUND.format(**self.__writer), "text/html"
+        if issubclass(self.__parser["class"], JSONPreview):
+            try:
+                parser = self.parser_instance
+                html = parser.to_html(self.src, self.tab_width)
+            except (ValueError, TypeError) as e:
+                return False, DATA_ERROR % ("JSON", str(e)), "text/html"
+            return True, html, "text/html"
+        return render_document(
+            *self._render_args(),
+            embed_stylesheet=embed_stylesheet,
+            line_offset=self._line_offset() if line_map else None,
+            lazy_layout=line_map and self._lazy_layout(),
+        )
 
     @staticmethod
     def _extract_body(html):
@@ -606,8 +955,14 @@ class Renderer(Overlay):
             return None
         return html[tag_end + 1: end]
 
-    def do_render(self):
-        """Render the source, and show rendered output."""
+    def do_render(self, draft=False):
+        """Render the source, and show rendered output.
+
+        Docutils documents are published in render worker processes. Each
+        job gets a new generation number, and only the result of the newest
+        job is shown; older jobs are cancelled or their results dropped.
+        The *draft* page is not cached, see ``formiko.draft``.
+        """
         # Skip until content has been explicitly set via render() or
         # load_file().  set_writer/set_parser/set_tab_width all call
         # idle_add(do_render) during initialisation before any content exists;
@@ -615,7 +970,328 @@ class Renderer(Overlay):
         # empty HTML.
         if self.src is None:
             return
-        state, html, mime_type = self.render_output()
+        if self.hidden:
+            # no render and no WebView until the preview is visible
+            self._suspended = True
+            return
+        self._suspended = False
+        self._generation += 1
+        self._timer = StageTimer()
+        self._progressive = None
+        if self._job is not None:
+            self._job.cancel()  # no-op when the worker already runs it
+            self._job = None
+        if not self._is_published():
+            output = self.render_output()
+            self._timer.mark("render")
+            self.show_output(*output)
+            return
+
+        key = self._cache_key()
+        output = RENDER_CACHE.get(key)
+        kept, self._kept = self._kept, None
+        if output is None and kept is not None and kept[0] == key:
+            output = kept[1]  # the page shown before hibernation
+            RENDER_CACHE.put(key, output)
+        if output is not None:
+            self._timer = None  # only renders, which ran, are timed
+            self._watch_dependencies()
+            self.show_output(*output)
+            return
+
+        if self._print_pending or not self._render_progressive():
+            self._render_full(draft and not self._print_pending)
+
+    def _render_full(self, draft=False):
+        """Render the whole document in render pool."""
+        if self._timer is None:  # last step of progressive render
+            self._timer = StageTimer()
+        key = self._cache_key()
+        generation = self._generation
+        try:
+            self._job = render_pool().submit(
+                publish_recorded,
+                *self._render_args(),
+                embed_stylesheet=False,
+                line_offset=self._line_offset(),
+                draft=draft,
+                lazy_layout=self._lazy_layout(),
+            )
+        except (BrokenExecutor, RuntimeError):
+            reset_render_pool()
+            output = self.render_output(embed_stylesheet=False, line_map=True)
+            self._timer.mark("render")
+            RENDER_CACHE.put(key, output)
+            self.show_output(*output)
+            return
+        args = self._render_args()
+        self._job.add_done_callback(
+            lambda job: idle_add(
+                self._on_job_done,
+                job,
+                generation,
+                args,
+                draft,
+            ),
+        )
+
+    def _on_job_done(self, job, generation, args, draft=False):
+        """Show the render job result if no newer job was started."""
+        if generation != self._generation or job.cancelled():
+            return
+        self._job = None
+        if self._timer is None:  # shown by other way meanwhile
+            self._timer = StageTimer()
+        dependencies = None  # volatile source is not cached without them
+        try:
+            output, stages, paths = job.result()
+            self._timer.merge(stages, "queue")
+            self._dependencies = (args[5], paths)
+            self._watch_dependencies()
+            dependencies = stamp(paths)
+        except BrokenExecutor:
+            reset_render_pool()
+            output = self.render_output(embed_stylesheet=False, line_map=True)
+            self._timer.mark("render")
+            draft = False
+        self._timer.draft = draft
+        if draft:
+            self.show_output(*output)
+            return
+        key = RENDER_CACHE.key(
+            *args[:-1],
+            self._lazy_layout(),
+            dependencies=dependencies,
+        )
+        RENDER_CACHE.put(key, output)
+        if self.persist and output[0]:
+            self.persist = False
+            self._store_page(args, output[1])
+        self.show_output(*output)
+
+    def _progressive_plan(self):
+        """Return progressive.Plan for the current source or None.
+
+        Only huge reStructuredText documents are rendered progressively,
+        when the page is not shown yet.
+        """
+        if (
+            len(self.src) < PROGRESSIVE_SIZE
+            or self.__parser["key"] != "rst"
+            or self.__writer["key"] not in PROGRESSIVE_WRITERS
+            or self._loaded_context == (self.file_name, "text/html")
+        ):
+            return None
+        pos = self.pos
+        if pos is None:
+            pos = self.lines.ratio(self._top_line)
+        return plan_chunks(self.src, pos)
+
+    def _render_progressive(self):
+        """Start progressive render, return False if it is not possible.
+
+        Chunk around the editor position is shown first, other chunks are
+        inserted to the page one by one, and the whole document is rendered
+        at the end.
+        """
+        plan = self._progressive_plan()
+        if plan is None:
+            return False
+        generation = self._generation
+        index, line, src = plan.window
+        try:
+            job = render_pool().submit(
+                publish_window,
+                index,
+                src,
+                *self._render_args()[1:],
+                line_offset=line,
+            )
+        except (BrokenExecutor, RuntimeError):
+            reset_render_pool()
+            return False
+        self._job = job
+        self._progressive = plan
+        job.add_done_callback(
+            lambda job: idle_add(self._on_window_done, job, generation),
+        )
+        return True
+
+    def _on_window_done(self, job, generation):
+        """Show page with the first chunk of progressive render."""
+        if generation != self._generation or job.cancelled():
+            return
+        self._job = None
+        try:
+            output, stages = job.result()
+        except BrokenExecutor:
+            reset_render_pool()
+            output, stages = (False, "", ""), {}
+        if not output[0]:  # the whole render shows the error
+            self._stop_progressive(generation)
+            return
+        self._timer.merge(stages, "queue")
+        self.show_output(*output)
+
+    def _next_chunk(self, generation):
+        """Render next chunk of progressive render or the whole document."""
+        if generation != self._generation or self._progressive is None:
+            return
+        if self.hidden:  # the rest is rendered again when shown
+            self._progressive = None
+            self._suspended = True
+            return
+        if not self._progressive.rest:
+            self._progressive = None
+            self._render_full()
+            return
+        index, line, src = self._progressive.rest.pop(0)
+        try:
+            job = render_pool().submit(
+                publish_chunk,
+                index,
+                src,
+                *self._render_args()[1:],
+                line_offset=line,
+            )
+        except (BrokenExecutor, RuntimeError):
+            reset_render_pool()
+            self._stop_progressive(generation)
+            return
+        self._job = job
+        job.add_done_callback(
+            lambda job: idle_add(
+                self._on_chunk_done,
+                job,
+                generation,
+                index,
+                priority=PRIORITY_LOW,
+            ),
+        )
+
+    def _on_chunk_done(self, job, generation, index):
+        """Insert rendered chunk to the shown page."""
+        if generation != self._generation or job.cancelled():
+            return
+        self._job = None
+        try:
+            state, html = job.result()
+        except BrokenExecutor:
+            reset_render_pool()
+            state, html = False, ""
+        if not state:
+            self._stop_progressive(generation)
+            return
+        self._body = None  # page does not match any rendered body now
+        self.webview.evaluate_javascript(
+            JS_INSERT_CHUNK % (index, dumps(html)),
+            -1,
+            None,
+            None,
+            None,
+            self.on_chunk_inserted,
+            generation,
+        )
+
+    def on_chunk_inserted(self, webview, result, generation):
+        """Continue with the next chunk of progressive render."""
+        try:
+            if webview.evaluate_javascript_finish(result).to_boolean():
+                self._next_chunk(generation)
+                return
+        except Error:
+            print_exc()
+        self._stop_progressive(generation)
+
+    def _stop_progressive(self, generation):
+        """Stop progressive render and render the whole document."""
+        if generation == self._generation and self._progressive is not None:
+            self._progressive = None
+            self._render_full()
+
+    def show_cached(self):
+        """Show page of the current source from DISK_CACHE if it exists.
+
+        The next rendered page is stored to the cache.
+        """
+        if self.src is None or not self._is_published():
+            return
+        self.persist = True
+        if self.webview is None or self.hidden:
+            return  # rendered when the preview is shown
+        args = self._render_args()
+        html = DISK_CACHE.get(DISK_CACHE.key(*args[:5], file_name=args[5]))
+        if html is not None:
+            self.show_output(True, html, "text/html")
+
+    def persist_output(self):
+        """Store the current page from memory to DISK_CACHE."""
+        if self.src is None or not self._is_published():
+            return
+        args = self._render_args()
+        output = RENDER_CACHE.get(self._cache_key())
+        if output is not None:
+            self._store_page(args, output[1])
+
+    @staticmethod
+    def _store_page(args, html):
+        """Write *html* rendered from publish_html *args* to DISK_CACHE."""
+        key = DISK_CACHE.key(*args[:5], file_name=args[5])
+        _EXECUTOR.submit(DISK_CACHE.put, key, html)
+
+    def update_stylesheets(self, force=False):
+        """Set stylesheets of the current writer and style to the webview.
+
+        Stylesheets are read only when writer or style is changed, or when
+        some of stylesheet files is changed.
+        """
+        key = (self.__writer["key"], self.style)
+        if not self._is_published():
+            key = None
+        if key == self._stylesheets and not force:
+            return
+        self._stylesheets = key
+
+        manager = self.webview.get_user_content_manager()
+        manager.remove_all_style_sheets()
+        for monitor in self._monitors:
+            monitor.cancel()
+        self._monitors = []
+        if key is None:
+            return
+
+        for path in stylesheet_files(*key):
+            try:
+                with open(path, encoding="utf-8") as css:
+                    source = css.read()
+            except OSError:
+                print_exc()
+                continue
+            manager.add_style_sheet(
+                UserStyleSheet(
+                    source,
+                    UserContentInjectedFrames.TOP_FRAME,
+                    UserStyleLevel.AUTHOR,
+                    None,
+                    None,
+                ),
+            )
+            monitor = Gio.File.new_for_path(path).monitor_file(
+                Gio.FileMonitorFlags.NONE,
+                None,
+            )
+            monitor.connect("changed", self.on_stylesheet_changed)
+            self._monitors.append(monitor)
+
+    def on_stylesheet_changed(self, _monitor, _file, _other, event):
+        """Reload stylesheets when some of them is changed."""
+        if event == Gio.FileMonitorEvent.CHANGES_DONE_HINT:
+            self.update_stylesheets(force=True)
+
+    def show_output(self, state, html, mime_type):
+        """Show rendered output in the webview."""
+        timer, self._timer = self._timer, None
+        self.update_stylesheets()
         if html and self.__win.runing:
             if mime_type == "text/html" and "</head>" in html:
                 if not self.style:
@@ -632,43 +1308,171 @@ class Renderer(Overlay):
                 if self._loaded_context == context:
                     body_html = self._extract_body(html)
                     if body_html is not None:
-                        fgcolor = dumps(self.fgcolor)
-                        body_html = dumps(body_html)
-                        self.webview.evaluate_javascript(
-                            (
-                                f"document.fgColor={fgcolor};"
-                                f"document.body.innerHTML={body_html};"
-                            ),
-                            -1,
-                            None,
-                            None,
-                            None,
-                            None,
-                        )
+                        self.patch_body(body_html, timer)
                         if hasattr(self.parser_instance, "inject_fold_js"):
                             self.parser_instance.inject_fold_js(self.webview)
                         self.scroll_to_position(self.pos)
                         return
             file_name = self.file_name or get_home_dir()
             self._pending_context = (self.file_name, mime_type)
+            body_html = self._extract_body(html)
+            self._body = parse_body(body_html) if body_html else None
+            self._load_timer = timer
             self.webview.load_bytes(
                 Bytes(html.encode("utf-8")),
                 mime_type,
                 "UTF-8",
                 "file://" + file_name,
             )
+        else:
+            self.finish_timing(timer, "show")
         if state:
             self.scroll_to_position(self.pos)
 
-    def render(self, src, file_name, pos=0):
-        """Add render task to ui queue."""
+    def finish_timing(self, timer, stage):
+        """Add *timer* of shown render with its last *stage* to timings."""
+        if timer is None:
+            return
+        timer.mark(stage)
+        self.timings.add(
+            timer,
+            file=self.file_name,
+            parser=self.__parser["key"],
+            writer=self.__writer["key"],
+            size=len(self.src or ""),
+            draft=timer.draft,
+        )
+        self.emit("render-timed", timer.total)
+
+    def patch_body(self, body_html, timer=None):
+        """Replace only changed blocks of shown page body with *body_html*.
+
+        Whole body is replaced, when the diff is not possible or when it is
+        too big.
+        """
+        body = parse_body(body_html)
+        ops = None
+        if body is not None and self._body is not None:
+            ops = diff_bodies(self._body, body)
+        self._body = body
+
+        script = f"document.fgColor={dumps(self.fgcolor)};"
+        if ops is None:
+            script += f"document.body.innerHTML={dumps(body_html)};true;"
+        elif ops:
+            script += JS_PATCH % dumps(ops)
+        else:
+            script += "true;"
+        if timer is not None:
+            timer.mark("diff")
+        self.webview.evaluate_javascript(
+            script,
+            -1,
+            None,
+            None,
+            None,
+            self.on_body_patched,
+            timer,
+        )
+
+    def on_body_patched(self, webview, result, timer):
+        """Reload the whole page, when the patch does not fit to the DOM."""
+        try:
+            value = webview.evaluate_javascript_finish(result)
+            if value.to_boolean():
+                self.finish_timing(timer, "patch")
+                return
+        except Error:
+            print_exc()
+        self._loaded_context = None
+        self._body = None
+        idle_add(self.do_render)
+
+    def render(self, src, file_name, pos=0, draft=False):
+        """Add render task to ui queue, *draft* while typing.
+
+        *pos* is None, when the editor is not visible, so the page keeps
+        its position.
+        """
         self.src = src
         self.pos = pos
         self.file_name = file_name
+        idle_add(self.do_render, draft)
+
+    def render_idle(self):
+        """Render fully the source shown as draft, when typing stopped."""
         idle_add(self.do_render)
 
+    def close(self):
+        """Release the webview from the shared preview context.
+
+        Theme, system font, stylesheet and dependency changes are not
+        followed anymore.
+        """
+        for obj, handler in self._theme_handlers:
+            obj.disconnect(handler)
+        self._theme_handlers = []
+        self._desktop_settings = None
+        for monitor in self._monitors:
+            monitor.cancel()
+        self._monitors = []
+        for monitor in self._dependency_monitors.values():
+            monitor.cancel()
+        self._dependency_monitors = {}
+        if self._context is not None and self.webview is not None:
+            self._context.release(self.webview)
+
+    def hibernate(self):
+        """Drop the WebView and the source, keep the last rendered page.
+
+        The WebView is created again when the preview is mapped, and the
+        kept page is shown if the source is the same.
+        """
+        self._generation += 1
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
+        self._progressive = None
+        self._kept = None
+        if self.src is not None and self._is_published():
+            key = self._cache_key()
+            output = RENDER_CACHE.get(key)
+            if output is not None:
+                self._kept = (key, output)
+        self.close()
+        if self.webview is not None:
+            self.set_child(None)
+            self.webview = None
+            if isinstance(self.parser_instance, JSONPreview):
+                self.parser_instance.webview = None
+        self.search.stop()
+        self.src = None
+        self._lines = None
+        self._body = None
+        self._loaded_context = self._pending_context = None
+        self._stylesheets = None
+        self._suspended = False
+
     def print_page(self):
-        """Print the rendered page."""
+        """Print the rendered page.
+
+        Source changed while the preview was hidden is rendered first, and
+        the page is printed when it is loaded.
+        """
+        if self.src is not None and (
+            self.webview is None or self._suspended
+        ):
+            self._print_pending = True
+            self._loaded_context = None  # load the page, don't patch it
+            if self.webview is None:
+                self._create_webview()
+            else:
+                self.do_render()
+            return
+        self._run_print()
+
+    def _run_print(self):
+        """Run print dialog for the loaded page."""
         po = PrintOperation.new(self.webview)
         po.connect("failed", self.on_print_failed)
         po.run_dialog(self.__win)
@@ -690,6 +1494,8 @@ class Renderer(Overlay):
         if load_event != LoadEvent.FINISHED:
             return
         self._loaded_context = self._pending_context
+        timer, self._load_timer = self._load_timer, None
+        self.finish_timing(timer, "load_bytes")
         self.webview.evaluate_javascript(
             f"document.fgColor='{self.fgcolor}'",
             -1,
@@ -699,63 +1505,102 @@ class Renderer(Overlay):
             None,
         )
         self.scroll_to_position(None)
+        if self._print_pending:
+            self._print_pending = False
+            self._run_print()
+        if self._progressive is not None:
+            self._next_chunk(self._generation)
 
     def do_next_match(self, text):
-        """Find next metch."""
-        controller = self.webview.get_find_controller()
-        if controller.get_search_text() != text:
-            self.search_done = None
-            controller.search(text, FindOptions.WRAP_AROUND, MAXUINT)
-            while self.search_done is None:
-                MainContext.default().iteration(False)
-        elif self.search_done:
-            controller.search_next()
-
-        return self.search_done
+        """Find next match, result is emitted by search-matches signal."""
+        self._search(text, backwards=False)
 
     def do_previous_match(self, text):
-        """Find previous match."""
+        """Find previous match, result is emitted by search-matches signal."""
+        self._search(text, backwards=True)
+
+    def _search(self, text, backwards):
+        """Start search of *text*, or stop it for empty text."""
+        if not text:
+            self.stop_search()
+            self.emit("search-matches", 0, -1)
+            return
+        if self.webview is None:
+            self.emit("search-matches", 0, 0)
+            return
+        self.search.search(text, backwards)
+
+    def _send_search(self, kind, text, backwards):
+        """Send PreviewSearch request to the find controller."""
         controller = self.webview.get_find_controller()
-        if controller.get_search_text() != text:
-            self.search_done = None
-            controller.search(
-                text,
-                FindOptions.WRAP_AROUND | FindOptions.BACKWARDS,
-                MAXUINT,
-            )
-            while self.search_done is None:
-                MainContext.default().iteration(False)
-        elif self.search_done:
+        options = FindOptions.WRAP_AROUND
+        if backwards:
+            options |= FindOptions.BACKWARDS
+        if kind == SEARCH:
+            controller.search(text, options, MAXUINT)
+        elif kind == NEXT:
+            controller.search_next()
+        elif kind == PREVIOUS:
             controller.search_previous()
-
-        return self.search_done
+        else:
+            controller.count_matches(text, options, MAXUINT)
 
     def stop_search(self):
         """Stop searching."""
-        controller = self.webview.get_find_controller()
-        controller.search_finish()
+        self.search.stop()
+        if self.webview is not None:
+            self.webview.get_find_controller().search_finish()
 
-    def on_found_text(self, *_):
-        """Mark search as done."""
-        self.search_done = True
+    def on_found_text(self, _controller, _count):
+        """Finish search request with success."""
+        self.search.finished(True)
 
-    def on_faild_to_find_text(self, _):
-        """Mark search as not done."""
-        self.search_done = False
+    def on_faild_to_find_text(self, _controller):
+        """Finish search request without success."""
+        self.search.finished(False)
+
+    def on_counted_matches(self, _controller, count):
+        """Finish count request."""
+        self.search.finished(count)
 
     def scroll_to_position(self, position):
-        """Scroll to right cursor position."""
+        """Scroll to editor position, ratio of the source or vim offset.
+
+        Position is mapped to the source line, which is found on the page
+        by its ``data-line`` attribute. Without the editor position, the
+        source line, which was at the top of the page, stays there.
+        """
         if position is not None:
             self.pos = position
+        if self.webview is None or self.hidden:
+            return  # position is used by the next render
 
+        lines = self.lines
+        if self.pos is None:  # editor is not visible
+            if self._top_line:
+                self._scroll_to_line(self._top_line, 0.0)
+            return
         if self.pos > 1:  # vim
-            a, b = len(self.src[:self.pos]), len(self.src[self.pos:])
-            position = (float(a) / (a + b)) if a or b else 0
+            line = lines.line(int(self.pos))
+            ratio = lines.ratio(line)
         else:
-            position = self.pos
+            ratio = self.pos
+            line = lines.line_at(ratio)
+        self._scroll_to_line(line, ratio)
+
+    def scroll_to_line(self, line, ratio):
+        """Scroll source *line* to *ratio* of the page height.
+
+        *ratio* is the editor position too, used after next render.
+        """
+        self.pos = ratio
+        if self.webview is not None:
+            self._scroll_to_line(line, ratio)
 
+    def _scroll_to_line(self, line, ratio):
+        """Run JS_SCROLL_LINE script."""
         self.webview.evaluate_javascript(
-            JS_SCROLL % position,
+            JS_SCROLL_LINE % (line, ratio, ratio),
             -1,
             None,
             None,
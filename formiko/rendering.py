@@ -0,0 +1,572 @@
+"""Docutils rendering pipeline independent of GTK and WebKit.
+
+Everything in this module may run in render worker processes, so it must
+import only docutils and formiko modules which do not need GTK.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
+from hashlib import blake2b
+from io import StringIO
+from multiprocessing import get_context
+from os.path import abspath
+from traceback import format_exc
+
+from docutils import DataError
+from docutils.core import Publisher
+from docutils.io import StringInput, StringOutput
+from docutils.parsers.rst import Parser as RstParser
+from docutils.readers.pep import Reader as PepReader
+from docutils.readers.standalone import Reader as StandaloneReader
+from docutils.utils import DependencyList, get_stylesheet_list
+from docutils.writers.html4css1 import Writer as Writer4css1
+from docutils.writers.html5_polyglot import Writer as Html5Writer
+from docutils.writers.pep_html import Writer as WriterPep
+from docutils.writers.s5_html import Writer as WriterS5
+
+from formiko.dependencies import scan_dependencies
+from formiko.directives import (
+    M2R_BLOCKS,
+    HtmlPreview,
+    Mark2Resturctured,
+    TinyWriter,
+)
+from formiko.draft import DRAFT_REPORT_LEVEL, draft_transforms
+from formiko.incremental import RE_VOLATILE, IncrementalReader, SectionCache
+from formiko.lazy_layout import lazy_layout_translator
+from formiko.line_map import line_map_translator
+from formiko.markdown import MarkdownParser
+from formiko.timings import StageTimer
+
+RENDER_WORKERS = 2
+RENDER_CACHE_BYTES = 64 * 1024 * 1024  # size of rendered pages in memory
+LINE_MAP_PARSERS = ("rst", "md")  # parsers keeping source lines of nodes
+
+PARSERS = {
+    "rst": {
+        "key": "rst",
+        "title": "Docutils reStructuredText parser",
+        "class": RstParser,
+        "package": "docutils",
+        "url": "http://docutils.sourceforge.net",
+    },
+    "m2r": {
+        "key": "m2r",
+        "title": "MarkDown to reStructuredText",
+        "class": Mark2Resturctured,
+        "url": "https://github.com/crossnox/m2r2",
+    },
+    "md": {
+        "key": "md",
+        "title": "Native MarkDown parser",
+        "class": MarkdownParser,
+        "package": "mistune",
+        "url": "https://github.com/lepture/mistune",
+    },
+    "html": {
+        "key": "html",
+        "title": "HTML preview",
+        "class": HtmlPreview,
+    },
+}
+
+WRITERS = {
+    "html4": {
+        "key": "html4",
+        "title": "Docutils HTML4 writer",
+        "class": Writer4css1,
+        "package": "docutils",
+        "url": "https://www.docutils.org",
+    },
+    "s5": {
+        "key": "s5",
+        "title": "Docutils S5/HTML slide show writer",
+        "class": WriterS5,
+        "package": "docutils",
+        "url": "https://www.docutils.org",
+    },
+    "pep": {
+        "key": "pep",
+        "title": "Docutils PEP HTML writer",
+        "class": WriterPep,
+        "package": "docutils",
+        "url": "https://www.docutils.org",
+    },
+    "tiny": {
+        "key": "tiny",
+        "title": "Tiny HTML writer",
+        "class": TinyWriter,
+        "package": "docutils-tinyhtmlwriter",
+        "url": "https://github.com/ondratu/docutils-tinyhtmlwriter",
+    },
+    "html5": {
+        "key": "html5",
+        "title": "HTML 5 writer",
+        "class": Html5Writer,
+        "package": "docutils",
+        "url": "https://www.docutils.org",
+    },
+}
+
+DATA_ERROR = """
+<html>
+  <head></head>
+  <body>
+    <h1>%s Error!</h1>
+    <p style="color:red; text-width:weight;">%s</p>
+  </body>
+</html>
+"""
+
+NOT_IMPLEMENTED_ERROR = """
+<html>
+  <head></head>
+  <body>
+    <h1>Library Error</h1>
+    <p>Sorry about that. This seems to be not supported functionality in
+       dependent library Reader or Writer</p>
+    <pre style="color:red; text-width:weight;">%s</pre>
+  </body>
+</html>
+"""
+
+NOT_FOUND = """
+<html>
+  <head></head>
+  <body>
+    <h1>Commponent {title} Not Found!</h1>
+    <p>Component <b>{title}</b> which you want to use is not found.
+       See <a href="{url}">{url}</a> for mor details and install it
+       to system.
+    </p>
+  </body>
+</html>
+"""
+
+EXCEPTION_ERROR = """
+<html>
+  <head></head>
+  <body>
+    <h1>Exception Error!</h1>
+    <pre style="color:red; text-width:weight;">%s</pre>
+  </body>
+</html>
+"""
+
+# parser and writer instances are reusable, so every process keeps its own
+_INSTANCES = {}
+
+# parsed top-level sections for incremental rendering
+_SECTIONS = SectionCache()
+
+# prepared publishers by (parser, writer, style, tab_width)
+_PUBLISHERS = {}
+
+_POOL = None
+
+
+def _instance(table, key):
+    """Return cached instance of parser or writer class from *table*."""
+    klass = table[key]["class"]
+    if klass not in _INSTANCES:
+        _INSTANCES[klass] = klass()
+    return _INSTANCES[klass]
+
+
+class PreparedPublisher:
+    """Docutils components with settings prepared for repeated publishing.
+
+    Settings are processed only once, each publish gets a copy of them, so
+    publishing does only parse, transforms and write.
+    """
+
+    def __init__(self, parser, writer, style="", tab_width=8):
+        self.writer = _instance(WRITERS, writer)
+        if hasattr(self.writer, "translator_class"):
+            self.writer.translator_class = lazy_layout_translator(
+                line_map_translator(self.writer.translator_class),
+            )
+        if writer == "pep":
+            reader = PepReader()  # pep is allways rst
+            self.readers = {False: reader, True: reader}
+        else:
+            parser_instance = _instance(PARSERS, parser)
+            self.readers = {
+                False: StandaloneReader(parser=parser_instance),
+                True: IncrementalReader(parser_instance, _SECTIONS),
+            }
+        overrides = {
+            "embed_stylesheet": True,
+            "tab_width": tab_width,
+            "traceback": True,
+        }
+        if style:
+            overrides["stylesheet"] = style
+            overrides["stylesheet_path"] = []
+        self.settings = self.publisher(self.readers[False]).get_settings(
+            **overrides,
+        )
+        self.timings = {}  # stages of the last publish
+        self.dependencies = set()  # files read by the last publish
+
+    def publisher(self, reader, settings=None):
+        """Return new docutils Publisher with prepared components."""
+        return Publisher(
+            reader,
+            reader.parser,
+            self.writer,
+            source_class=StringInput,
+            destination_class=StringOutput,
+            settings=settings,
+        )
+
+    def publish(
+        self,
+        src,
+        file_name=None,
+        incremental=False,
+        embed_stylesheet=True,
+        line_offset=None,
+        *,
+        draft=False,
+        lazy_layout=False,
+    ):
+        """Publish *src* and return html string.
+
+        Without *embed_stylesheet*, the page has no stylesheet at all, it
+        must be set by the caller, see ``stylesheet_files``. When
+        *line_offset* is set, block elements have ``data-line`` attribute
+        with source line plus *line_offset*. The *draft* page has no
+        stylesheet and no system messages, and only transforms from
+        ``formiko.draft`` are applied. With *lazy_layout*, top-level
+        sections are laid out only when they are visible, see
+        ``formiko.lazy_layout``. Timings of stages are stored in
+        ``self.timings`` and files read by directives in
+        ``self.dependencies``.
+        """
+        settings = copy(self.settings)
+        settings.source_line_offset = line_offset
+        settings.lazy_layout = lazy_layout
+        if not embed_stylesheet or draft:
+            settings.stylesheet = settings.stylesheet_path = []
+        if draft:
+            settings.report_level = DRAFT_REPORT_LEVEL
+        _, output = self._publish(
+            src,
+            file_name,
+            incremental,
+            settings,
+            draft,
+        )
+        return output.decode("utf-8")
+
+    def fragment(
+        self,
+        src,
+        file_name=None,
+        incremental=False,
+        line_offset=None,
+    ):
+        """Publish *src* and return only the html body part.
+
+        Document title and docinfo transforms are not applied, so *src*
+        could be any part of a document split on its sections.
+        """
+        settings = copy(self.settings)
+        settings.source_line_offset = line_offset
+        settings.doctitle_xform = False
+        settings.sectsubtitle_xform = False
+        settings.docinfo_xform = False
+        publisher, _ = self._publish(src, file_name, incremental, settings)
+        return publisher.writer.parts["body"]
+
+    def _publish(self, src, file_name, incremental, settings, draft=False):
+        """Publish *src* with *settings* copy, return publisher and output."""
+        timer = StageTimer()
+        settings.warning_stream = StringIO()
+        settings.file_name = file_name
+        settings.record_dependencies = DependencyList()
+        publisher = self.publisher(self.readers[incremental], settings)
+        publisher.set_source(src, file_name)
+        publisher.set_destination()
+        timer.mark("setup")
+
+        # same as Publisher.publish with settings.traceback
+        publisher.document = publisher.reader.read(
+            publisher.source,
+            publisher.parser,
+            settings,
+        )
+        timer.mark("parse")
+        transformer = publisher.document.transformer
+        transformer.populate_from_components(
+            (
+                publisher.source,
+                publisher.reader,
+                publisher.reader.parser,
+                publisher.writer,
+                publisher.destination,
+            ),
+        )
+        if draft:
+            draft_transforms(transformer)
+        transformer.apply_transforms()
+        timer.mark("transforms")
+        output = publisher.writer.write(
+            publisher.document,
+            publisher.destination,
+        )
+        publisher.writer.assemble_parts()
+        timer.mark("writer")
+
+        self.timings = timer.stages
+        # relative to the working directory of this process
+        self.dependencies = {
+            abspath(path) for path in settings.record_dependencies.list
+        }
+        if file_name:  # missing files are not recorded, but could be created
+            self.dependencies |= scan_dependencies(file_name, src)
+        return publisher, output
+
+
+def prepared_publisher(parser, writer, style="", tab_width=8):
+    """Return cached PreparedPublisher for the arguments."""
+    key = (parser, writer, style, tab_width)
+    if key not in _PUBLISHERS:
+        _PUBLISHERS[key] = PreparedPublisher(*key)
+    return _PUBLISHERS[key]
+
+
+def stylesheet_files(writer, style=""):
+    """Return paths of stylesheets, which *writer* embeds to the page."""
+    settings = prepared_publisher("rst", writer, style).settings
+    return get_stylesheet_list(settings)
+
+
+def publish_html(  # noqa: PLR0917
+    src,
+    parser,
+    writer,
+    style="",
+    tab_width=8,
+    file_name=None,
+    incremental=False,
+    *,
+    embed_stylesheet=True,
+    timings=None,
+    line_offset=None,
+    dependencies=None,
+    draft=False,
+    lazy_layout=False,
+):
+    """Publish *src* with docutils and return (state, html, mime_type).
+
+    *parser* and *writer* are keys from ``PARSERS`` and ``WRITERS``.
+    Arguments up to *incremental* are passed as one tuple to render jobs
+    and cache keys, the other options are keyword-only. Errors are returned
+    as HTML error pages, never raised. When *incremental* is set, only
+    changed top-level sections of reStructuredText are parsed.
+    Stage timings are stored to *timings* dictionary if it is set, and
+    absolute paths of files and directories read by the document are added
+    to *dependencies* set if it is set. See ``PreparedPublisher.publish``
+    for *line_offset*, *draft* and *lazy_layout*.
+    """
+    try:
+        publisher = prepared_publisher(parser, writer, style, tab_width)
+        html = publisher.publish(
+            src,
+            file_name,
+            incremental,
+            embed_stylesheet,
+            line_offset,
+            draft=draft,
+            lazy_layout=lazy_layout,
+        )
+        if timings is not None:
+            timings.update(publisher.timings)
+        if dependencies is not None:
+            dependencies.update(publisher.dependencies)
+
+    except DataError as e:
+        return False, DATA_ERROR % ("Data", e), "text/html"
+
+    except NotImplementedError:
+        exc_str = format_exc()
+        return False, NOT_IMPLEMENTED_ERROR % exc_str, "text/html"
+
+    except BaseException:
+        exc_str = format_exc()
+        return False, EXCEPTION_ERROR % exc_str, "text/html"
+
+    return True, html, "text/html"
+
+
+def render_document(  # noqa: PLR0917
+    src,
+    parser,
+    writer,
+    style="",
+    tab_width=8,
+    file_name=None,
+    incremental=False,
+    *,
+    embed_stylesheet=True,
+    line_offset=None,
+    dependencies=None,
+    draft=False,
+    lazy_layout=False,
+):
+    """Return (state, html, mime_type) of *src* for preview or export.
+
+    Arguments are the same as for ``publish_html``. HTML source is returned
+    as it is, and missing parser or writer is reported by an error page.
+    """
+    if PARSERS[parser]["class"] is None:
+        return False, NOT_FOUND.format(**PARSERS[parser]), "text/html"
+    if WRITERS[writer]["class"] is None:
+        return False, NOT_FOUND.format(**WRITERS[writer]), "text/html"
+    if issubclass(PARSERS[parser]["class"], HtmlPreview):
+        return False, src, "text/html"  # output to file or html preview
+    return publish_html(
+        src,
+        parser,
+        writer,
+        style,
+        tab_width,
+        file_name,
+        incremental,
+        embed_stylesheet=embed_stylesheet,
+        line_offset=line_offset,
+        dependencies=dependencies,
+        draft=draft,
+        lazy_layout=lazy_layout,
+    )
+
+
+def publish_timed(*args, **kwargs):
+    """Return publish_html output and its stage timings in seconds."""
+    timings = {}
+    output = publish_html(*args, timings=timings, **kwargs)
+    return output, timings
+
+
+def publish_recorded(*args, **kwargs):
+    """Return publish_timed output with files read by the document."""
+    timings = {}
+    dependencies = set()
+    output = publish_html(
+        *args,
+        timings=timings,
+        dependencies=dependencies,
+        **kwargs,
+    )
+    return output, timings, frozenset(dependencies)
+
+
+class RenderCache:
+    """Bounded LRU cache of rendered pages, limited by size in bytes."""
+
+    def __init__(self, max_bytes=RENDER_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.pages = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(src, *args, dependencies=None):
+        """Return cache key for publish_html arguments.
+
+        Output of sources which read other files can change without
+        changing the source, so they are cached only with *dependencies*,
+        a state of files they read, see ``dependencies.stamp``. Returns
+        None when such source has no *dependencies*.
+        """
+        volatile = RE_VOLATILE.search(src)
+        if volatile and dependencies is None:
+            return None
+        digest = blake2b(src.encode("utf-8"), digest_size=16)
+        digest.update(repr(args).encode("utf-8"))
+        if volatile:
+            digest.update(repr(sorted(dependencies.items())).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return cached (state, html, mime_type) or None."""
+        if key is None:
+            return None
+        output = self.pages.get(key)
+        if output is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.pages.move_to_end(key)
+        return output[1:]
+
+    def put(self, key, output):
+        """Store successfully rendered (state, html, mime_type) *output*."""
+        if key is None or not output[0]:
+            return
+        size = len(output[1].encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        if key in self.pages:
+            self.size -= self.pages.pop(key)[0]
+        self.pages[key] = (size, *output)
+        self.size += size
+        while self.size > self.max_bytes:
+            self.size -= self.pages.popitem(last=False)[1][0]
+
+    def clear(self):
+        """Remove all cached pages."""
+        self.pages.clear()
+        self.size = 0
+
+
+# rendered pages in the application process, shared by all documents
+RENDER_CACHE = RenderCache()
+
+
+def clear_caches(*, publishers=False):
+    """Remove rendered pages, parsed sections and converted blocks.
+
+    Prepared publishers are removed too, when *publishers* is set.
+    """
+    RENDER_CACHE.clear()
+    _SECTIONS.clear()
+    if M2R_BLOCKS is not None:
+        M2R_BLOCKS.clear()
+    if publishers:
+        _PUBLISHERS.clear()
+
+
+def _warm_up():
+    """Import docutils lazy modules in a fresh worker process."""
+    publish_html("Formiko\n=======\n", "rst", "html4")
+
+
+def render_pool():
+    """Return shared process pool for rendering, create it when needed.
+
+    Workers are forked from a clean forkserver process with this module
+    already imported, so they never share GTK state with the application.
+    """
+    global _POOL  # noqa: PLW0603
+    if _POOL is None:
+        context = get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        _POOL = ProcessPoolExecutor(
+            max_workers=RENDER_WORKERS,
+            mp_context=context,
+            initializer=_warm_up,
+        )
+    return _POOL
+
+
+def reset_render_pool():
+    """Drop broken render pool, so the next call creates a new one."""
+    global _POOL  # noqa: PLW0603
+    if _POOL is not None:
+        _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
@@ -0,0 +1,73 @@
+"""Adaptive scheduling of preview renders while typing."""
+
+IMMEDIATE_RENDER = 0.05  # documents rendered faster are rendered at once
+PAUSE_FACTOR = 2  # typing pause is this times the last render time
+MIN_PAUSE = 0.1
+MAX_PAUSE = 1.0
+MAX_STALENESS = 2.0  # the oldest change waits at most this long
+IDLE_FULL_RENDER = 1.0  # typing pause before draft is rendered fully
+
+
+class RenderScheduler:
+    """Decide when changed source should be rendered.
+
+    Cheap documents are rendered on each change. Expensive ones wait until
+    typing pauses for a time derived from the last render time, but never
+    longer than *max_staleness* after the first not rendered change.
+    Expensive documents are rendered as drafts while typing, and fully
+    when the source is not changed for *idle* time. Times are in seconds
+    from a monotonic clock.
+    """
+
+    def __init__(self, max_staleness=MAX_STALENESS, idle=IDLE_FULL_RENDER):
+        self.max_staleness = max_staleness
+        self.idle = idle
+        self.first_change = None
+        self.last_change = None
+        self.draft_change = None  # last change rendered only as draft
+
+    def changed(self, now):
+        """Note source change at *now*."""
+        if self.first_change is None:
+            self.first_change = now
+        self.last_change = now
+
+    @staticmethod
+    def pause(render_time):
+        """Return typing pause needed before render."""
+        return min(max(render_time * PAUSE_FACTOR, MIN_PAUSE), MAX_PAUSE)
+
+    def due(self, now, render_time):
+        """Return True if changes should be rendered at *now*.
+
+        *render_time* is the last measured full render time or None.
+        """
+        if self.first_change is None:
+            return False
+        if render_time is None or render_time < IMMEDIATE_RENDER:
+            return True
+        return (
+            now - self.last_change >= self.pause(render_time)
+            or now - self.first_change >= self.max_staleness
+        )
+
+    @staticmethod
+    def draft(render_time):
+        """Return True if due render should be draft.
+
+        *render_time* is the last measured full render time or None.
+        """
+        return render_time is not None and render_time >= IMMEDIATE_RENDER
+
+    def full_due(self, now):
+        """Return True if draft should be rendered fully at *now*."""
+        return (
+            self.first_change is None
+            and self.draft_change is not None
+            and now - self.draft_change >= self.idle
+        )
+
+    def rendered(self, draft=False):
+        """Note that all changes were sent to render, maybe as *draft*."""
+        self.draft_change = self.last_change if draft else None
+        self.first_change = self.last_change = None
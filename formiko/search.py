@@ -0,0 +1,99 @@
+"""Asynchronous search in the preview with match counting."""
+
+SEARCH = "search"
+NEXT = "next"
+PREVIOUS = "previous"
+COUNT = "count"
+
+
+class PreviewSearch:
+    """State of asynchronous search, independent of WebKit.
+
+    *send* is called with (kind, text, backwards) to start one request, and
+    ``finished`` must be called with its result: True or False for search
+    requests, number of matches for count request. Only one request is sent
+    at once, newer requests wait, and only the last one waits. Results of
+    requests for older text are dropped.
+
+    *changed* is called with (index, count) of the current match, index is
+    0 when nothing is found and count is -1 until matches are counted.
+    """
+
+    def __init__(self, send, changed):
+        self.send = send
+        self.changed = changed
+        self.busy = None  # (kind, text) of the sent request
+        self.pending = None  # (kind, text, backwards) of the waiting one
+        self.text = None
+        self.index = 0
+        self.count = -1
+
+    def search(self, text, backwards=False):
+        """Find *text*, or move to the next or previous match of it."""
+        if text == self.text and self.index:
+            self._request(PREVIOUS if backwards else NEXT, backwards)
+            return
+        self.text = text
+        self.index = -1 if backwards else 0  # -1 is the last match
+        self.count = -1
+        self._request(SEARCH, backwards)
+
+    def stop(self):
+        """Forget the search, results of the sent request are dropped.
+
+        The sent request is forgotten too, it could be never answered, when
+        the WebView is dropped.
+        """
+        self.busy = None
+        self.text = None
+        self.pending = None
+        self.index = 0
+        self.count = -1
+
+    def _request(self, kind, backwards):
+        """Send request now, or when the sent one is finished."""
+        if self.busy is not None:
+            self.pending = (kind, self.text, backwards)
+            return
+        self.busy = (kind, self.text)
+        self.send(kind, self.text, backwards)
+
+    def finished(self, result):
+        """Apply *result* of the sent request and send the waiting one."""
+        if self.busy is None:
+            return
+        (kind, text), self.busy = self.busy, None
+        if text == self.text:
+            self._apply(kind, result)
+            if kind == SEARCH and result:  # count before other requests
+                self.busy = (COUNT, text)
+                self.send(COUNT, text, False)
+                return
+        pending, self.pending = self.pending, None
+        if pending is not None and pending[1] == self.text:
+            self._request(pending[0], pending[2])
+
+    def _apply(self, kind, result):
+        """Update the current match by *result* of *kind* request."""
+        if kind == COUNT:
+            self.count = result
+            if self.index == -1 or self.index > result:
+                self.index = result
+        elif not result:
+            self.index, self.count = 0, 0
+        elif kind == SEARCH:
+            if self.index == 0:
+                self.index = 1
+        elif self.count > 0:
+            step = -1 if kind == PREVIOUS else 1
+            self.index = (self.index - 1 + step) % self.count + 1
+        self.changed(self.index, self.count)
+
+
+def matches_label(index, count):
+    """Return "n of m" label of the current match."""
+    if count < 0:
+        return "…" if index else ""
+    if count == 0:
+        return "no matches"
+    return f"{index} of {count}"
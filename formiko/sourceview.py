@@ -38,6 +38,7 @@ from formiko.format_utils import (
     compute_toggle_ordered,
     compute_toggle_rst_header,
 )
+from formiko.hibernation import CompressedText
 from formiko.widgets import ActionHelper, ImutableDict
 
 try:
@@ -78,6 +79,8 @@ class SourceView(Gtk.ScrolledWindow, ActionHelper):
     __last_changes = 0
     __last_ctime = 0
     __pause_period = False
+    __hibernated = None  # CompressedText of the hibernated editor
+    __checking = True  # check_in_thread loop is running
 
     __gsignals__ = ImutableDict(
         {
@@ -454,6 +457,9 @@ class SourceView(Gtk.ScrolledWindow, ActionHelper):
 
         This function is called from GLib.timeout_add
         """
+        if self.__hibernated is not None:
+            self.__checking = False
+            return  # restarted by restore
         if not self.__file_name:
             timeout_add(200, self.check_in_thread)
             return
@@ -489,6 +495,48 @@ class SourceView(Gtk.ScrolledWindow, ActionHelper):
         self.__pause_period = False
         timeout_add(200, self.check_in_thread)
 
+    @property
+    def can_hibernate(self):
+        """Return True, if the text is saved and no dialog is waiting.
+
+        Restored text has no undo history, so the editor with some undo
+        history never hibernates.
+        """
+        return (
+            not self.is_modified
+            and not self.__pause_period
+            and not self.text_buffer.get_can_undo()
+        )
+
+    def hibernate(self):
+        """Keep only compressed text, and stop checking the source file."""
+        if self.__hibernated is not None:
+            return
+        cursor = self.text_buffer.get_insert()
+        offset = self.text_buffer.get_iter_at_mark(cursor).get_offset()
+        self.__hibernated = CompressedText(self.text, offset)
+        self._set_saved_text("")
+
+    def restore(self):
+        """Restore text of the hibernated editor."""
+        hibernated, self.__hibernated = self.__hibernated, None
+        if hibernated is None:
+            return
+        self._set_saved_text(hibernated.text)
+        cursor = self.text_buffer.get_iter_at_offset(hibernated.offset)
+        self.text_buffer.place_cursor(cursor)
+        idle_add(self.scroll_to_cursor, cursor)
+        if not self.__checking:
+            self.__checking = True
+            timeout_add(200, self.check_in_thread)
+
+    def _set_saved_text(self, text):
+        """Set *text* without undo history, as not modified."""
+        self.text_buffer.begin_irreversible_action()
+        self.text_buffer.set_text(text)
+        self.text_buffer.end_irreversible_action()
+        self.text_buffer.set_modified(False)
+
     def period_save_thread(self):
         """Create timeouted save."""
         if self.period_save:
@@ -521,6 +569,18 @@ class SourceView(Gtk.ScrolledWindow, ActionHelper):
         """Scroll to cursor position."""
         self.source_view.scroll_to_iter(cursor, 0, 1, 1, 1)
 
+    def line_at(self, ratio):
+        """Return line, from 1, shown at *ratio* of the view height."""
+        adj = self.source_view.get_vadjustment()
+        y = adj.get_value() + adj.get_page_size() * ratio
+        line_iter, _ = self.source_view.get_line_at_y(int(y))
+        return line_iter.get_line() + 1
+
+    def scroll_to_line(self, line, ratio=0.0):
+        """Scroll *line*, from 1, to *ratio* of the view height."""
+        _, line_iter = self.text_buffer.get_iter_at_line(line - 1)
+        self.source_view.scroll_to_iter(line_iter, 0, True, 0, ratio)
+
     def save_to_file(self):
         """Save text to file."""
         try:
@@ -253,6 +253,9 @@ class Statusbar(Gtk.Box):
         bar = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
         bar.stat_label = Gtk.Label()
         bar.append(bar.stat_label)
+        bar.render_label = Gtk.Label()
+        bar.render_label.set_margin_start(10)
+        bar.append(bar.render_label)
         return bar
 
     def _update_stat_label(self):
@@ -272,6 +275,27 @@ class Statusbar(Gtk.Box):
         self._chars_count = count
         self._update_stat_label()
 
+    def set_render_timings(self, timings):
+        """Set last, median and 95th percentile render time label."""
+        if timings.last is None:
+            self.info_bar.render_label.set_label("")
+            return
+        last, p50, p95 = (
+            round(value * 1000)
+            for value in (
+                timings.last,
+                timings.percentile(50),
+                timings.percentile(95),
+            )
+        )
+        self.info_bar.render_label.set_label(
+            f"render\N{NO-BREAK SPACE}{last}\N{NO-BREAK SPACE}ms"
+            f" (p50\N{NO-BREAK SPACE}{p50}, p95\N{NO-BREAK SPACE}{p95})",
+        )
+        self.info_bar.render_label.set_tooltip_text(
+            "Last render time, median and 95th percentile of last renders",
+        )
+
     def push(self, context_id, text):
         """Set message to status bar."""
         self.message_label.set_text(text)
@@ -0,0 +1,95 @@
+"""Render stage timings and their rolling statistics.
+
+When the ``FORMIKO_TIMINGS_LOG`` environment variable is set, timings of
+each render are written as JSON lines to the file it names, or to stderr
+for ``-``.
+"""
+
+import sys
+from collections import deque
+from json import dumps
+from math import ceil
+from os import environ
+from time import perf_counter, time
+from traceback import print_exc
+
+TIMINGS_LOG = environ.get("FORMIKO_TIMINGS_LOG")
+TIMINGS_WINDOW = 100  # renders in rolling statistics
+
+
+class StageTimer:
+    """Measure consecutive stages with a monotonic clock."""
+
+    def __init__(self):
+        self.stages = {}
+        self.last = perf_counter()
+        self.draft = False  # measured render is draft
+
+    def mark(self, stage):
+        """End *stage*, which started by the previous mark."""
+        now = perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0) + now - self.last
+        self.last = now
+
+    def merge(self, stages, stage):
+        """End *stage*, which contains *stages* measured elsewhere."""
+        self.mark(stage)
+        self.stages[stage] = max(
+            self.stages[stage] - sum(stages.values()),
+            0,
+        )
+        self.stages.update(stages)
+
+    @property
+    def total(self):
+        """Return time of all stages in seconds."""
+        return sum(self.stages.values())
+
+
+class RenderTimings:
+    """Rolling statistics of render times."""
+
+    def __init__(self, size=TIMINGS_WINDOW, log=TIMINGS_LOG):
+        self.totals = deque(maxlen=size)
+        self.log = log
+        self.last = None
+
+    def add(self, timer, **context):
+        """Add finished StageTimer and log it with *context* values.
+
+        Only full renders are stored to ``last``, which is used for render
+        scheduling, draft renders are much faster.
+        """
+        if not timer.draft:
+            self.last = timer.total
+        self.totals.append(timer.total)
+        if self.log:
+            self.write_log(timer, context)
+
+    def percentile(self, percent):
+        """Return *percent* percentile of render times in seconds."""
+        if not self.totals:
+            return None
+        values = sorted(self.totals)
+        index = ceil(len(values) * percent / 100) - 1  # nearest rank
+        return values[max(index, 0)]
+
+    def write_log(self, timer, context):
+        """Write one JSON line with timings in milliseconds."""
+        record = {
+            "time": time(),
+            **context,
+            "total": round(timer.total * 1000, 3),
+            "stages": {
+                key: round(value * 1000, 3)
+                for key, value in timer.stages.items()
+            },
+        }
+        try:
+            if self.log == "-":
+                sys.stderr.write(dumps(record) + "\n")
+                return
+            with open(self.log, "a", encoding="utf-8") as log:
+                log.write(dumps(record) + "\n")
+        except OSError:
+            print_exc()
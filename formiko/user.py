@@ -12,6 +12,8 @@ from gi.repository.GLib import (
 )
 from gi.repository.Gtk import Orientation
 
+from formiko.hibernation import HIBERNATE_AFTER
+from formiko.preview_context import PREVIEW_MEMORY_LIMIT, PREVIEW_PROCESSES
 from formiko.renderer import PARSERS
 
 
@@ -83,6 +85,11 @@ class UserPreferences:
 
     preview = Orientation.HORIZONTAL.numerator
     auto_scroll = True
+    incremental_preview = True
+    lazy_layout = True
+    preview_processes = PREVIEW_PROCESSES
+    preview_memory_limit = PREVIEW_MEMORY_LIMIT
+    hibernate_after = HIBERNATE_AFTER
     parser = "rst"
     writer = "html4"
     style = ""
@@ -99,6 +106,11 @@ class UserPreferences:
         cp.read(f"{directory}/formiko.ini")
         cp.smart_get(self, "preview", int)
         cp.smart_get(self, "auto_scroll", smart_bool)
+        cp.smart_get(self, "incremental_preview", smart_bool)
+        cp.smart_get(self, "lazy_layout", smart_bool)
+        cp.smart_get(self, "preview_processes", int)
+        cp.smart_get(self, "preview_memory_limit", int)
+        cp.smart_get(self, "hibernate_after", int)
 
         cp.smart_get(self, "parser")
         if self.parser not in PARSERS:
@@ -138,6 +150,11 @@ class UserPreferences:
         cp.add_section("main")
         cp.set("main", "preview", str(int(self.preview)))
         cp.smart_set(self, "auto_scroll")
+        cp.smart_set(self, "incremental_preview")
+        cp.smart_set(self, "lazy_layout")
+        cp.smart_set(self, "preview_processes")
+        cp.smart_set(self, "preview_memory_limit")
+        cp.smart_set(self, "hibernate_after")
 
         cp.smart_set(self, "parser")
         cp.smart_set(self, "writer")
@@ -0,0 +1,244 @@
+"""Watching of changed files in a directory tree.
+
+Changes are reported by Gio.FileMonitor (inotify on Linux) when PyGObject
+is available, otherwise the tree is scanned periodically. Events are
+debounced, so saving a file by an editor, which writes it in more steps,
+is reported once. Files and directories outside the tree, which documents
+read, are watched too.
+"""
+
+from os import scandir, stat
+from os.path import abspath, dirname, isdir
+from os.path import sep as path_sep
+from time import monotonic, sleep
+
+try:
+    from gi.repository import Gio, GLib
+except ImportError:  # the tree is scanned without PyGObject
+    Gio = GLib = None
+
+DEBOUNCE = 0.03  # seconds without events before changes are reported
+POLL = 0.25  # seconds between scans without Gio
+
+
+class ChangedFiles:
+    """Paths changed since the last report, debounced.
+
+    Times are in seconds from a monotonic clock.
+    """
+
+    def __init__(self, debounce=DEBOUNCE):
+        self.debounce = debounce
+        self.paths = set()
+        self.last_change = None
+
+    def changed(self, path, now):
+        """Note change of *path* at *now*."""
+        self.paths.add(path)
+        self.last_change = now
+
+    def take(self, now):
+        """Return changed paths, when no change came for debounce time.
+
+        Returns empty set when nothing should be reported at *now*.
+        """
+        if not self.paths or now - self.last_change < self.debounce:
+            return set()
+        paths, self.paths = self.paths, set()
+        return paths
+
+
+def is_skipped(path, skip):
+    """Return True for hidden files and paths inside *skip* directories."""
+    name = path.rsplit(path_sep, 1)[-1]
+    return name.startswith(".") or any(
+        path == directory or path.startswith(directory + path_sep)
+        for directory in skip
+    )
+
+
+def snapshot(root, skip=()):
+    """Return {path: (mtime_ns, size)} of all files in *root* tree."""
+    files = {}
+    directories = [abspath(root)]
+    while directories:
+        try:
+            entries = list(scandir(directories.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            if is_skipped(entry.path, skip):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                else:
+                    info = entry.stat()
+                    files[entry.path] = (info.st_mtime_ns, info.st_size)
+            except OSError:
+                continue  # removed meanwhile
+    return files
+
+
+def snapshot_paths(paths, skip=()):
+    """Return snapshot of files and directory trees in *paths*."""
+    files = {}
+    for path in paths:
+        if isdir(path):
+            files.update(snapshot(path, skip))
+            continue
+        try:
+            info = stat(path)
+        except OSError:
+            continue  # missing file is created later
+        files[path] = (info.st_mtime_ns, info.st_size)
+    return files
+
+
+def snapshot_changes(old, new):
+    """Return paths changed, created or removed between snapshots."""
+    return {
+        path for path in old.keys() | new.keys()
+        if old.get(path) != new.get(path)
+    }
+
+
+class Watcher:
+    """Call *callback* with sets of changed paths in *root* tree.
+
+    Paths are absolute, they are files which were changed, created or
+    removed. Directories in *skip* are not watched. *outside* returns
+    paths of files and directories outside the tree, which are watched
+    too; it is called at start and after each report, so new dependencies
+    of documents are watched.
+    """
+
+    def __init__(
+        self,
+        root,
+        callback,
+        skip=(),
+        debounce=DEBOUNCE,
+        *,
+        outside=None,
+    ):
+        self.root = abspath(root)
+        self.callback = callback
+        self.skip = [abspath(directory) for directory in skip]
+        self.changes = ChangedFiles(debounce)
+        self.monitors = {}  # Gio.FileMonitor by directory path
+        self.outside = outside
+        self.paths = set()  # watched paths outside the tree
+        self.trees = [self.root]  # directories watched with subdirectories
+
+    def watch(self, paths):
+        """Watch also *paths* outside the tree, files or directories.
+
+        Parent directory of a file is monitored, so the file is watched
+        even when an editor replaces it. Returns True, if a new path is
+        watched.
+        """
+        paths = {
+            path for path in map(abspath, paths)
+            if path not in self.paths
+            and path != self.root
+            and not path.startswith(self.root + path_sep)
+        }
+        self.paths |= paths
+        for path in paths:
+            if isdir(path):
+                self.trees.append(path)
+                if Gio is not None:
+                    self._monitor(path)
+            elif Gio is not None:
+                self._monitor(dirname(path), recursive=False)
+        return bool(paths)
+
+    def _watch_outside(self):
+        """Watch paths from *outside*, return True if some is new."""
+        if self.outside is None:
+            return False
+        return self.watch(self.outside())
+
+    def run(self):
+        """Watch the tree until interrupted."""
+        if Gio is None:
+            self._poll()
+            return
+        self._monitor(self.root)
+        self._watch_outside()
+        GLib.timeout_add(int(self.changes.debounce * 1000), self._report)
+        GLib.MainLoop().run()
+
+    def _snapshot(self):
+        """Return snapshot of the tree and watched paths outside it."""
+        files = snapshot(self.root, self.skip)
+        files.update(snapshot_paths(self.paths, self.skip))
+        return files
+
+    def _poll(self):
+        """Scan the tree periodically, and report changes."""
+        self._watch_outside()
+        files = self._snapshot()
+        while True:
+            sleep(POLL)
+            new = self._snapshot()
+            paths = snapshot_changes(files, new)
+            files = new
+            if paths:
+                self.callback(paths)
+                if self._watch_outside():
+                    files = self._snapshot()
+
+    def _monitor(self, directory, recursive=True):
+        """Monitor *directory* and its subdirectories if *recursive*."""
+        if directory in self.monitors or (
+            directory not in self.trees and is_skipped(directory, self.skip)
+        ):
+            return
+        monitor = Gio.File.new_for_path(directory).monitor_directory(
+            Gio.FileMonitorFlags.WATCH_MOVES,
+            None,
+        )
+        monitor.connect("changed", self.on_changed)
+        self.monitors[directory] = monitor
+        if not recursive:
+            return
+        try:
+            entries = list(scandir(directory))
+        except OSError:
+            return
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                self._monitor(entry.path)
+
+    def on_changed(self, _monitor, file, other, event):
+        """Note changed file, and monitor created directories."""
+        if event == Gio.FileMonitorEvent.ATTRIBUTE_CHANGED:
+            return
+        for changed in (file, other):
+            path = changed.get_path() if changed is not None else None
+            if path is None or is_skipped(path, self.skip):
+                continue
+            kind = changed.query_file_type(Gio.FileQueryInfoFlags.NONE, None)
+            if kind == Gio.FileType.DIRECTORY:
+                if not any(
+                    path.startswith(tree + path_sep) for tree in self.trees
+                ):
+                    continue  # next to watched file outside the tree
+                self._monitor(path)  # created or moved in
+                continue
+            if event == Gio.FileMonitorEvent.DELETED:
+                monitor = self.monitors.pop(path, None)
+                if monitor is not None:
+                    monitor.cancel()
+            self.changes.changed(path, monotonic())
+
+    def _report(self):
+        """Report debounced changes."""
+        paths = self.changes.take(monotonic())
+        if paths:
+            self.callback(paths)
+            self._watch_outside()
+        return True
+
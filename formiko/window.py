@@ -2,6 +2,7 @@
 
 from enum import Enum
 from os.path import basename, dirname, expanduser, splitext
+from time import monotonic
 
 from gi.repository import Adw, Gio, GLib, Gtk, Pango
 
@@ -17,9 +18,11 @@ from formiko.document_page import DocumentPage
 from formiko.editor import EditorType
 from formiko.filebrowser import FileBrowser
 from formiko.formatting_actions import FormattingActionGroup
+from formiko.hibernation import HIBERNATE_CHECK, IdleTabs
 from formiko.menu import AppMenu
 from formiko.preferences import Preferences
 from formiko.renderer import WebView as GtkWebView
+from formiko.search import matches_label
 from formiko.sourceview import View as GtkSourceView
 from formiko.status_menu import Statusbar
 from formiko.user import UserCache, UserPreferences, View
@@ -94,11 +97,13 @@ class AppWindow(Adw.ApplicationWindow):
         self._tabs_needing_paned_reset: set = set()
         self._last_active_doc = None
         self._tab_labels: dict = {}
+        self._idle_tabs = IdleTabs(self.preferences.hibernate_after)
         super().__init__()
         self._setup_actions()
         self.set_default_icon_name("formiko")
         self._setup_layout(file_name, no_initial_tab)
         self.connect("close-request", self._on_close_request)
+        GLib.timeout_add_seconds(HIBERNATE_CHECK, self._hibernate_idle_tabs)
 
     def insert_action_group(self, prefix, group):
         """Override to track inserted action groups for get_action_group()."""
@@ -364,9 +369,32 @@ class AppWindow(Adw.ApplicationWindow):
         )
 
     def _write_export(self, renderer, file_name):
-        """Write rendered output to *file_name*."""
-        with open(file_name, "w+", encoding="utf-8") as output:
-            output.write(renderer.render_output()[1].strip())
+        """Export rendered output to *file_name* in the background."""
+        name = basename(file_name)
+        toast = Adw.Toast(title=f"Exporting {name}…", timeout=0)
+        self.toasts.add_toast(toast)
+        renderer.export(
+            file_name,
+            lambda fraction, error: self._on_export_progress(
+                toast,
+                name,
+                fraction,
+                error,
+            ),
+        )
+
+    def _on_export_progress(self, toast, name, fraction, error):
+        """Show export progress, and replace the toast when it ends."""
+        if error is not None:
+            toast.dismiss()
+            self.toasts.add_toast(
+                Adw.Toast(title=f"Export of {name} failed: {error}"),
+            )
+        elif fraction >= 1.0:
+            toast.dismiss()
+            self.toasts.add_toast(Adw.Toast(title=f"Exported {name}"))
+        else:
+            toast.set_title(f"Exporting {name}… {fraction:.0%}")
 
     def _on_print_document(self, action, *params):
         page = self.active_page
@@ -639,12 +667,21 @@ class AppWindow(Adw.ApplicationWindow):
             res = self._on_find_next_match(None, None)
         else:
             res = self._on_find_previous_match(None, None)
+        if res is not None:  # preview search result is signaled later
+            self._set_search_result(res)
 
+    def _set_search_result(self, found, label=""):
+        """Mark search entry when nothing is found and show matches label."""
         ctx = self.search_entry.get_style_context()
-        if not res and self.search_entry.get_text():
+        if not found and self.search_entry.get_text():
             Gtk.StyleContext.add_class(ctx, "error")
         else:
             Gtk.StyleContext.remove_class(ctx, "error")
+        self.search_matches.set_text(label)
+
+    def _on_doc_search_matches(self, doc, index, count):
+        if doc is self.active_page and self.search.get_search_mode():
+            self._set_search_result(count != 0, matches_label(index, count))
 
     def _on_find_next_match(self, action, *params):
         """'find-next-match' action handler."""
@@ -735,6 +772,7 @@ class AppWindow(Adw.ApplicationWindow):
                 vim_widget is None or doc.editor is vim_widget
             ):
                 doc.stop()
+                self._idle_tabs.forget(doc)
                 if self.notebook.get_n_pages() <= 1:
                     self.save_win_state()
                     self.destroy()
@@ -809,6 +847,7 @@ class AppWindow(Adw.ApplicationWindow):
         ):
             self.status_bar.set_words_count(doc.words_count)
             self.status_bar.set_chars_count(doc.chars_count)
+            self.status_bar.set_render_timings(doc.renderer.timings)
 
     def _on_doc_state_changed(self, doc):
         """Update tab UI and window title on name/modified state change."""
@@ -821,6 +860,10 @@ class AppWindow(Adw.ApplicationWindow):
             self.status_bar.set_words_count(words)
             self.status_bar.set_chars_count(chars)
 
+    def _on_doc_render_timed(self, doc, _total):
+        if doc is self.active_page and hasattr(self, "status_bar"):
+            self.status_bar.set_render_timings(doc.renderer.timings)
+
     def _create_headerbar(self):
         headerbar = Adw.HeaderBar()
         self._window_title = Adw.WindowTitle()
@@ -1018,7 +1061,8 @@ class AppWindow(Adw.ApplicationWindow):
         else:
             overlay.set_child(self.notebook)
 
-        toolbar_view.set_content(overlay)
+        self.toasts = Adw.ToastOverlay(child=overlay)
+        toolbar_view.set_content(self.toasts)
         self.set_content(toolbar_view)
 
         if self.cache.is_maximized:
@@ -1049,6 +1093,12 @@ class AppWindow(Adw.ApplicationWindow):
         self.search_entry.set_hexpand(True)
         sbox.append(self.search_entry)
         self.search.connect_entry(self.search_entry)
+
+        self.search_matches = Gtk.Label()
+        self.search_matches.add_css_class("dim-label")
+        self.search_matches.set_margin_start(6)
+        self.search_matches.set_margin_end(6)
+        sbox.append(self.search_matches)
         self.search_entry.connect("search-changed", self._on_search_changed)
 
         focus_ctrl = Gtk.EventControllerFocus.new()
@@ -1109,6 +1159,8 @@ class AppWindow(Adw.ApplicationWindow):
         self._tab_labels[doc] = tab_label
         doc.connect("doc-state-changed", self._on_doc_state_changed)
         doc.connect("words-count-changed", self._on_doc_words_changed)
+        doc.connect("render-timed", self._on_doc_render_timed)
+        doc.connect("search-matches", self._on_doc_search_matches)
         scroll_ctrl = Gtk.EventControllerScroll.new(
             Gtk.EventControllerScrollFlags.VERTICAL,
         )
@@ -1121,6 +1173,15 @@ class AppWindow(Adw.ApplicationWindow):
         self._update_tab_bar_visibility()
         return doc
 
+    def _hibernate_idle_tabs(self):
+        """Hibernate background tabs, which are idle for a long time."""
+        if not self.runing:
+            return False
+        for doc in self._idle_tabs.due(monotonic()):
+            if doc.hibernate():
+                self._idle_tabs.forget(doc)
+        return True
+
     def _on_new_tab(self, action, *params):
         self.new_tab()
 
@@ -1181,6 +1242,10 @@ class AppWindow(Adw.ApplicationWindow):
             and doc not in self._tabs_needing_paned_reset
         ):
             doc.paned.set_position(prev.paned.get_position())
+        if prev is not None and prev is not doc and prev.running:
+            self._idle_tabs.idle(prev, monotonic())
+        self._idle_tabs.forget(doc)
+        doc.restore()
         self._last_active_doc = doc
 
         if hasattr(doc, "fmt_actions"):
@@ -1225,6 +1290,7 @@ class AppWindow(Adw.ApplicationWindow):
     def _finalize_close_doc(self, doc):
         """Stop the doc's refresh loop and remove its tab."""
         doc.stop()
+        self._idle_tabs.forget(doc)
         if doc.editor_type == EditorType.VIM and hasattr(doc, "editor"):
             doc.editor.vim_quit()
         n = self.notebook.page_num(doc)
@@ -0,0 +1,85 @@
+"""Tests for the headless render benchmark."""
+
+import json
+
+import pytest
+
+from formiko.benchmark import (
+    CORPUS,
+    compare,
+    format_size,
+    main,
+    measure,
+    parse_size,
+)
+
+
+def result(latency=0.1, peak=1000, output=100, state=True, cold=0.2):
+    """Return benchmark result with values."""
+    return {
+        "kind": "rst",
+        "writer": "html4",
+        "size": 1024,
+        "state": state,
+        "cold": cold,
+        "latency": latency,
+        "peak": peak,
+        "output": output,
+    }
+
+
+class TestCorpus:
+    @pytest.mark.parametrize("kind", list(CORPUS))
+    def test_size(self, kind):
+        src = CORPUS[kind][1](4096)
+        assert len(src) >= 4096
+        assert src == CORPUS[kind][1](4096)
+
+    def test_json_is_valid(self):
+        assert json.loads(CORPUS["json"][1](2048))
+
+    def test_sizes(self):
+        assert parse_size("10k") == 10240
+        assert parse_size("1m") == 1024 * 1024
+        assert parse_size("512") == 512
+        assert format_size(parse_size("10m")) == "10m"
+        assert format_size(parse_size("100k")) == "100k"
+
+
+class TestBenchmark:
+    @pytest.mark.parametrize("writer", ["html4", "pep"])
+    def test_measure(self, writer):
+        value = measure("rst", writer, 1024, repeat=1)
+        assert value["state"]
+        assert value["cold"] > 0
+        assert value["latency"] > 0
+        assert value["peak"] > 0
+        assert value["output"] > value["source"] >= 1024
+
+    def test_compare(self):
+        assert compare([result()], [result()]) == []
+        assert compare([result(latency=0.2)], [result()]) == [
+            "rst/html4/1024: latency 0.2 > 0.1",
+        ]
+        assert len(compare([result(peak=2000, state=False)], [result()])) == 2
+        assert compare([result(latency=0.11)], [result()], 0.2) == []
+
+    def test_compare_cold(self):
+        assert compare([result(cold=0.3)], [result()]) == [
+            "rst/html4/1024: cold 0.3 > 0.2",
+        ]
+        old = result()
+        del old["cold"]  # baseline without cold render
+        assert compare([result(cold=0.3)], [old]) == []
+
+    def test_main(self, tmp_path, capsys):
+        baseline = str(tmp_path / "baseline.json")
+        args = ["--kinds", "rst", "--writers", "html5", "--sizes", "1k"]
+        assert main([*args, "--repeat", "1", "--save", baseline]) == 0
+        assert "rst   html5      1k" in capsys.readouterr().out
+        saved = json.loads((tmp_path / "baseline.json").read_text())
+        assert len(saved) == 1
+        saved[0]["latency"] = saved[0]["peak"] = 0
+        (tmp_path / "baseline.json").write_text(json.dumps(saved))
+        assert main([*args, "--baseline", baseline]) == 1
+        assert "REGRESSION" in capsys.readouterr().out
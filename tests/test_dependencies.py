@@ -0,0 +1,151 @@
+"""Tests for graph of files read by documents."""
+
+from os import utime
+from os.path import join
+
+from formiko.dependencies import DependencyGraph, scan_dependencies, stamp
+from formiko.rendering import publish_recorded
+
+
+class TestScanDependencies:
+    def test_directives(self):
+        text = (
+            "Title\n=====\n\n"
+            ".. include:: part.rst\n"
+            ".. mdinclude:: ../README.md\n"
+            "   :start-line: 3\n"
+            ".. file-tree:: docs\n"
+            ".. include:: <isonum.txt>\n"
+            ".. image:: picture.png\n"
+        )
+        assert scan_dependencies("/doc/src/index.rst", text) == {
+            "/doc/src/part.rst",
+            "/doc/README.md",
+            "/doc/src/docs",
+        }
+
+    def test_no_dependencies(self):
+        assert scan_dependencies("/doc/index.rst", "Text\n") == set()
+
+
+class TestRecordedDependencies:
+    def test_include(self, tmp_path):
+        (tmp_path / "part.rst").write_text("Part *text*.\n")
+        index = tmp_path / "index.rst"
+        src = "Title\n=====\n\n.. include:: part.rst\n"
+        output, _, paths = publish_recorded(
+            src,
+            "rst",
+            "html4",
+            file_name=str(index),
+            embed_stylesheet=False,
+        )
+        assert "<em>text</em>" in output[1]
+        assert paths == {str(tmp_path / "part.rst")}
+
+    def test_embedded_stylesheet(self, tmp_path):
+        style = tmp_path / "style.css"
+        style.write_text("body {}\n")
+        _, _, paths = publish_recorded("Text\n", "rst", "html4", str(style))
+        assert str(style) in paths
+
+    def test_file_tree(self, tmp_path):
+        (tmp_path / "docs" / "sub").mkdir(parents=True)
+        (tmp_path / "docs" / "sub" / "a.rst").write_text("A\n")
+        index = tmp_path / "index.rst"
+        src = ".. file-tree:: docs\n"
+        _, _, paths = publish_recorded(
+            src,
+            "rst",
+            "html4",
+            file_name=str(index),
+            embed_stylesheet=False,
+        )
+        assert paths == {
+            str(tmp_path / "docs"),
+            str(tmp_path / "docs" / "sub"),
+        }
+
+    def test_missing_directory(self, tmp_path):
+        index = tmp_path / "index.rst"
+        src = ".. file-tree:: docs\n"
+        _, _, paths = publish_recorded(
+            src,
+            "rst",
+            "html4",
+            file_name=str(index),
+            embed_stylesheet=False,
+        )
+        assert paths == {str(tmp_path / "docs")}
+
+    def test_no_dependencies(self):
+        _, _, paths = publish_recorded(
+            "Text\n",
+            "rst",
+            "html4",
+            embed_stylesheet=False,
+        )
+        assert paths == frozenset()
+
+
+class TestStamp:
+    def test_changes(self, tmp_path):
+        part = tmp_path / "part.rst"
+        part.write_text("Part\n")
+        missing = str(tmp_path / "missing.rst")
+        before = stamp([str(part), missing])
+        assert before[missing] is None
+        assert before == stamp([str(part), missing])
+        utime(part, ns=(1, 1))
+        assert before != stamp([str(part), missing])
+
+    def test_directory(self, tmp_path):
+        before = stamp([str(tmp_path)])
+        (tmp_path / "new.rst").write_text("New\n")
+        utime(tmp_path, ns=(1, 1))  # mtime granularity of the filesystem
+        assert before != stamp([str(tmp_path)])
+
+
+class TestDependencyGraph:
+    def test_dependents(self, tmp_path):
+        root = str(tmp_path)
+        graph = DependencyGraph()
+        graph.update(join(root, "index.rst"), {join(root, "part.rst")})
+        graph.update(join(root, "tree.rst"), {join(root, "docs")})
+        assert graph.dependents([join(root, "part.rst")]) == {
+            join(root, "index.rst"),
+        }
+        assert graph.dependents([join(root, "docs", "a", "b.rst")]) == {
+            join(root, "tree.rst"),
+        }
+        assert not graph.dependents([join(root, "docs2")])
+
+    def test_indirect_dependents(self, tmp_path):
+        root = str(tmp_path)
+        graph = DependencyGraph()
+        graph.update(join(root, "index.rst"), {join(root, "part.rst")})
+        graph.update(join(root, "part.rst"), {join(root, "chunk.rst")})
+        assert graph.dependents([join(root, "chunk.rst")]) == {
+            join(root, "index.rst"),
+            join(root, "part.rst"),
+        }
+
+    def test_cycle(self, tmp_path):
+        root = str(tmp_path)
+        graph = DependencyGraph()
+        graph.update(join(root, "a.rst"), {join(root, "b.rst")})
+        graph.update(join(root, "b.rst"), {join(root, "a.rst")})
+        assert graph.dependents([join(root, "a.rst")]) == {
+            join(root, "a.rst"),
+            join(root, "b.rst"),
+        }
+
+    def test_update_and_remove(self, tmp_path):
+        root = str(tmp_path)
+        graph = DependencyGraph()
+        graph.update(join(root, "index.rst"), {join(root, "part.rst")})
+        graph.update(join(root, "index.rst"), set())
+        assert not graph.dependents([join(root, "part.rst")])
+        graph.update(join(root, "index.rst"), {join(root, "part.rst")})
+        graph.remove(join(root, "index.rst"))
+        assert not graph.dependencies
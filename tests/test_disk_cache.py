@@ -0,0 +1,56 @@
+"""Tests for persistent cache of rendered pages."""
+
+from os import listdir, utime
+
+from formiko.disk_cache import DiskCache
+
+HTML = "<html><body><p>Formiko</p></body></html>"
+
+
+class TestDiskCache:
+    def test_put_and_get(self, tmp_path):
+        cache = DiskCache(str(tmp_path / "render"))
+        key = cache.key("Text", "rst", "html4")
+        assert cache.get(key) is None
+        cache.put(key, HTML)
+        assert cache.get(key) == HTML
+
+    def test_key(self):
+        key = DiskCache.key("Text", "rst", "html4")
+        assert key == DiskCache.key("Text", "rst", "html4")
+        assert key != DiskCache.key("Text", "rst", "html5")
+        assert key != DiskCache.key("Text", "m2r", "html4")
+        assert key != DiskCache.key("Text.", "rst", "html4")
+
+    def test_key_depends_on_file_directory(self):
+        key = DiskCache.key("Text", "rst", "html4", file_name="/a/doc.rst")
+        assert key != DiskCache.key(
+            "Text",
+            "rst",
+            "html4",
+            file_name="/b/doc.rst",
+        )
+        assert key != DiskCache.key("Text", "rst", "html4")
+
+    def test_pages_are_compressed(self, tmp_path):
+        cache = DiskCache(str(tmp_path))
+        cache.put("key", HTML * 100)
+        assert cache.path("key").endswith(".html.gz")
+        size = (tmp_path / listdir(tmp_path)[0]).stat().st_size
+        assert size < len(HTML) * 10
+
+    def test_eviction(self, tmp_path):
+        cache = DiskCache(str(tmp_path))
+        cache.put("a", HTML)
+        cache.max_bytes = (tmp_path / "a.html.gz").stat().st_size * 2
+        cache.put("b", HTML)
+        utime(cache.path("a"), (1, 1))
+        utime(cache.path("b"), (2, 2))
+        cache.get("a")  # a is used again
+        cache.put("c", HTML)
+        assert sorted(listdir(tmp_path)) == ["a.html.gz", "c.html.gz"]
+
+    def test_broken_file(self, tmp_path):
+        cache = DiskCache(str(tmp_path))
+        (tmp_path / "key.html.gz").write_bytes(b"broken")
+        assert cache.get("key") is None
@@ -0,0 +1,82 @@
+"""Tests for the draft render profile."""
+
+import pytest
+
+from formiko.draft import DRAFT_REPORT_LEVEL
+from formiko.rendering import prepared_publisher, publish_html
+
+RST = """\
+Title
+=====
+
+.. contents::
+
+.. sectnum::
+
+Section
+-------
+
+Text with `link`_, `Section`_, `missing`_, footnote [#]_ and *broken.
+
+.. _link: https://formiko.zeropage.cz
+.. [#] Auto numbered footnote.
+"""
+
+
+class TestDraft:
+    @pytest.mark.parametrize("writer", ["html4", "s5", "html5"])
+    def test_writers(self, writer):
+        state, html, _ = publish_html(RST, "rst", writer, draft=True)
+        assert state
+        assert "Traceback" not in html
+        assert "Section" in html
+
+    @pytest.mark.parametrize("parser", ["m2r", "md"])
+    def test_markdown(self, parser):
+        state, html, _ = publish_html(
+            "# Title\n\nSome *emphasis* and [link][1].\n\n[1]: /link\n",
+            parser,
+            "html5",
+            draft=True,
+        )
+        assert state
+        assert "<em>emphasis</em>" in html
+
+    def test_no_system_messages(self):
+        _, html, _ = publish_html(RST, "rst", "html4")
+        assert 'class="system-message"' in html
+        _, html, _ = publish_html(RST, "rst", "html4", draft=True)
+        assert 'class="system-message"' not in html
+        assert 'class="problematic"' in html
+
+    def test_no_stylesheet(self, tmp_path):
+        style = tmp_path / "style.css"
+        style.write_text("body { color: #123456; }")
+        _, html, _ = publish_html(RST, "rst", "html4", str(style), draft=True)
+        assert "#123456" not in html
+        assert "<style" not in html
+
+    def test_transforms_are_skipped(self):
+        _, html, _ = publish_html(RST, "rst", "html5", draft=True)
+        assert 'class="contents"' in html
+        assert 'href="#section"' not in html.split("</nav>")[0]
+        assert "1&nbsp;&nbsp;&nbsp;Section" not in html
+        assert 'href="https://formiko.zeropage.cz"' not in html
+        assert 'href="#link"' in html
+
+    def test_line_map(self):
+        _, html, _ = publish_html(
+            RST,
+            "rst",
+            "html5",
+            line_offset=0,
+            draft=True,
+        )
+        assert 'data-line="' in html
+
+    def test_full_render_after_draft(self):
+        publish_html(RST, "rst", "html4", draft=True)
+        _, html, _ = publish_html(RST, "rst", "html4")
+        assert 'href="https://formiko.zeropage.cz"' in html
+        publisher = prepared_publisher("rst", "html4")
+        assert publisher.settings.report_level != DRAFT_REPORT_LEVEL
@@ -0,0 +1,227 @@
+"""Tests for export of rendered documents."""
+
+from os import chmod, listdir, utime
+from os.path import join
+
+import pytest
+
+from formiko.export import (
+    SKIPPED,
+    Rebuild,
+    export_tree,
+    main,
+    output_path,
+    source_files,
+    write_atomic,
+)
+
+HTML = "<html><body><p>Žluťoučký kůň</p></body></html>"
+
+
+class TestWriteAtomic:
+    def test_write(self, tmp_path):
+        path = tmp_path / "page.html"
+        write_atomic(str(path), HTML)
+        assert path.read_text(encoding="utf-8") == HTML
+        assert listdir(tmp_path) == ["page.html"]
+
+    def test_progress(self, tmp_path):
+        fractions = []
+        path = str(tmp_path / "page.html")
+        write_atomic(path, "x" * 10, fractions.append, 4)
+        assert fractions == [0.4, 0.8, 1.0]
+
+    def test_empty(self, tmp_path):
+        fractions = []
+        write_atomic(str(tmp_path / "page.html"), "", fractions.append)
+        assert (tmp_path / "page.html").read_text() == ""
+        assert fractions == [1.0]
+
+    def test_replace_keeps_mode(self, tmp_path):
+        path = tmp_path / "page.html"
+        path.write_text("old")
+        chmod(path, 0o640)
+        write_atomic(str(path), HTML)
+        assert path.read_text(encoding="utf-8") == HTML
+        assert path.stat().st_mode & 0o777 == 0o640
+
+    def test_error_removes_temporary_file(self, tmp_path):
+        path = tmp_path / "page.html"
+        path.write_text("old")
+
+        def progress(_fraction):
+            raise OSError(28, "No space left on device")
+
+        with pytest.raises(OSError, match="No space"):
+            write_atomic(str(path), "x" * 10, progress, 4)
+        assert path.read_text() == "old"
+        assert listdir(tmp_path) == ["page.html"]
+
+
+def write_tree(root):
+    """Write small documentation tree to *root*."""
+    (root / "sub").mkdir()
+    (root / ".hidden").mkdir()
+    (root / "index.rst").write_text("Index\n=====\n\nHello *world*.\n")
+    (root / "sub" / "page.rst").write_text("Page\n====\n\nText.\n")
+    (root / "sub" / "image.png").write_bytes(b"")
+    (root / ".hidden" / "secret.rst").write_text("Secret\n")
+    (root / "main.rst").write_text("Main\n====\n\n.. include:: index.rst\n")
+
+
+class TestExportTree:
+    def test_source_files(self, tmp_path):
+        write_tree(tmp_path)
+        assert source_files(str(tmp_path)) == [
+            "index.rst",
+            "main.rst",
+            "sub/page.rst",
+        ]
+        assert source_files(str(tmp_path / "index.rst")) == ["index.rst"]
+        assert output_path("sub/page.rst") == "sub/page.html"
+
+    def test_export_and_skip(self, tmp_path):
+        source, output = tmp_path / "src", tmp_path / "out"
+        source.mkdir()
+        write_tree(source)
+        results = export_tree(str(source), str(output), jobs=1)
+        assert [result.state for result in results] == [True] * 3
+        html = (output / "main.html").read_text(encoding="utf-8")
+        assert "<em>world</em>" in html
+        assert (output / "sub" / "page.html").exists()
+
+        results = export_tree(str(source), str(output), jobs=1)
+        assert all(result.state is SKIPPED for result in results)
+
+    def test_changed_dependency(self, tmp_path):
+        source, output = tmp_path / "src", tmp_path / "out"
+        source.mkdir()
+        write_tree(source)
+        export_tree(str(source), str(output), jobs=1)
+        (source / "index.rst").write_text("Index\n=====\n\nChanged.\n")
+        results = export_tree(str(source), str(output), jobs=1)
+        states = {result.path: result.state for result in results}
+        assert states == {
+            "index.rst": True,
+            "main.rst": True,  # includes index.rst
+            "sub/page.rst": SKIPPED,
+        }
+        assert "Changed." in (output / "main.html").read_text()
+
+    def test_created_missing_include(self, tmp_path):
+        source, output = tmp_path / "src", tmp_path / "out"
+        source.mkdir()
+        write_tree(source)
+        (source / "sub" / "page.rst").write_text(
+            "Page\n====\n\n.. include:: missing.rst\n",
+        )
+        export_tree(str(source), str(output), jobs=1)
+        (source / "sub" / "missing.rst").write_text("Created text.\n")
+        results = export_tree(str(source), str(output), jobs=1)
+        states = {result.path: result.state for result in results}
+        assert states["sub/page.rst"] is True
+        assert "Created text." in (output / "sub" / "page.html").read_text()
+
+    def test_changed_source(self, tmp_path):
+        source, output = tmp_path / "src", tmp_path / "out"
+        source.mkdir()
+        write_tree(source)
+        export_tree(str(source), str(output), jobs=1)
+        (source / "index.rst").write_text("Index\n=====\n\nChanged.\n")
+        results = export_tree(str(source), str(output), jobs=1)
+        assert results[0].path == "index.rst"
+        assert results[0].state is True
+        assert "Changed." in (output / "index.html").read_text()
+
+    def test_touched_source_is_skipped(self, tmp_path):
+        source, output = tmp_path / "src", tmp_path / "out"
+        source.mkdir()
+        write_tree(source)
+        export_tree(str(source), str(output), jobs=1)
+        utime(source / "index.rst", (1, 1))
+        results = export_tree(str(source), str(output), jobs=1)
+        assert results[0].state is SKIPPED
+
+    def test_other_options(self, tmp_path):
+        source, output = tmp_path / "src", tmp_path / "out"
+        source.mkdir()
+        write_tree(source)
+        export_tree(str(source), str(output), jobs=1)
+        results = export_tree(str(source), str(output), "html5", jobs=1)
+        assert all(result.state is True for result in results)
+        assert "<main" in (output / "index.html").read_text()
+
+    def test_main(self, tmp_path, capsys):
+        write_tree(tmp_path)
+        output = tmp_path / "out"
+        assert main([str(tmp_path / "index.rst"), str(output)]) == 0
+        assert (output / "index.html").exists()
+        summary = capsys.readouterr().out.splitlines()[-1]
+        assert summary.startswith("1 files: 1 exported, 0 skipped, 0 failed")
+
+
+class TestRebuild:
+    def test_documents(self, tmp_path):
+        write_tree(tmp_path)
+        root = str(tmp_path)
+        rebuild = Rebuild(root, join(root, "out"))
+        assert rebuild.documents([join(root, "index.rst")]) == {
+            join(root, "index.rst"),
+            join(root, "main.rst"),
+        }
+        assert rebuild.documents([join(root, "sub", "image.png")]) == set()
+        hidden = join(root, ".hidden", "secret.rst")
+        assert rebuild.documents([hidden]) == set()
+
+    def test_new_dependency(self, tmp_path):
+        write_tree(tmp_path)
+        root = str(tmp_path)
+        rebuild = Rebuild(root, join(root, "out"))
+        page = tmp_path / "sub" / "page.rst"
+        page.write_text("Page\n====\n\n.. include:: image.png\n")
+        assert rebuild.documents([str(page)]) == {str(page)}
+        assert rebuild.documents([join(root, "sub", "image.png")]) == {
+            str(page),
+        }
+
+    def test_outside(self, tmp_path):
+        source = tmp_path / "src"
+        source.mkdir()
+        write_tree(source)
+        (tmp_path / "header.rst").write_text("Header\n")
+        (source / "page.rst").write_text(
+            "Page\n====\n\n.. include:: ../header.rst\n",
+        )
+        rebuild = Rebuild(str(source), str(tmp_path / "out"))
+        assert rebuild.outside() == {str(tmp_path / "header.rst")}
+        assert rebuild.documents([str(tmp_path / "header.rst")]) == {
+            str(source / "page.rst"),
+        }
+
+    def test_graph_from_manifest(self, tmp_path):
+        source, output = tmp_path / "src", tmp_path / "out"
+        source.mkdir()
+        write_tree(source)
+        (source / "sub" / "page.rst").write_text(
+            "Page\n====\n\n.. include:: ../index.rst\n",
+        )
+        export_tree(str(source), str(output), jobs=1)
+        # the directive is gone, but the export recorded the file
+        (source / "sub" / "page.rst").write_text("Page\n====\n")
+        rebuild = Rebuild(str(source), str(output))
+        assert rebuild.graph.dependents([str(source / "index.rst")]) == {
+            str(source / "main.rst"),
+            str(source / "sub" / "page.rst"),
+        }
+
+    def test_export_updates_manifest(self, tmp_path):
+        source, output = tmp_path / "src", tmp_path / "out"
+        source.mkdir()
+        write_tree(source)
+        export_tree(str(source), str(output), jobs=1)
+        (source / "index.rst").write_text("Index\n=====\n\nChanged.\n")
+        rebuild = Rebuild(str(source), str(output))
+        rebuild([str(source / "index.rst")])
+        assert "Changed." in (output / "main.html").read_text()
+        results = export_tree(str(source), str(output), jobs=1)
+        assert all(result.state is SKIPPED for result in results)
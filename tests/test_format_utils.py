@@ -1474,6 +1474,14 @@ class TestCrossBlockStripping:
             == "[Python](https://python.org)"
         )
 
+    def test_native_md_with_text(self):
+        from formiko.format_utils import compute_link
+
+        assert (
+            compute_link("Python", "https://python.org", "md")
+            == "[Python](https://python.org)"
+        )
+
     def test_rst_with_text(self):
         from formiko.format_utils import compute_link
 
@@ -1528,6 +1536,14 @@ class TestParseLink:
             "https://python.org",
         )
 
+    def test_native_md_link(self):
+        from formiko.format_utils import parse_link
+
+        assert parse_link("[Python](https://python.org)", "md") == (
+            "Python",
+            "https://python.org",
+        )
+
     def test_rst_link(self):
         from formiko.format_utils import parse_link
 
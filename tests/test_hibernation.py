@@ -0,0 +1,43 @@
+"""Tests for hibernation of idle background tabs."""
+
+from formiko.hibernation import CompressedText, IdleTabs
+
+
+class TestCompressedText:
+    def test_round_trip(self):
+        text = "Title\n=====\n\nŽluťoučký kůň.\n" * 100
+        compressed = CompressedText(text, 42)
+        assert compressed.text == text
+        assert compressed.offset == 42
+        assert len(compressed.data) < len(text.encode("utf-8"))
+
+    def test_empty(self):
+        assert not CompressedText("").text
+
+
+class TestIdleTabs:
+    def test_due_after_idle_time(self):
+        tabs = IdleTabs(after=60)
+        tabs.idle("a", 10.0)
+        tabs.idle("b", 40.0)
+        assert not tabs.due(69.0)
+        assert tabs.due(70.0) == ["a"]
+        assert sorted(tabs.due(100.0)) == ["a", "b"]
+
+    def test_idle_keeps_first_time(self):
+        tabs = IdleTabs(after=60)
+        tabs.idle("a", 10.0)
+        tabs.idle("a", 50.0)
+        assert tabs.due(70.0) == ["a"]
+
+    def test_forget(self):
+        tabs = IdleTabs(after=60)
+        tabs.idle("a", 10.0)
+        tabs.forget("a")
+        tabs.forget("b")
+        assert not tabs.due(100.0)
+
+    def test_disabled(self):
+        tabs = IdleTabs(after=0)
+        tabs.idle("a", 10.0)
+        assert not tabs.due(1000.0)
@@ -0,0 +1,156 @@
+"""Tests for block level diff of rendered HTML body."""
+
+from formiko.html_diff import diff_bodies, parse_body
+from formiko.rendering import publish_html
+
+RST = """\
+First
+=====
+
+Paragraph one.
+
+Second
+======
+
+Paragraph two.
+
+* item
+* other
+
+Third
+=====
+
+Paragraph three.
+"""
+
+
+def body(src, writer="html4"):
+    """Return parsed body of *src* rendered by *writer*."""
+    html = publish_html(src, "rst", writer)[1]
+    start = html.find(">", html.find("<body")) + 1
+    return parse_body(html[start:html.rfind("</body>")])
+
+
+def patch(old, ops):
+    """Apply *ops* to *old* Body like JS_PATCH does.
+
+    Returns new html without white spaces, which could differ between
+    elements.
+    """
+    replaces = []
+    for op in ops:
+        element = old.root
+        for index in op[1]:
+            element = element.children[index]
+        if op[0] == 0:
+            replaces.append((element.start, element.end, op[3]))
+            continue
+        children = element.children
+        start, count = op[2], op[3]
+        if count:
+            end = children[start + count - 1].end
+            replaces.append((children[start].start, end, op[5]))
+        else:
+            at = (
+                children[start].start
+                if start < len(children)
+                else element.close
+            )
+            replaces.append((at, at, op[5]))
+    html = old.html
+    for start, end, text in sorted(replaces, reverse=True):
+        html = html[:start] + text + html[end:]
+    return "".join(html.split())
+
+
+def squeeze(tree):
+    """Return *tree* html without white spaces."""
+    return "".join(tree.html.split())
+
+
+class TestParseBody:
+    def test_tree(self):
+        tree = parse_body('<div id="a"><p>x<br/>y</p><!-- <p> --></div><hr>')
+        assert [x.tag for x in tree.root.children] == ["div", "hr"]
+        assert [x.tag for x in tree.root.children[0].children] == ["p"]
+        assert tree.outer(tree.root.children[0].children[0]) == (
+            "<p>x<br/>y</p>"
+        )
+
+    def test_raw_elements(self):
+        tree = parse_body("<script>if (a<b) {}</script><p>x</p>")
+        assert [x.tag for x in tree.root.children] == ["script", "p"]
+
+    def test_malformed(self):
+        assert parse_body("<div><p>x</div>") is None
+        assert parse_body("<div>") is None
+
+
+class TestDiffBodies:
+    def test_same(self):
+        assert diff_bodies(body(RST), body(RST)) == []
+
+    def test_changed_paragraph(self):
+        old = body(RST)
+        new = body(RST.replace("two", "2"))
+        ops = diff_bodies(old, new)
+        assert len(ops) == 1
+        assert ops[0][0] == 0
+        assert ops[0][2] == "p"
+        assert patch(old, ops) == squeeze(new)
+
+    def test_inserted_block(self):
+        old = body(RST)
+        new = body(RST.replace("Paragraph two.", "Paragraph two.\n\nNew."))
+        ops = diff_bodies(old, new)
+        assert [op[0] for op in ops] == [1]
+        assert patch(old, ops) == squeeze(new)
+
+    def test_removed_section(self):
+        old = body(RST, "html5")
+        new = body(RST[:RST.index("Third")], "html5")
+        ops = diff_bodies(old, new)
+        assert patch(old, ops) == squeeze(new)
+
+    def test_inserted_section_keeps_others(self):
+        old = body(RST, "html5")
+        new = body(
+            RST.replace("Second\n", "Inserted\n========\n\nNew.\n\nSecond\n"),
+            "html5",
+        )
+        ops = diff_bodies(old, new)
+        assert len(ops) == 1
+        assert ops[0][:4] == [1, [0], 1, 0]
+        assert "Paragraph" not in ops[0][5]
+        assert patch(old, ops) == squeeze(new)
+
+    def test_sections_paired_by_ids(self):
+        old = body(RST, "html5")
+        new = body(
+            RST.replace("First\n=====", "Zero\n====\n\nNew.\n\nFirst\n=====")
+            .replace("Paragraph three.", "Paragraph 3.")
+            .replace("Third\n=====\n", "Third\n=====\n\nMore.\n"),
+            "html5",
+        )
+        ops = diff_bodies(old, new)
+        assert patch(old, ops) == squeeze(new)
+        assert [op[1] for op in ops] == [[0, 2], [0]]
+        assert not any("one" in op[-1] or "two" in op[-1] for op in ops)
+
+    def test_moved_text_between_children(self):
+        other = "<p>" + "other " * 20 + "</p>"
+        old = parse_body(f"{other}<div><p>x</p><p>y</p>tail</div>")
+        new = parse_body(f"{other}<div><p>x</p>tail<p>y</p></div>")
+        ops = diff_bodies(old, new)
+        assert ops == [[0, [1], "div", new.outer(new.root.children[1])]]
+
+    def test_inline_inserted_between_text(self):
+        src = "Title\n=====\n\n| a *b* c *d*\n\nText.\n"
+        old = body(src)
+        new = body(src.replace("*b* c", "*b* *X* c"))
+        ops = diff_bodies(old, new)
+        assert patch(old, ops) == squeeze(new)
+        assert all(op[0] == 0 for op in ops)
+
+    def test_big_change_replaces_whole_body(self):
+        assert diff_bodies(body(RST), body("Other\n=====\n\nText.\n")) is None
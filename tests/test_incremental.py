@@ -0,0 +1,136 @@
+"""Tests for section level incremental parsing."""
+
+from io import StringIO
+
+import pytest
+from docutils.core import publish_string
+from docutils.parsers.rst import Parser
+
+import formiko.directives  # noqa: F401 — registers custom directives
+from formiko.incremental import (
+    IncrementalReader,
+    SectionCache,
+    find_titles,
+    split_sections,
+)
+
+DOCUMENT = """\
+=========
+Document
+=========
+
+:Author: Formiko
+
+First
+=====
+
+Footnote [#]_ and |sub| and `First`_ and `link`_ and [CIT]_ and anon__.
+
+.. [#] first note
+.. |sub| replace:: substituted
+.. _link: https://formiko.zeropage.cz
+.. [CIT] citation
+__ https://docutils.sourceforge.io
+
+Usage
+-----
+
+Bad *inline markup.
+
+Usage
+-----
+
+.. contents::
+
+Second
+======
+
+Again [#]_ and unknown `target`_.
+
+.. [#] second note
+
+Sub
+---
+
+Text.
+"""
+
+
+def render(src, cache=None, writer="pseudoxml"):
+    """Render *src* with or without the incremental reader."""
+    kwargs = {
+        "source": src,
+        "writer": writer,
+        "settings_overrides": {"warning_stream": StringIO()},
+    }
+    if cache is not None:
+        kwargs["reader"] = IncrementalReader(Parser(), cache)
+    return publish_string(**kwargs).decode()
+
+
+class TestSplit:
+    def test_titles(self):
+        lines = DOCUMENT.splitlines()
+        titles = find_titles(lines)
+        assert titles[0] == (0, ("=", True))
+        assert (6, ("=", False)) in titles
+        assert (17, ("-", False)) in titles
+
+    def test_split_under_document_title(self):
+        sections, nested = split_sections(DOCUMENT)
+        starts = [start for start, _ in sections]
+        assert starts == [0, 6, 27]
+        assert nested
+        assert sections[2][1].startswith("Second\n======\n")
+
+    def test_split_on_top_level(self):
+        sections, nested = split_sections(DOCUMENT.split("\n", 4)[-1])
+        assert [start for start, _ in sections] == [0, 2, 23]
+        assert not nested
+
+    def test_text_without_titles(self):
+        assert split_sections("Text.\n") == ([(0, "Text.\n")], False)
+
+    def test_inconsistent_levels(self):
+        src = "A\n=\n\nB\n-\n\nC\n~\n\nD\n=\n\nE\n~\n"
+        assert split_sections(src) is None
+
+
+class TestIncrementalReader:
+    @pytest.mark.parametrize("writer", ["pseudoxml", "html4", "html5"])
+    def test_same_as_full_parse(self, writer):
+        assert render(DOCUMENT, SectionCache(), writer) == render(
+            DOCUMENT, writer=writer,
+        )
+
+    def test_only_changed_sections_are_parsed(self):
+        cache = SectionCache()
+        render(DOCUMENT, cache)
+        assert (cache.hits, cache.misses) == (0, 3)
+
+        changed = DOCUMENT.replace("Again", "Once more\n\nAgain")
+        assert render(changed, cache) == render(changed)
+        assert (cache.hits, cache.misses) == (2, 4)
+
+    def test_line_numbers_of_cached_sections(self):
+        changed = DOCUMENT.replace("Text.", "Bad *markup.")
+        cache = SectionCache()
+        render(changed, cache)
+        moved = changed.replace(":Author: Formiko", ":Author: Formiko\n\n")
+        assert render(moved, cache) == render(moved)
+        assert cache.hits == 2
+        assert 'line="40"' in render(moved, cache)
+
+    def test_line_numbers_of_included_nodes(self, tmp_path):
+        included = tmp_path / "included.rst"
+        included.write_text("Bad *markup in included file.\n")
+        src = DOCUMENT.replace("Text.", f"Text.\n\n.. include:: {included}")
+        cache = SectionCache()
+        assert render(src, cache) == render(src)
+        assert f'line="1" source="{included}"' in render(src, cache)
+
+    def test_global_directive_fallback(self):
+        cache = SectionCache()
+        src = ".. default-role:: literal\n\n" + DOCUMENT
+        assert render(src, cache) == render(src)
+        assert cache.misses == 0
@@ -0,0 +1,100 @@
+"""Tests for lazy layout of preview sections."""
+
+import re
+
+import pytest
+from docutils.core import publish_doctree
+
+from formiko.lazy_layout import (
+    BLOCK_MARGIN,
+    LINE_HEIGHT,
+    estimate_height,
+    section_style,
+)
+from formiko.rendering import publish_html
+
+RST = """\
+Title
+=====
+
+First
+-----
+
+Text of the first section.
+
+Second
+------
+
+::
+
+    code
+    block
+
+Third
+-----
+
+Text of the third section.
+"""
+
+RE_LAZY = re.compile(r"<[^>]*content-visibility:auto[^>]*>")
+
+
+def section(src):
+    """Return the first section of reStructuredText *src*."""
+    document = publish_doctree(
+        src,
+        settings_overrides={"doctitle_xform": False},
+    )
+    return document[0]
+
+
+class TestEstimateHeight:
+    def test_paragraph(self):
+        height = estimate_height(section("Title\n=====\n\nText.\n"))
+        assert height == 2 * (LINE_HEIGHT + BLOCK_MARGIN)
+
+    def test_long_paragraph_wraps(self):
+        short = estimate_height(section("Title\n=====\n\nText.\n"))
+        long = estimate_height(section("Title\n=====\n\n" + "Text " * 100))
+        assert long > short + 2 * LINE_HEIGHT
+
+    def test_literal_block_lines(self):
+        height = estimate_height(section("Title\n=====\n\n::\n\n  a\n  b\n"))
+        assert height == 3 * LINE_HEIGHT + 2 * BLOCK_MARGIN
+
+    def test_style(self):
+        style = section_style(section("Title\n=====\n\nText.\n"))
+        assert style.startswith("content-visibility:auto;")
+        assert "contain-intrinsic-size:auto " in style
+
+
+class TestLazyLayout:
+    @pytest.mark.parametrize("writer", ["html4", "html5"])
+    def test_top_level_sections(self, writer):
+        _, html, _ = publish_html(RST, "rst", writer, lazy_layout=True)
+        tags = RE_LAZY.findall(html)
+        assert len(tags) == 3
+        assert 'id="first"' in tags[0]
+
+    def test_nested_sections(self):
+        _, html, _ = publish_html(
+            "First\n=====\n\nSub\n---\n\nText.\n\nSecond\n======\n",
+            "rst",
+            "html5",
+            lazy_layout=True,
+        )
+        tags = RE_LAZY.findall(html)
+        assert [tag.split('"')[1] for tag in tags] == ["first", "second"]
+
+    def test_native_markdown(self):
+        _, html, _ = publish_html(
+            "# One\n\nText.\n\n# Two\n\nText.\n",
+            "md",
+            "html5",
+            lazy_layout=True,
+        )
+        assert len(RE_LAZY.findall(html)) == 2
+
+    def test_disabled(self):
+        _, html, _ = publish_html(RST, "rst", "html5")
+        assert "content-visibility" not in html
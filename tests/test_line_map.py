@@ -0,0 +1,89 @@
+"""Tests for source line map of the preview."""
+
+import re
+
+from formiko.line_map import LineIndex
+from formiko.rendering import publish_html
+
+RST = """\
+Title
+=====
+
+First paragraph.
+
+Section
+-------
+
+* item
+* item
+
+Last paragraph
+on two lines.
+"""
+
+
+def data_lines(html):
+    """Return list of (tag, line) with data-line attribute in *html*."""
+    return [
+        (tag, int(line))
+        for tag, line in re.findall(r'<(\w+)[^>]*data-line="(\d+)"', html)
+    ]
+
+
+class TestLineIndex:
+    def test_lines(self):
+        index = LineIndex("a\nbb\n\nccc")
+        assert index.count == 4
+        assert [index.line(offset) for offset in range(10)] == [
+            1, 1, 2, 2, 2, 3, 4, 4, 4, 4,
+        ]
+        assert index.offset(2) == 2
+        assert index.offset(4) == 6
+        assert index.offset(10) == 6
+
+    def test_last_line_break(self):
+        assert LineIndex("a\nb\n").count == 2
+        assert LineIndex("").count == 1
+
+    def test_ratio(self):
+        index = LineIndex("\n" * 100)
+        assert index.line_at(0) == 1
+        assert index.line_at(1) == 100
+        assert index.line_at(2) == 100
+        for line in (1, 33, 100):
+            assert index.line_at(index.ratio(line)) == line
+
+    def test_one_line(self):
+        index = LineIndex("text")
+        assert index.ratio(1) == 0
+        assert index.line_at(0.5) == 1
+
+
+class TestDataLines:
+    def test_lines(self):
+        _, html, _ = publish_html(RST, "rst", "html4", line_offset=0)
+        assert data_lines(html) == [
+            ("h1", 2), ("p", 4), ("h1", 7), ("ul", 9), ("p", 12),
+        ]
+
+    def test_html5_lines(self):
+        _, html, _ = publish_html(RST, "rst", "html5", line_offset=0)
+        assert data_lines(html) == [
+            ("h1", 2), ("p", 4), ("h2", 7), ("ul", 9), ("p", 9), ("p", 10),
+            ("p", 12),
+        ]
+
+    def test_offset(self):
+        _, html, _ = publish_html(RST, "rst", "html4", line_offset=100)
+        assert ("p", 104) in data_lines(html)
+
+    def test_incremental(self):
+        full = publish_html(RST, "rst", "html5", line_offset=0)
+        incremental = publish_html(
+            RST, "rst", "html5", incremental=True, line_offset=0,
+        )
+        assert full == incremental
+
+    def test_without_map(self):
+        _, html, _ = publish_html(RST, "rst", "html4")
+        assert "data-line" not in html
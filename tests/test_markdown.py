@@ -0,0 +1,92 @@
+"""Tests for the native MarkDown parser."""
+
+import pytest
+
+from formiko.markdown import MarkdownParser
+from formiko.rendering import publish_html
+from formiko.utils import Undefined
+
+pytestmark = pytest.mark.skipif(
+    issubclass(MarkdownParser, Undefined),
+    reason="mistune 0.8 is not installed",
+)
+
+MD = """\
+# Title
+
+Some *emphasis*, **strong** and `code` with [link](https://formiko.cz).
+
+## Section
+
+* one
+* two
+
+```python
+def render(src):
+    return src
+```
+"""
+
+
+def body(src, writer="html4"):
+    """Return body of *src* published by the native parser with lines."""
+    state, html, _ = publish_html(
+        src,
+        "md",
+        writer,
+        embed_stylesheet=False,
+        line_offset=0,
+    )
+    assert state
+    return html[html.index("<body>"):]
+
+
+class TestMarkdownParser:
+    def test_inline(self):
+        html = body(MD)
+        assert "<em>emphasis</em>" in html
+        assert "<strong>strong</strong>" in html
+        assert 'href="https://formiko.cz"' in html
+        assert ">code</tt>" in html
+
+    def test_sections(self):
+        html = body(MD, "html5")
+        assert '<h1 class="title" data-line="1">Title</h1>' in html
+        assert '<section id="section">' in html
+        assert '<h2 data-line="5">Section</h2>' in html
+
+    def test_lines_of_blocks(self):
+        html = body(MD)
+        assert '<p data-line="3">' in html
+        assert '<ul class="simple" data-line="7">' in html
+        assert 'data-line="10"' in html  # code block
+
+    def test_code_is_highlighted(self):
+        html = body(MD)
+        assert '<span class="keyword">def</span>' in html
+
+    def test_nested_heading_is_rubric(self):
+        html = body("Text\n\n> # Quoted\n")
+        assert '<p class="rubric">Quoted</p>' in html
+
+    def test_table(self):
+        html = body("| A | B |\n|:--|--:|\n| 1 | 2 |\n")
+        assert '<th class="head align-left">A</th>' in html
+        assert '<td class="align-right">2</td>' in html
+
+    def test_footnote(self):
+        html = body("Text[^note].\n\n[^note]: Note text.\n")
+        assert 'href="#footnote-note"' in html
+        assert 'id="footnote-note"' in html
+        assert "Note text." in html
+
+    def test_entities_and_html(self):
+        html = body("Fish &amp; chips\n\n<div>block</div>\n")
+        assert "Fish &amp; chips" in html
+        assert "<div>block</div>" in html
+
+    def test_same_text_as_m2r(self):
+        m2r = publish_html(MD, "m2r", "html4", embed_stylesheet=False)[1]
+        for text in ("emphasis", "strong", "Section", "two"):
+            assert text in m2r
+            assert text in body(MD)
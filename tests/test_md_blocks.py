@@ -0,0 +1,138 @@
+"""Tests for block level conversion of MarkDown documents."""
+
+import pytest
+
+from formiko.directives import Mark2Resturctured
+from formiko.md_blocks import BlockCache, split_blocks
+from formiko.rendering import publish_html
+from formiko.utils import Undefined
+
+try:
+    from m2r2 import PROLOG, convert
+except ImportError:
+    PROLOG = convert = None
+
+MD = """\
+# Title
+
+First paragraph
+with two lines.
+
+```python
+def render(src):
+
+    return src
+```
+
+* one
+
+* two
+  continued
+
+    indented code of the item
+
+> quote
+
+> still quote
+
+<div>
+
+html block
+
+</div>
+
+Last paragraph.
+"""
+
+
+def counting(calls):
+    """Return converter, which appends converted texts to *calls*."""
+
+    def convert_text(text):
+        calls.append(text)
+        return text.upper()
+
+    return convert_text
+
+
+class TestSplitBlocks:
+    def test_blocks(self):
+        blocks = split_blocks(MD)
+        assert "".join(blocks) == MD
+        assert [block.split("\n", 1)[0] for block in blocks] == [
+            "# Title",
+            "First paragraph",
+            "```python",
+            "* one",
+            "> quote",
+            "<div>",
+            "Last paragraph.",
+        ]
+
+    def test_tilde_fence(self):
+        text = "~~~\ncode\n\n```\n~~~\n\nText\n"
+        assert split_blocks(text) == ["~~~\ncode\n\n```\n~~~\n\n", "Text\n"]
+
+    def test_multi_paragraph_comment(self):
+        text = "<!--\nfirst\n\nsecond\n-->\n\nText\n"
+        assert split_blocks(text) == [
+            "<!--\nfirst\n\nsecond\n-->\n\n",
+            "Text\n",
+        ]
+
+    def test_one_line_comment(self):
+        text = "<!-- note -->\n\nText\n"
+        assert split_blocks(text) == ["<!-- note -->\n\n", "Text\n"]
+
+    def test_empty(self):
+        assert split_blocks("") == []
+
+
+class TestBlockCache:
+    def test_only_changed_block_is_converted(self):
+        calls = []
+        cache = BlockCache(counting(calls))
+        assert cache.convert(MD) == "\n\n".join(
+            block.upper() for block in split_blocks(MD)
+        )
+        assert len(calls) == len(split_blocks(MD))
+        calls.clear()
+        cache.convert(MD.replace("Last paragraph.", "Changed paragraph."))
+        assert calls == ["Changed paragraph.\n"]
+
+    def test_global_definitions(self):
+        calls = []
+        cache = BlockCache(counting(calls))
+        text = "See [docs][].\n\n[docs]: https://formiko.cz\n"
+        cache.convert(text)
+        assert calls == [text]
+
+    def test_prolog_once(self):
+        cache = BlockCache(lambda text: "PROLOG\n" + text, "PROLOG\n")
+        assert cache.convert("a\n\nb\n") == "PROLOG\na\n\n\n\nb\n"
+
+    def test_size(self):
+        cache = BlockCache(str.upper, size=2)
+        cache.convert("a\n\nb\n\nc\n")
+        assert list(cache.blocks.values()) == ["B\n\n", "C\n"]
+
+
+@pytest.mark.skipif(
+    issubclass(Mark2Resturctured, Undefined),
+    reason="m2r2 is not installed",
+)
+class TestM2RBlocks:
+    def test_same_as_whole_conversion(self):
+        cache = BlockCache(convert, PROLOG)
+        rst = cache.convert(MD + "\nText with <b>html</b>.\n")
+        assert rst.startswith(PROLOG)
+        assert rst.count(PROLOG) == 1
+        whole = convert(MD + "\nText with <b>html</b>.\n")
+        assert rst.split() == whole.split()
+
+    def test_comment_as_whole_conversion(self):
+        text = "Text\n\n<!--\nfirst\n\nsecond\n-->\n\nEnd\n"
+        rst = BlockCache(convert, PROLOG).convert(text)
+        assert rst.split() == convert(text).split()
+        _, html, _ = publish_html(text, "m2r", "html4")
+        assert "&lt;!--" not in html
@@ -0,0 +1,91 @@
+"""Tests for progressive rendering of huge documents."""
+
+import pytest
+
+from formiko.progressive import (
+    RE_CONTAINER,
+    plan_chunks,
+    publish_chunk,
+    publish_window,
+)
+
+
+def document(count):
+    """Return document with *count* top-level sections."""
+    parts = []
+    for number in range(count):
+        title = f"Section {number}"
+        parts.append(f"{title}\n{'=' * len(title)}\n\nText {number}.\n\n")
+    return "".join(parts)
+
+
+def chunk_indexes(plan):
+    """Return chunk indexes of *plan* in render order."""
+    return [plan.window[0]] + [chunk[0] for chunk in plan.rest]
+
+
+class TestPlanChunks:
+    def test_window_around_position(self):
+        src = document(9)
+        plan = plan_chunks(src, src.index("Text 4."), chunk_size=1)
+        assert "Section 3" in plan.window[2]
+        assert "Section 4" in plan.window[2]
+        assert "Section 5" in plan.window[2]
+        assert "Section 6" not in plan.window[2]
+        assert plan.window[1] == 15
+
+    def test_nearest_chunks_first(self):
+        plan = plan_chunks(document(9), 0.5, chunk_size=1)
+        assert chunk_indexes(plan) == [3, 4, 2, 5, 1, 6, 0]
+
+    def test_chunks_cover_source(self):
+        src = document(50)
+        plan = plan_chunks(src, 0.3, chunk_size=100)
+        chunks = sorted([plan.window, *plan.rest])
+        assert [chunk[0] for chunk in chunks] == list(range(len(chunks)))
+        assert "".join(chunk[2] for chunk in chunks) == src
+        for _, line, text in chunks:
+            assert src.splitlines()[line] == text.splitlines()[0]
+
+    def test_start_of_document(self):
+        plan = plan_chunks(document(5), 0, chunk_size=1)
+        assert plan.window[:2] == (0, 0)
+        assert "Section 0" in plan.window[2]
+
+    def test_vim_offset(self):
+        src = document(9)
+        plan = plan_chunks(src, src.index("Text 8."), chunk_size=1)
+        assert "Section 8" in plan.window[2]
+        assert "Section 6" not in plan.window[2]
+
+    @pytest.mark.parametrize(
+        "src",
+        ["Text without sections.\n", ".. default-role:: code\n\n" + "x\n"],
+    )
+    def test_not_splittable(self, src):
+        assert plan_chunks(src, 0) is None
+
+
+class TestPublish:
+    def test_window_page(self):
+        src = document(3)
+        (state, html, mime), stages = publish_window(0, src, "rst", "html4")
+        assert state
+        assert mime == "text/html"
+        assert set(stages) == {"frame", "chunk"}
+        container = RE_CONTAINER.search(html)
+        assert html.startswith('<div class="formiko-chunk"', container.end())
+
+    @pytest.mark.parametrize("writer", ["html4", "html5"])
+    def test_section_titles_are_kept(self, writer):
+        state, html = publish_chunk(
+            2, document(1), "rst", writer, line_offset=10,
+        )
+        assert state
+        assert 'data-chunk="2"' in html
+        assert 'data-line="12">Section 0</h' in html
+
+    def test_error(self):
+        state, html = publish_chunk(0, document(1), "rst", "unknown")
+        assert not state
+        assert "KeyError" in html
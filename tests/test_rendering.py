@@ -0,0 +1,198 @@
+"""Tests for the GTK independent rendering pipeline."""
+
+import pytest
+
+from formiko.rendering import (
+    RENDER_CACHE,
+    WRITERS,
+    RenderCache,
+    clear_caches,
+    prepared_publisher,
+    publish_html,
+    publish_recorded,
+    publish_timed,
+    render_pool,
+    stylesheet_files,
+)
+
+RST = """\
+Title
+=====
+
+Some *emphasis* and a `link <https://formiko.zeropage.cz>`_.
+"""
+
+
+class TestPublishHtml:
+    @pytest.mark.parametrize("writer", ["html4", "s5", "html5"])
+    def test_writers(self, writer):
+        state, html, mime_type = publish_html(RST, "rst", writer)
+        assert state
+        assert mime_type == "text/html"
+        assert "<em>emphasis</em>" in html
+
+    def test_pep_writer_ignores_parser(self):
+        state, html, _ = publish_html(
+            "PEP: 1\nTitle: Test\n\nText\n",
+            "rst",
+            "pep",
+        )
+        assert state
+        assert "Text" in html
+
+    def test_style_is_embedded(self, tmp_path):
+        style = tmp_path / "style.css"
+        style.write_text("body { color: #123456; }")
+        _, html, _ = publish_html(RST, "rst", "html4", str(style))
+        assert "#123456" in html
+
+    def test_without_stylesheet(self, tmp_path):
+        style = tmp_path / "style.css"
+        style.write_text("body { color: #123456; }")
+        _, html, _ = publish_html(
+            RST,
+            "rst",
+            "html4",
+            str(style),
+            embed_stylesheet=False,
+        )
+        assert "#123456" not in html
+        assert "<style" not in html
+        assert 'rel="stylesheet"' not in html
+
+    def test_error_is_returned_as_page(self):
+        state, html, _ = publish_html(RST, "rst", "unknown")
+        assert not state
+        assert "Exception Error!" in html
+
+    def test_incremental(self):
+        assert publish_html(RST, "rst", "html4", incremental=True) == (
+            publish_html(RST, "rst", "html4")
+        )
+
+    def test_timings(self):
+        output, timings = publish_timed(RST, "rst", "html4")
+        assert output == publish_html(RST, "rst", "html4")
+        assert set(timings) == {"setup", "parse", "transforms", "writer"}
+
+    def test_recorded(self):
+        output, timings, dependencies = publish_recorded(RST, "rst", "html4")
+        assert output == publish_html(RST, "rst", "html4")
+        assert set(timings) == {"setup", "parse", "transforms", "writer"}
+        assert dependencies == set(stylesheet_files("html4"))
+
+    def test_recorded_missing_include(self, tmp_path):
+        _, _, dependencies = publish_recorded(
+            RST + "\n.. include:: missing.rst\n",
+            "rst",
+            "html4",
+            file_name=str(tmp_path / "doc.rst"),
+        )
+        assert str(tmp_path / "missing.rst") in dependencies
+
+    def test_all_writers_are_known(self):
+        assert set(WRITERS) >= {"html4", "s5", "pep", "tiny", "html5"}
+
+
+class TestPreparedPublisher:
+    def test_cached_per_settings(self):
+        publisher = prepared_publisher("rst", "html4")
+        assert publisher is prepared_publisher("rst", "html4")
+        assert publisher is not prepared_publisher("rst", "html4", "", 4)
+        assert publisher is not prepared_publisher("rst", "html5")
+
+    def test_repeated_publish(self):
+        publisher = prepared_publisher("rst", "html5")
+        first = publisher.publish(RST + "\nBad *markup.\n")
+        assert publisher.publish(RST + "\nBad *markup.\n") == first
+        assert "Bad *markup." not in publisher.publish(RST)
+
+    def test_settings_are_not_changed(self, tmp_path):
+        publisher = prepared_publisher("rst", "html4")
+        publisher.publish(RST, str(tmp_path / "doc.rst"))
+        assert not hasattr(publisher.settings, "file_name")
+        assert publisher.settings._source is None
+
+    def test_clear_caches(self):
+        publisher = prepared_publisher("rst", "html4")
+        RENDER_CACHE.put("key", (True, "<p>x</p>", "text/html"))
+        clear_caches()
+        assert RENDER_CACHE.get("key") is None
+        assert publisher is prepared_publisher("rst", "html4")
+        clear_caches(publishers=True)
+        assert publisher is not prepared_publisher("rst", "html4")
+
+
+class TestStylesheetFiles:
+    @pytest.mark.parametrize("writer", ["html4", "html5", "pep"])
+    def test_writer_defaults(self, writer):
+        files = stylesheet_files(writer)
+        assert files
+        assert all(path.endswith(".css") for path in files)
+
+    def test_style(self, tmp_path):
+        style = str(tmp_path / "style.css")
+        assert stylesheet_files("html4", style) == [style]
+
+
+class TestRenderPool:
+    def test_job_in_worker(self):
+        job = render_pool().submit(publish_html, RST, "rst", "html4")
+        state, html, _ = job.result(timeout=60)
+        assert state
+        assert "<em>emphasis</em>" in html
+
+    def test_pool_is_shared(self):
+        assert render_pool() is render_pool()
+
+
+class TestRenderCache:
+    def test_hit_and_miss(self):
+        cache = RenderCache()
+        key = cache.key(RST, "rst", "html4", "", 8, None)
+        assert cache.get(key) is None
+        cache.put(key, (True, "<p>x</p>", "text/html"))
+        assert cache.get(key) == (True, "<p>x</p>", "text/html")
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_key_depends_on_all_arguments(self):
+        key = RenderCache.key(RST, "rst", "html4", "", 8, None)
+        assert key == RenderCache.key(RST, "rst", "html4", "", 8, None)
+        assert key != RenderCache.key(RST, "rst", "html5", "", 8, None)
+        assert key != RenderCache.key(RST, "rst", "html4", "", 4, None)
+        assert key != RenderCache.key(RST + "x", "rst", "html4", "", 8, None)
+
+    def test_volatile_source_is_not_cached(self):
+        src = ".. include:: other.rst\n"
+        assert RenderCache.key(src, "rst", "html4", "", 8, None) is None
+
+    def test_volatile_source_with_dependencies(self):
+        src = ".. include:: other.rst\n"
+        args = (src, "rst", "html4", "", 8, None)
+        key = RenderCache.key(*args, dependencies={"/other.rst": [1, 2]})
+        assert key is not None
+        assert key == RenderCache.key(
+            *args,
+            dependencies={"/other.rst": [1, 2]},
+        )
+        assert key != RenderCache.key(
+            *args,
+            dependencies={"/other.rst": [3, 2]},
+        )
+        assert key != RenderCache.key(*args, dependencies={})
+
+    def test_errors_are_not_cached(self):
+        cache = RenderCache()
+        cache.put("key", (False, "error", "text/html"))
+        assert cache.get("key") is None
+
+    def test_size_limit(self):
+        cache = RenderCache(max_bytes=10)
+        cache.put("a", (True, "12345", "text/html"))
+        cache.put("b", (True, "12345", "text/html"))
+        cache.get("a")
+        cache.put("c", (True, "12345", "text/html"))
+        assert list(cache.pages) == ["a", "c"]
+        assert cache.size == 10
+        cache.put("d", (True, "12345678901", "text/html"))
+        assert "d" not in cache.pages
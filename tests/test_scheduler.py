@@ -0,0 +1,55 @@
+"""Tests for adaptive render scheduling."""
+
+from formiko.scheduler import MAX_PAUSE, MIN_PAUSE, RenderScheduler
+
+
+class TestRenderScheduler:
+    def test_nothing_changed(self):
+        assert not RenderScheduler().due(10.0, None)
+
+    def test_cheap_render_is_immediate(self):
+        scheduler = RenderScheduler()
+        scheduler.changed(10.0)
+        assert scheduler.due(10.0, None)
+        assert scheduler.due(10.0, 0.01)
+        scheduler.rendered()
+        assert not scheduler.due(10.0, 0.01)
+
+    def test_expensive_render_waits_for_pause(self):
+        scheduler = RenderScheduler()
+        scheduler.changed(10.0)
+        scheduler.changed(10.3)
+        assert not scheduler.due(10.4, 0.2)
+        assert scheduler.due(10.8, 0.2)
+
+    def test_pause_limits(self):
+        assert RenderScheduler.pause(0.001) == MIN_PAUSE
+        assert RenderScheduler.pause(10) == MAX_PAUSE
+
+    def test_max_staleness(self):
+        scheduler = RenderScheduler(max_staleness=2.0)
+        now = 10.0
+        while now < 11.9:
+            scheduler.changed(now)
+            assert not scheduler.due(now, 5.0)
+            now += 0.1
+        scheduler.changed(12.0)
+        assert scheduler.due(12.0, 5.0)
+
+    def test_draft_for_expensive_render(self):
+        assert not RenderScheduler.draft(None)
+        assert not RenderScheduler.draft(0.01)
+        assert RenderScheduler.draft(0.5)
+
+    def test_full_render_on_idle(self):
+        scheduler = RenderScheduler(idle=1.0)
+        scheduler.changed(10.0)
+        scheduler.rendered(draft=True)
+        assert not scheduler.full_due(10.5)
+        scheduler.changed(10.6)
+        assert not scheduler.full_due(12.0)
+        scheduler.rendered(draft=True)
+        assert not scheduler.full_due(11.5)
+        assert scheduler.full_due(11.6)
+        scheduler.rendered()
+        assert not scheduler.full_due(20.0)
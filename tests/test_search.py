@@ -0,0 +1,105 @@
+"""Tests for asynchronous preview search state."""
+
+from formiko.search import (
+    COUNT,
+    NEXT,
+    PREVIOUS,
+    SEARCH,
+    PreviewSearch,
+    matches_label,
+)
+
+
+class Recorder:
+    """Collect sent requests and changed matches."""
+
+    def __init__(self):
+        self.sent = []
+        self.matches = []
+        self.search = PreviewSearch(self.send, self.changed)
+
+    def send(self, kind, text, backwards):
+        self.sent.append((kind, text, backwards))
+
+    def changed(self, index, count):
+        self.matches.append((index, count))
+
+
+class TestPreviewSearch:
+    def test_search_and_count(self):
+        rec = Recorder()
+        rec.search.search("ant")
+        assert rec.sent == [(SEARCH, "ant", False)]
+        rec.search.finished(True)
+        assert rec.sent[-1] == (COUNT, "ant", False)
+        rec.search.finished(3)
+        assert rec.matches == [(1, -1), (1, 3)]
+
+    def test_next_and_previous_wrap(self):
+        rec = Recorder()
+        rec.search.search("ant")
+        rec.search.finished(True)
+        rec.search.finished(2)
+        rec.search.search("ant")
+        assert rec.sent[-1] == (NEXT, "ant", False)
+        rec.search.finished(True)
+        rec.search.search("ant")
+        rec.search.finished(True)
+        assert rec.matches[-2:] == [(2, 2), (1, 2)]
+        rec.search.search("ant", backwards=True)
+        assert rec.sent[-1] == (PREVIOUS, "ant", True)
+        rec.search.finished(True)
+        assert rec.matches[-1] == (2, 2)
+
+    def test_backwards_starts_on_last(self):
+        rec = Recorder()
+        rec.search.search("ant", backwards=True)
+        rec.search.finished(True)
+        rec.search.finished(5)
+        assert rec.matches[-1] == (5, 5)
+
+    def test_not_found(self):
+        rec = Recorder()
+        rec.search.search("bee")
+        rec.search.finished(False)
+        assert rec.matches == [(0, 0)]
+        assert len(rec.sent) == 1
+
+    def test_stale_results_are_dropped(self):
+        rec = Recorder()
+        rec.search.search("a")
+        rec.search.search("an")
+        rec.search.search("ant")
+        assert rec.sent == [(SEARCH, "a", False)]
+        rec.search.finished(True)  # result for "a"
+        assert rec.matches == []
+        assert rec.sent[-1] == (SEARCH, "ant", False)
+        rec.search.finished(True)
+        rec.search.finished(1)
+        assert rec.matches == [(1, -1), (1, 1)]
+
+    def test_stop(self):
+        rec = Recorder()
+        rec.search.search("ant")
+        rec.search.stop()
+        rec.search.finished(True)
+        assert rec.matches == []
+        rec.search.search("ant")
+        assert rec.sent == [(SEARCH, "ant", False)] * 2
+
+    def test_stop_without_answer(self):
+        rec = Recorder()
+        rec.search.search("ant")
+        rec.search.stop()
+        rec.search.search("bee")
+        assert rec.sent[-1] == (SEARCH, "bee", False)
+        rec.search.finished(False)
+        assert rec.matches == [(0, 0)]
+
+
+class TestMatchesLabel:
+    def test_labels(self):
+        assert matches_label(2, 5) == "2 of 5"
+        assert matches_label(0, 0) == "no matches"
+        assert matches_label(1, -1) == "…"
+        assert matches_label(0, -1) == ""
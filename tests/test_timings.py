@@ -0,0 +1,65 @@
+"""Tests for render stage timings."""
+
+import json
+
+from formiko.timings import RenderTimings, StageTimer
+
+
+def timer(**stages):
+    """Return StageTimer with *stages* times."""
+    result = StageTimer()
+    result.stages = stages
+    return result
+
+
+class TestStageTimer:
+    def test_marks(self):
+        stages = StageTimer()
+        stages.mark("parse")
+        stages.mark("writer")
+        stages.mark("parse")
+        assert list(stages.stages) == ["parse", "writer"]
+        assert stages.total == sum(stages.stages.values())
+
+    def test_merge(self):
+        stages = StageTimer()
+        stages.merge({"parse": 0.0, "writer": 0.0}, "queue")
+        assert list(stages.stages) == ["queue", "parse", "writer"]
+        assert stages.stages["queue"] >= 0
+
+
+class TestRenderTimings:
+    def test_percentile(self):
+        timings = RenderTimings(log=None)
+        assert timings.percentile(50) is None
+        for value in range(1, 101):
+            timings.add(timer(parse=value / 1000))
+        assert timings.last == 0.1
+        assert timings.percentile(50) == 0.05
+        assert timings.percentile(95) == 0.095
+
+    def test_rolling_window(self):
+        timings = RenderTimings(size=2, log=None)
+        for value in (10, 1, 2):
+            timings.add(timer(parse=value))
+        assert timings.percentile(100) == 2
+
+    def test_draft_is_not_last(self):
+        timings = RenderTimings(log=None)
+        timings.add(timer(parse=0.5))
+        draft = timer(parse=0.01)
+        draft.draft = True
+        timings.add(draft)
+        assert timings.last == 0.5
+        assert timings.percentile(0) == 0.01
+
+    def test_log(self, tmp_path):
+        log = tmp_path / "timings.log"
+        timings = RenderTimings(log=str(log))
+        timings.add(timer(parse=0.01, writer=0.002), file="doc.rst")
+        timings.add(timer(parse=0.01), file="doc.rst")
+        records = [json.loads(x) for x in log.read_text().splitlines()]
+        assert len(records) == 2
+        assert records[0]["file"] == "doc.rst"
+        assert records[0]["total"] == 12.0
+        assert records[0]["stages"] == {"parse": 10.0, "writer": 2.0}
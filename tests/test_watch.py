@@ -0,0 +1,91 @@
+"""Tests for watching of changed files."""
+
+from os.path import join
+
+from formiko.watch import (
+    ChangedFiles,
+    Watcher,
+    is_skipped,
+    snapshot,
+    snapshot_changes,
+    snapshot_paths,
+)
+
+
+class TestChangedFiles:
+    def test_debounce(self):
+        changes = ChangedFiles(debounce=0.03)
+        assert changes.take(10.0) == set()
+        changes.changed("a", 10.0)
+        changes.changed("b", 10.02)
+        assert changes.take(10.04) == set()
+        assert changes.take(10.05) == {"a", "b"}
+        assert changes.take(10.1) == set()
+
+
+class TestSnapshot:
+    def test_is_skipped(self):
+        assert is_skipped("/doc/.git", [])
+        assert is_skipped("/doc/html/index.html", ["/doc/html"])
+        assert not is_skipped("/doc/html2/index.html", ["/doc/html"])
+        assert not is_skipped("/doc/index.rst", ["/doc/html"])
+
+    def test_changes(self, tmp_path):
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "out").mkdir()
+        (tmp_path / ".git").mkdir()
+        (tmp_path / "index.rst").write_text("Index\n")
+        (tmp_path / "sub" / "page.rst").write_text("Page\n")
+        (tmp_path / "out" / "index.html").write_text("<html>")
+        (tmp_path / ".git" / "HEAD").write_text("ref")
+        root = str(tmp_path)
+        old = snapshot(root, [join(root, "out")])
+        assert set(old) == {
+            join(root, "index.rst"),
+            join(root, "sub", "page.rst"),
+        }
+
+        (tmp_path / "index.rst").write_text("Index changed\n")
+        (tmp_path / "sub" / "page.rst").unlink()
+        (tmp_path / "new.rst").write_text("New\n")
+        new = snapshot(root, [join(root, "out")])
+        assert snapshot_changes(old, new) == {
+            join(root, "index.rst"),
+            join(root, "sub", "page.rst"),
+            join(root, "new.rst"),
+        }
+        assert snapshot_changes(new, new) == set()
+
+    def test_paths(self, tmp_path):
+        (tmp_path / "images").mkdir()
+        (tmp_path / "images" / "logo.png").write_bytes(b"png")
+        (tmp_path / "header.rst").write_text("Header\n")
+        files = snapshot_paths(
+            [
+                str(tmp_path / "images"),
+                str(tmp_path / "header.rst"),
+                str(tmp_path / "missing.rst"),
+            ],
+        )
+        assert set(files) == {
+            str(tmp_path / "images" / "logo.png"),
+            str(tmp_path / "header.rst"),
+        }
+
+
+class TestWatcher:
+    def test_outside(self, tmp_path):
+        (tmp_path / "doc").mkdir()
+        (tmp_path / "doc" / "index.rst").write_text("Index\n")
+        (tmp_path / "header.rst").write_text("Header\n")
+        root = str(tmp_path / "doc")
+        header = str(tmp_path / "header.rst")
+        watcher = Watcher(
+            root,
+            print,
+            outside=lambda: [header, join(root, "index.rst")],
+        )
+        assert watcher._watch_outside()
+        assert watcher.paths == {header}
+        assert not watcher._watch_outside()
+        assert set(watcher._snapshot()) == {join(root, "index.rst"), header}